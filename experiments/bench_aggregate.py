@@ -0,0 +1,42 @@
+"""
+Subtree totals computed during the scan (Scraper(aggregate=True)) versus a second walk over the scraped tree, in
+Python, the way callers did it before: recursively, asking every file for its size again through its path
+
+Usage: python experiments/bench_aggregate.py [depth] [dirs_per_dir] [files_per_dir]
+"""
+import sys
+
+from fmtree.core.aggregate import compute_stats, largest_directories
+from fmtree.core.node import FileNode
+from fmtree.core.scraper import Scraper
+from bench_utils import temporary_tree, count_syscalls, timeit
+
+
+def walk_totals(node: FileNode, totals: dict) -> int:
+    """Size below every directory, keyed by path, from a stat of every file"""
+    size = 0
+    for child in node.get_children():
+        size += walk_totals(child, totals) if child.is_dir() else child.get_path().stat().st_size
+    totals[str(node.get_path())] = size
+    return size
+
+
+def main(depth: int = 5, dirs_per_dir: int = 4, files_per_dir: int = 16) -> None:
+    with temporary_tree(depth=depth, dirs_per_dir=dirs_per_dir, files_per_dir=files_per_dir) as (root, count):
+        print(f"synthetic tree: {count} entries")
+        cases = {
+            "scrape": lambda: Scraper(root).run(),
+            "scrape, walk with stat": lambda: walk_totals(Scraper(root).run(), {}),
+            "scrape, compute_stats": lambda: compute_stats(Scraper(root).run()),
+            "Scraper(aggregate=True)": lambda: Scraper(root, aggregate=True).run(),
+        }
+        for label, func in cases.items():
+            with count_syscalls() as calls:
+                func()
+            print(f"{label:>24}: {timeit(func) * 1000:8.1f} ms, {calls['stat']} stat, {calls['listdir']} listdir")
+        tree = Scraper(root, aggregate=True).run()
+        print(f"{'largest_directories':>24}: {timeit(lambda: largest_directories(tree, 10)) * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
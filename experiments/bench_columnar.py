@@ -0,0 +1,41 @@
+"""
+Memory held by a scraped tree as FileNode, CompactFileNode and ColumnarTree, and the cost of walking it
+
+Usage: python experiments/bench_columnar.py [depth] [dirs_per_dir] [files_per_dir]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+from fmtree.core.scraper import Scraper
+from bench_utils import temporary_tree
+
+
+def measure(name: str, build: Callable) -> None:
+    gc.collect()
+    tracemalloc.start()
+    tree = build()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    total = sum(node.get_stat().st_size for node in tree.walk(recursive=True, no_dir=True))
+    walk = time.perf_counter() - start
+    start = time.perf_counter()
+    gc.collect()
+    collect = time.perf_counter() - start
+    print(f"{name:>9}: {held / 2 ** 20:8.2f} MiB held, walk {walk * 1000:7.1f} ms, "
+          f"gc.collect {collect * 1000:6.1f} ms ({total} bytes)")
+
+
+def main(depth: int = 4, dirs_per_dir: int = 5, files_per_dir: int = 20) -> None:
+    with temporary_tree(depth=depth, dirs_per_dir=dirs_per_dir, files_per_dir=files_per_dir) as (root, count):
+        print(f"synthetic tree: {count} entries")
+        measure("FileNode", Scraper(root, keep_empty_dir=True).run)
+        measure("compact", Scraper(root, keep_empty_dir=True, compact=True).run)
+        measure("columnar", Scraper(root, keep_empty_dir=True).run_columnar)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
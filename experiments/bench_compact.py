@@ -0,0 +1,34 @@
+"""
+Memory held by a scraped tree of FileNode versus CompactFileNode (Scraper(compact=True))
+
+Usage: python experiments/bench_compact.py [depth] [dirs_per_dir] [files_per_dir]
+"""
+import sys
+import time
+import tracemalloc
+
+from fmtree.core.scraper import Scraper
+from bench_utils import temporary_tree
+
+
+def measure(name: str, compact: bool, root) -> None:
+    scraper = Scraper(root, keep_empty_dir=True, compact=compact)
+    tracemalloc.start()
+    start = time.perf_counter()
+    tree = scraper.run()
+    seconds = time.perf_counter() - start
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    nodes = sum(1 for _ in tree.walk(recursive=True))
+    print(f"{name:>8}: {held / 2 ** 20:8.2f} MiB held, {held / nodes:6.0f} B/node {seconds * 1000:8.1f} ms")
+
+
+def main(depth: int = 4, dirs_per_dir: int = 5, files_per_dir: int = 20) -> None:
+    with temporary_tree(depth=depth, dirs_per_dir=dirs_per_dir, files_per_dir=files_per_dir) as (root, count):
+        print(f"synthetic tree: {count} entries")
+        measure("FileNode", False, root)
+        measure("compact", True, root)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
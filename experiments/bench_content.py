@@ -0,0 +1,39 @@
+"""
+Content filters: reading files one by one versus on a thread pool, and scraping again with cached verdicts
+
+Files of the synthetic tree are in the page cache, where reads are too fast for threads to help; the second run adds a
+simulated 0.2 ms latency per read (time.sleep, which releases the GIL as a blocking read does) to show the overlap
+on slow storage.
+Usage: python experiments/bench_content.py [depth] [dirs_per_dir] [files_per_dir]
+"""
+import sys
+import time
+
+from fmtree.core.content import TextFilter
+from fmtree.core.scraper import Scraper
+from bench_utils import temporary_tree, timeit
+
+
+class SlowTextFilter(TextFilter):
+    def sniff(self, path) -> bool:
+        time.sleep(0.0002)
+        return super(SlowTextFilter, self).sniff(path)
+
+
+def main(depth: int = 4, dirs_per_dir: int = 4, files_per_dir: int = 32) -> None:
+    with temporary_tree(depth=depth, dirs_per_dir=dirs_per_dir, files_per_dir=files_per_dir) as (root, count):
+        print(f"synthetic tree: {count} entries")
+        for filter_class in (TextFilter, SlowTextFilter):
+            for workers in (1, 8):
+                def cold() -> None:
+                    Scraper(root, filters=[filter_class(workers=workers)]).run()
+
+                scraper = Scraper(root, filters=[filter_class(workers=workers)])
+                scraper.run()
+                print(f"{filter_class.__name__:>14} workers={workers}: no verdicts {timeit(cold, 3) * 1000:8.1f} ms, "
+                      f"cached verdicts {timeit(scraper.run, 3) * 1000:8.1f} ms")
+        print(f"no content filter: {timeit(Scraper(root).run) * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,56 @@
+"""
+Filters on FileEntry paths (type and stat from os.DirEntry) versus plain paths, scraping a synthetic tree
+
+MarkdownFilter, ExtensionFilter and RegexFilter ask is_file()/is_dir() for every entry they do not keep by name,
+which is a stat per call on a plain path and free on a FileEntry.
+Usage: python experiments/bench_entries.py [depth] [dirs_per_dir] [files_per_dir]
+"""
+import os
+import sys
+from typing import List, Tuple
+
+import pathlib2
+
+from fmtree.core.filter import MarkdownFilter, ExtensionFilter, RegexFilter
+from fmtree.core.scraper import Scraper
+from bench_utils import temporary_tree, count_syscalls, timeit
+
+
+class PathScraper(Scraper):
+    """scan_dir as it was before FileEntry: filters get plain paths"""
+
+    def scan_dir(self, path: pathlib2.Path) -> List[Tuple[pathlib2.Path, os.stat_result]]:
+        with os.scandir(str(path)) as it:
+            entries = {entry.name: entry for entry in it}
+        paths = self.compiled_filters()([path / name for name in entries])
+        result = []
+        for filepath in paths:
+            try:
+                result.append((filepath, entries[filepath.name].stat()))
+            except OSError:
+                continue
+        return result
+
+
+def main(depth: int = 4, dirs_per_dir: int = 4, files_per_dir: int = 8) -> None:
+    with temporary_tree(depth=depth, dirs_per_dir=dirs_per_dir, files_per_dir=files_per_dir) as (root, count):
+        print(f"synthetic tree: {count} entries")
+        filter_sets = {
+            "markdown": lambda: [MarkdownFilter()],
+            "extension": lambda: [ExtensionFilter([".md", ".txt"])],
+            "regex": lambda: [RegexFilter([r".*\.md", r".*\.txt"])],
+        }
+        for label, make_filters in filter_sets.items():
+            trees = []
+            for scraper_class in (PathScraper, Scraper):
+                scraper = scraper_class(root, filters=make_filters())
+                with count_syscalls() as counter:
+                    trees.append(scraper.run().to_dict())
+                seconds = timeit(scraper.run)
+                print(f"{label:>9} {scraper_class.__name__:>11}: {counter['stat'] / count:5.2f} stat/entry "
+                      f"{dict(counter)} {seconds * 1000:8.1f} ms")
+            assert trees[0] == trees[1]
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,60 @@
+"""
+Peak memory of tree.to_json() versus streaming the JSON to a file with fmtree.core.export
+
+Usage: python experiments/bench_export.py [depth] [dirs_per_dir] [files_per_dir]
+"""
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+from typing import Callable
+
+from fmtree.core import export
+from fmtree.core.scraper import Scraper
+from bench_utils import temporary_tree
+
+
+def measure(name: str, func: Callable) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{name:>14}: peak {peak / 2 ** 20:8.2f} MiB {seconds * 1000:8.1f} ms")
+
+
+def main(depth: int = 4, dirs_per_dir: int = 5, files_per_dir: int = 20) -> None:
+    with temporary_tree(depth=depth, dirs_per_dir=dirs_per_dir, files_per_dir=files_per_dir) as (root, count):
+        print(f"synthetic tree: {count} entries, peak memory on top of the scraped tree")
+        tree = Scraper(root, keep_empty_dir=True).run()
+        fd, output = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            def to_json() -> None:
+                with open(output, "w") as f:
+                    f.write(tree.to_json(indent=None))
+
+            def dump_json() -> None:
+                with open(output, "w") as f:
+                    export.dump_json(tree, f)
+
+            def stream_json() -> None:
+                with open(output, "w") as f:
+                    export.write_pieces(export.iter_json_from_stream(Scraper(root, keep_empty_dir=True).stream()), f)
+
+            def dump_ndjson() -> None:
+                with open(output, "w") as f:
+                    export.dump_ndjson(tree, f)
+
+            measure("to_json", to_json)
+            measure("dump_json", dump_json)
+            measure("dump_ndjson", dump_ndjson)
+            measure("scrape+stream", stream_json)
+        finally:
+            os.remove(output)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,48 @@
+"""
+Filters applied one after another (BaseFileFilter.__call__ per filter) versus compile_filters, on every directory
+listing of a synthetic tree
+
+Usage: python experiments/bench_filters.py [depth] [dirs_per_dir] [files_per_dir]
+"""
+import os
+import sys
+
+import pathlib2
+
+from fmtree.core.filter import MarkdownFilter, ExtensionFilter, RegexFilter, compile_filters
+from bench_utils import temporary_tree, timeit
+
+IGNORE = ["node_modules", r"\.git", "build", "dist", r".*\.pyc", r".*/__pycache__", "venv", r"\.tox", "site", "tmp"]
+
+
+def listings(root: pathlib2.Path) -> list:
+    return [[pathlib2.Path(directory) / name for name in dirs + files] for directory, dirs, files in os.walk(str(root))]
+
+
+def main(depth: int = 4, dirs_per_dir: int = 5, files_per_dir: int = 20) -> None:
+    with temporary_tree(depth=depth, dirs_per_dir=dirs_per_dir, files_per_dir=files_per_dir) as (root, count):
+        print(f"synthetic tree: {count} entries")
+        batches = listings(root)
+        filters = [ExtensionFilter([".md", ".txt"], ignore_list=IGNORE), RegexFilter([r".*file\d+"]),
+                   MarkdownFilter(ignore_list=["tmp"])]
+        for filter_ in filters:
+            filter_.set_root_path(root)
+
+        def chained() -> list:
+            result = []
+            for paths in batches:
+                for filter_ in filters:
+                    paths = filter_(paths)
+                result.append(paths)
+            return result
+
+        compiled = compile_filters(filters)
+        assert [compiled(paths) for paths in batches] == chained()
+        chained_seconds = timeit(chained)
+        compiled_seconds = timeit(lambda: [compiled(paths) for paths in batches])
+        print(f" chained: {chained_seconds * 1000:8.1f} ms")
+        print(f"compiled: {compiled_seconds * 1000:8.1f} ms ({chained_seconds / compiled_seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,29 @@
+"""
+File system calls and time of every formatter on a scraped synthetic tree (formatting should need none)
+
+Usage: python experiments/bench_format_syscalls.py [depth] [dirs_per_dir] [files_per_dir]
+"""
+import sys
+
+import fmtree.core.format as format_
+from fmtree.core.scraper import Scraper
+from bench_utils import temporary_tree, count_syscalls, timeit
+
+FORMATTERS = [format_.TabFormatter, format_.TreeCommandFormatter, format_.ListFileFormatter, format_.HTMLFormatter,
+              format_.MarkdownContentFormatter, format_.MarkdownLinkContentFormatter,
+              format_.GithubMarkdownContentFormatter]
+
+
+def main(depth: int = 4, dirs_per_dir: int = 4, files_per_dir: int = 8) -> None:
+    with temporary_tree(depth=depth, dirs_per_dir=dirs_per_dir, files_per_dir=files_per_dir) as (root, count):
+        print(f"synthetic tree: {count} entries")
+        tree = Scraper(root).run()
+        for formatter_class in FORMATTERS:
+            with count_syscalls() as counter:
+                formatter_class(tree).generate()
+            seconds = timeit(lambda: formatter_class(tree).generate())
+            print(f"{formatter_class.__name__:>30}: {sum(counter.values()):6d} syscalls {seconds * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
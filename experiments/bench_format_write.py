@@ -0,0 +1,69 @@
+"""
+Formatter output through generate() + to_stream() (the whole text in StringIO, then written) versus write() (rendered
+straight into the stream with a bounded buffer): peak memory and time to the first byte
+
+Usage: python experiments/bench_format_write.py [files]
+"""
+import io
+import sys
+import time
+import tracemalloc
+
+import pathlib2
+
+from fmtree.core.format import MarkdownContentFormatter, TreeCommandFormatter
+from fmtree.core.node import FileNode, stat_from_fields
+
+
+class FirstByteStream(io.TextIOBase):
+    """Discards text, remembers when the first write happened"""
+
+    def __init__(self) -> None:
+        self.first = None
+
+    def write(self, text: str) -> int:
+        if self.first is None:
+            self.first = time.perf_counter()
+        return len(text)
+
+
+def stub_tree(files: int) -> FileNode:
+    """A tree of files in directories of 100 files, with stat fields instead of real files"""
+    root = pathlib2.Path("/stub")
+    stat_dir = stat_from_fields(0o40755, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+    stat_file = stat_from_fields(0o100644, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+    directories = []
+    for d in range(files // 100):
+        path = root / f"directory{d:06d}"
+        children = [FileNode(path / f"file{f:03d}.md", depth=2, root=root, stat_=stat_file) for f in range(100)]
+        directories.append(FileNode(path, depth=1, root=root, stat_=stat_dir, children=children))
+    return FileNode(root, depth=0, root=root, stat_=stat_dir, children=directories)
+
+
+def measure(label: str, render) -> None:
+    stream = FirstByteStream()
+    tracemalloc.start()
+    start = time.perf_counter()
+    render(stream)
+    end = time.perf_counter()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:>32}: first byte {(stream.first - start) * 1000:8.1f} ms, total {(end - start) * 1000:8.1f} ms, "
+          f"peak {peak / 2 ** 20:7.1f} MiB")
+
+
+def main(files: int = 200000) -> None:
+    tree = stub_tree(files)
+    print(f"stub tree: {files} files")
+    for formatter_class in (TreeCommandFormatter, MarkdownContentFormatter):
+        def buffered(stream) -> None:
+            formatter = formatter_class(tree)
+            formatter.generate()
+            formatter.to_stream(stream)
+
+        measure(f"{formatter_class.__name__} generate", buffered)
+        measure(f"{formatter_class.__name__} write", lambda stream: formatter_class(tree).write(stream))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
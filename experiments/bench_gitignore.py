@@ -0,0 +1,42 @@
+"""
+Cost per entry of GitignoreFilter with a single ignore file at the root versus an ignore file in every directory
+Every directory listing of a synthetic tree is filtered by a fresh filter, so reading and compiling the ignore files
+is included
+
+Usage: python experiments/bench_gitignore.py [depth] [dirs_per_dir] [files_per_dir]
+"""
+import os
+import sys
+
+import pathlib2
+
+from fmtree.core.gitignore import GitignoreFilter
+from bench_utils import temporary_tree, timeit
+
+RULES = "*.txt\n!file2.txt\nbuild/\n/dist\n**/cache/**\n*.png\n"
+
+
+def filter_listings(root: pathlib2.Path, listings: list) -> int:
+    filter_ = GitignoreFilter()
+    filter_.set_root_path(root)
+    return sum(len(filter_(paths)) for paths in listings)
+
+
+def main(depth: int = 4, dirs_per_dir: int = 5, files_per_dir: int = 20) -> None:
+    with temporary_tree(depth=depth, dirs_per_dir=dirs_per_dir, files_per_dir=files_per_dir) as (root, count):
+        print(f"synthetic tree: {count} entries")
+        directories = [directory for directory, _, _ in os.walk(str(root))]
+        (root / ".gitignore").write_text(RULES)
+        listings = [[pathlib2.Path(directory) / name for name in os.listdir(directory)] for directory in directories]
+        seconds = timeit(lambda: filter_listings(root, listings), repeat=3)
+        print(f"{'1 ignore file':>16}: {seconds * 1000:8.1f} ms, {seconds / count * 1e6:5.2f} us/entry")
+        for index, directory in enumerate(directories):
+            with open(os.path.join(directory, ".gitignore"), "w") as f:
+                f.write(f"{RULES}local{index}.md\n")
+        listings = [[pathlib2.Path(directory) / name for name in os.listdir(directory)] for directory in directories]
+        seconds = timeit(lambda: filter_listings(root, listings), repeat=3)
+        print(f"{f'{len(directories)} ignore files':>16}: {seconds * 1000:8.1f} ms, {seconds / count * 1e6:5.2f} us/entry")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,28 @@
+"""
+Cost of a full scrape versus an incremental rescan after a single change
+
+Usage: python experiments/bench_incremental.py [depth] [dirs_per_dir] [files_per_dir]
+"""
+import sys
+
+from fmtree.core.scraper import Scraper
+from fmtree.core.filter import MarkdownFilter
+from bench_utils import temporary_tree, count_syscalls, timeit
+
+
+def main(depth: int = 4, dirs_per_dir: int = 5, files_per_dir: int = 20) -> None:
+    with temporary_tree(depth=depth, dirs_per_dir=dirs_per_dir, files_per_dir=files_per_dir) as (root, count):
+        print(f"synthetic tree: {count} entries")
+        scraper = Scraper(root, filters=[MarkdownFilter()], incremental=True)
+        previous = scraper.run()
+        (root / "dir0" / "dir1" / "added.md").write_text("# added\n")
+        for name, run in (("full", lambda: scraper.run(inplace=False)),
+                          ("rescan", lambda: scraper.run(inplace=False, previous_tree=previous))):
+            with count_syscalls() as counter:
+                run()
+            seconds = timeit(run, repeat=3)
+            print(f"{name:>8}: {sum(counter.values()):6d} syscalls {dict(counter)} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,54 @@
+"""
+TreeIndex lookups versus walking the tree: finding nodes by relative path and finding the parent of a node, plus the
+cost of building the index while scraping (Scraper(indexed=True)) on a synthetic tree
+
+Usage: python experiments/bench_index.py [depth] [dirs_per_dir] [files_per_dir] [lookups]
+"""
+import sys
+import random
+
+from fmtree.core.index import TreeIndex
+from fmtree.core.scraper import Scraper
+from bench_utils import temporary_tree, timeit
+
+
+def find_by_walk(tree, relative_path: str):
+    for node in tree.walk(recursive=True):
+        if str(node.get_relative_path()) == relative_path:
+            return node
+    return None
+
+
+def parent_by_walk(tree, node):
+    stack = [tree]
+    while stack:
+        candidate = stack.pop()
+        children = candidate.get_children()
+        if any(child is node for child in children):
+            return candidate
+        stack.extend(children)
+    return None
+
+
+def main(depth: int = 5, dirs_per_dir: int = 4, files_per_dir: int = 16, lookups: int = 100) -> None:
+    with temporary_tree(depth=depth, dirs_per_dir=dirs_per_dir, files_per_dir=files_per_dir) as (root, count):
+        print(f"synthetic tree: {count} entries, {lookups} lookups")
+        scrape = timeit(lambda: Scraper(root).run())
+        scrape_indexed = timeit(lambda: Scraper(root, indexed=True).run())
+        print(f"{'scrape':>22}: {scrape * 1000:9.1f} ms, indexed {scrape_indexed * 1000:9.1f} ms")
+        scraper = Scraper(root, indexed=True)
+        tree = scraper.run()
+        index = scraper.get_index()
+        print(f"{'TreeIndex(tree)':>22}: {timeit(lambda: TreeIndex(tree)) * 1000:9.1f} ms")
+        nodes = random.Random(0).sample(list(tree.walk(recursive=True)), lookups)
+        paths = [str(node.get_relative_path()) for node in nodes]
+        walk = timeit(lambda: [find_by_walk(tree, path) for path in paths], repeat=1)
+        indexed = timeit(lambda: [index.get_node(path) for path in paths])
+        print(f"{'path lookups':>22}: walk {walk * 1000:9.1f} ms, index {indexed * 1000:9.3f} ms")
+        walk = timeit(lambda: [parent_by_walk(tree, node) for node in nodes], repeat=1)
+        indexed = timeit(lambda: [index.get_parent(node) for node in nodes])
+        print(f"{'parent lookups':>22}: walk {walk * 1000:9.1f} ms, index {indexed * 1000:9.3f} ms")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,73 @@
+"""
+Compare the explicit-stack Scraper.scrape against the former recursive implementation
+
+Times both on a wide, deep synthetic tree and shows that only the recursive one fails on a directory chain deeper
+than the recursion limit.
+Usage: python experiments/bench_iterative.py [depth] [dirs_per_dir] [files_per_dir]
+"""
+import os
+import sys
+import stat
+import tempfile
+from typing import Tuple
+
+import pathlib2
+
+from fmtree.core.node import FileNode, UniqueFileIdentifier
+from fmtree.core.scraper import Scraper
+from bench_utils import temporary_tree, timeit
+
+
+class RecursiveScraper(Scraper):
+    """The recursive Scraper.scrape used before the explicit-stack traversal, kept here as the baseline"""
+
+    def scrape(self, path: pathlib2.Path, depth: int, stat_: os.stat_result = None) -> Tuple[FileNode, bool]:
+        children = []
+        found_any = False
+        if depth != self.depth_limit:
+            for filepath, filestat in self.scan_dir(path):
+                file_id = UniqueFileIdentifier(filepath, filestat)
+                if stat.S_ISDIR(filestat.st_mode) and file_id not in self.history:
+                    subtree, found_any_ = self.scrape(filepath, depth + 1, filestat)
+                    if found_any_:
+                        found_any = True
+                    if self._keep_empty_dir or found_any_:
+                        children.append(subtree)
+                elif stat.S_ISREG(filestat.st_mode):
+                    children.append(FileNode(filepath, depth=depth + 1, root=self.root, stat_=filestat))
+                    found_any = True
+                self.history.add(file_id)
+        return FileNode(path, children=children, depth=depth, root=self.root, stat_=stat_), found_any
+
+
+def deep_chain(levels: int) -> None:
+    # os.makedirs and shutil.rmtree recurse themselves, so the chain is built and removed level by level
+    root = tempfile.mkdtemp()
+    paths = [os.path.join(root, *(["d"] * level)) for level in range(1, levels + 1)]
+    for path in paths:
+        os.mkdir(path)
+    try:
+        for scraper_class in (RecursiveScraper, Scraper):
+            try:
+                scraper_class(pathlib2.Path(root), keep_empty_dir=True).run()
+                print(f"{scraper_class.__name__:>16}: chain of {levels} directories scraped")
+            except RecursionError:
+                print(f"{scraper_class.__name__:>16}: RecursionError on a chain of {levels} directories")
+    finally:
+        for path in reversed(paths):
+            os.rmdir(path)
+        os.rmdir(root)
+
+
+def main(depth: int = 5, dirs_per_dir: int = 5, files_per_dir: int = 4) -> None:
+    with temporary_tree(depth=depth, dirs_per_dir=dirs_per_dir, files_per_dir=files_per_dir) as (root, count):
+        print(f"synthetic tree: {count} entries")
+        for scraper_class in (RecursiveScraper, Scraper):
+            scraper = scraper_class(root, keep_empty_dir=False)
+            seconds = timeit(scraper.run)
+            print(f"{scraper_class.__name__:>16}: {seconds * 1000:8.1f} ms")
+    deep_chain(sys.getrecursionlimit() + 200)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,36 @@
+"""
+Compare Scraper and ParallelScraper, optionally emulating a high-latency file system
+
+Every directory listing is delayed by the given latency (seconds) to mimic a network file system round trip.
+Usage: python experiments/bench_parallel.py [latency] [workers]
+"""
+import sys
+import time
+
+from fmtree.core.scraper import Scraper, ParallelScraper
+from bench_utils import temporary_tree, timeit
+
+
+def with_latency(scraper_class: type, latency: float) -> type:
+    class SlowScraper(scraper_class):
+        def scan_dir(self, path):
+            time.sleep(latency)
+            return super().scan_dir(path)
+
+    SlowScraper.__name__ = scraper_class.__name__
+    return SlowScraper
+
+
+def main(latency: float = 0.002, workers: int = 16) -> None:
+    with temporary_tree(depth=4, dirs_per_dir=4, files_per_dir=8) as (root, count):
+        print(f"synthetic tree: {count} entries, {latency * 1000:.1f} ms per directory listing")
+        serial = with_latency(Scraper, latency)(root)
+        parallel = with_latency(ParallelScraper, latency)(root, workers=int(workers))
+        assert serial.run().to_dict() == parallel.run().to_dict()
+        for scraper in (serial, parallel):
+            seconds = timeit(scraper.run, repeat=3)
+            print(f"{type(scraper).__name__:>16}: {seconds * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main(*map(float, sys.argv[1:]))
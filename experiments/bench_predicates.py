@@ -0,0 +1,64 @@
+"""
+Composed predicate filters (compiled, one shared stat per entry) versus a straightforward filter stat-ing the path for
+every condition, on the listings of a synthetic tree and when scraping it
+
+Usage: python experiments/bench_predicates.py [depth] [dirs_per_dir] [files_per_dir]
+"""
+import os
+import sys
+import fnmatch
+import datetime
+
+import pathlib2
+
+from fmtree.core.entry import FileEntry
+from fmtree.core.filter import BaseFileFilter, compile_filters
+from fmtree.core.predicate import GlobFilter, SizeFilter, ModifiedFilter, OwnerFilter
+from fmtree.core.scraper import Scraper
+from bench_utils import temporary_tree, count_syscalls, timeit
+
+SINCE = datetime.datetime(2000, 1, 1).timestamp()
+
+
+class NaiveFilter(BaseFileFilter):
+    """(*.md or *.txt) and size >= 1 and modified since 2000 and owned by the current user, one condition at a time"""
+
+    def filter(self, items):
+        return [path for path in items if self.keep(path)]
+
+    def keep(self, path: pathlib2.Path) -> bool:
+        if not path.is_file():
+            return True
+        return (fnmatch.fnmatchcase(path.name, "*.md") or fnmatch.fnmatchcase(path.name, "*.txt")) and \
+            os.stat(str(path)).st_size >= 1 and os.stat(str(path)).st_mtime >= SINCE and \
+            os.stat(str(path)).st_uid == os.getuid()
+
+
+def composed() -> BaseFileFilter:
+    return GlobFilter(["*.md", "*.txt"]) & SizeFilter(min_size=1) & ModifiedFilter(since=SINCE) & \
+        OwnerFilter(user=os.getuid())
+
+
+def main(depth: int = 4, dirs_per_dir: int = 4, files_per_dir: int = 32) -> None:
+    with temporary_tree(depth=depth, dirs_per_dir=dirs_per_dir, files_per_dir=files_per_dir) as (root, count):
+        print(f"synthetic tree: {count} entries")
+        listings = []
+        for directory, dirs, files in os.walk(str(root)):
+            with os.scandir(directory) as it:
+                listings.append([FileEntry.from_dir_entry(pathlib2.Path(directory), entry) for entry in it])
+        results = []
+        for label, make in (("naive", NaiveFilter), ("composed", composed)):
+            filter_ = make()
+            filter_.set_root_path(root)
+            compiled = compile_filters([filter_])
+            results.append([compiled(paths) for paths in listings])
+            seconds = timeit(lambda: [compiled(paths) for paths in listings])
+            with count_syscalls() as counter:
+                Scraper(root, filters=[make()]).run()
+            print(f"{label:>9}: filtering {seconds / count * 1e9:6.0f} ns/entry, "
+                  f"scrape {counter['stat'] / count:4.2f} stat/entry {dict(counter)}")
+        assert results[0] == results[1]
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
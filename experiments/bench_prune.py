@@ -0,0 +1,30 @@
+"""
+Cost of scraping a project with a wide ignored dependency directory, with and without pruning it before descent
+"node_modules/.*" is pruned (see BaseFileFilter.prune_patterns), the equivalent "node_modules/(.*)" is not, so
+node_modules is listed and every entry in it goes through the filters before being dropped
+
+Usage: python experiments/bench_prune.py [packages] [files_per_package]
+"""
+import sys
+
+from fmtree.core.scraper import Scraper
+from fmtree.core.filter import MarkdownFilter
+from bench_utils import make_tree, temporary_tree, count_syscalls, timeit
+
+
+def main(packages: int = 3000, files_per_package: int = 4) -> None:
+    with temporary_tree(depth=2, dirs_per_dir=3, files_per_dir=10) as (root, count):
+        count += make_tree(root / "node_modules", depth=1, dirs_per_dir=packages, files_per_dir=files_per_package)
+        print(f"synthetic tree: {count} entries, most of them in node_modules")
+        for name, pattern in (("walked", "node_modules/(.*)"), ("pruned", "node_modules/.*")):
+            scraper = Scraper(root, filters=[MarkdownFilter(ignore_list=[pattern])])
+            with count_syscalls() as counter:
+                tree = scraper.run()
+            seconds = timeit(scraper.run, repeat=3)
+            kept = sum(1 for _ in tree.walk(recursive=True))
+            print(f"{name:>8}: {sum(counter.values()):6d} syscalls {dict(counter)} {seconds * 1000:8.1f} ms, "
+                  f"{kept} nodes")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,63 @@
+"""
+Compare the os.scandir based Scraper against the former pathlib based traversal
+
+Reports file system calls per scraped entry and wall time on a synthetic tree.
+Usage: python experiments/bench_scandir.py [depth] [dirs_per_dir] [files_per_dir]
+"""
+import sys
+from typing import Tuple
+
+import pathlib2
+
+from fmtree.core.node import FileNode
+from fmtree.core.scraper import Scraper
+from bench_utils import temporary_tree, count_syscalls, timeit
+
+
+def _legacy_node(path: pathlib2.Path, **kwargs) -> FileNode:
+    # the former FileNode.__init__ stat-ed the path itself and twice more through UniqueFileIdentifier
+    path.stat()
+    path.stat()
+    return FileNode(path, **kwargs)
+
+
+class PathlibScraper(Scraper):
+    """The traversal Scraper used before switching to os.scandir, kept here as the baseline"""
+
+    def scrape(self, path: pathlib2.Path, depth: int, stat_=None) -> Tuple[FileNode, bool]:
+        children = []
+        found_any = False
+        paths = list(path.iterdir())
+        for filter_ in self.filters:
+            paths = filter_(paths)
+        if depth != self.depth_limit:
+            for filepath in paths:
+                node = _legacy_node(filepath, depth=depth + 1, root=self.root)
+                if (filepath.is_symlink() or filepath.is_dir()) and node.get_id() not in self.history:
+                    subtree, found_any_ = self.scrape(filepath, depth + 1)
+                    if found_any_:
+                        found_any = True
+                    if self._keep_empty_dir or found_any_:
+                        children.append(subtree)
+                elif filepath.is_file():
+                    children.append(node)
+                    found_any = True
+                self.history.add(node.get_id())
+        return _legacy_node(path, children=children, depth=depth, root=self.root), found_any
+
+
+def main(depth: int = 4, dirs_per_dir: int = 4, files_per_dir: int = 8) -> None:
+    with temporary_tree(depth=depth, dirs_per_dir=dirs_per_dir, files_per_dir=files_per_dir) as (root, count):
+        print(f"synthetic tree: {count} entries")
+        for scraper_class in (PathlibScraper, Scraper):
+            scraper = scraper_class(root, keep_empty_dir=True)
+            with count_syscalls() as counter:
+                scraper.run()
+            total = sum(counter.values())
+            seconds = timeit(scraper.run)
+            print(f"{scraper_class.__name__:>16}: {total / count:5.2f} syscalls/entry {dict(counter)} "
+                  f"{seconds * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,30 @@
+"""
+Size and speed of fmtree.core.serialize versus pickle (FileNode.to_bytes), and of loading a single subtree
+
+Usage: python experiments/bench_serialize.py [depth] [dirs_per_dir] [files_per_dir]
+"""
+import sys
+import pickle
+
+from fmtree.core import serialize
+from fmtree.core.scraper import Scraper
+from bench_utils import temporary_tree, timeit
+
+
+def main(depth: int = 4, dirs_per_dir: int = 5, files_per_dir: int = 20) -> None:
+    with temporary_tree(depth=depth, dirs_per_dir=dirs_per_dir, files_per_dir=files_per_dir) as (root, count):
+        print(f"synthetic tree: {count} entries")
+        tree = Scraper(root, keep_empty_dir=True).run()
+        data = {"pickle": tree.to_bytes(), "binary": serialize.dumps(tree)}
+        for name, dumps, loads in [("pickle", pickle.dumps, pickle.loads), ("binary", serialize.dumps, serialize.loads)]:
+            dump_seconds = timeit(lambda: dumps(tree))
+            load_seconds = timeit(lambda: loads(data[name]))
+            print(f"{name:>8}: {len(data[name]) / 2 ** 20:6.2f} MiB, dump {dump_seconds * 1000:7.1f} ms, "
+                  f"load {load_seconds * 1000:7.1f} ms")
+        subtree = tree.get_children()[-1].get_relative_path()
+        seconds = timeit(lambda: serialize.loads(data["binary"], subtree))
+        print(f"{'subtree':>8}: load {subtree} in {seconds * 1000:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
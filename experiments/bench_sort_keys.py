@@ -0,0 +1,87 @@
+"""
+Key-based sorting (KeySorter, keys computed once per node) against comparator-based sorting (functools.cmp_to_key,
+keys computed on every comparison) on a stub tree of FileNodes, in directories of 100 shuffled files
+
+Usage: python experiments/bench_sort_keys.py [files]
+"""
+import re
+import sys
+import time
+import random
+import functools
+
+import pathlib2
+
+from fmtree.core.node import FileNode, stat_from_fields
+from fmtree.core.sorter import BaseSorter, KeySorter, NaturalSorter, by_name, by_size, dirs_first, descending, \
+    INPLACE_MODE
+
+
+def stub_tree(files: int) -> FileNode:
+    """Directories of 100 files (and a few directories) in random order, with version-like names and sizes"""
+    rng = random.Random(0)
+    root = pathlib2.Path("/stub")
+    stat_dir = stat_from_fields(0o40755, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+    directories = []
+    for d in range(files // 100):
+        path = root / f"directory{d}"
+        children = []
+        for f in range(100):
+            mode = 0o40755 if f % 10 == 0 else 0o100644
+            stat_ = stat_from_fields(mode, 0, 0, 0, 0, 0, rng.randrange(1 << 20), 0, 0, 0)
+            children.append(FileNode(path / f"release-{f % 7}.{f}.{rng.randrange(100)}.md", depth=2, root=root,
+                                     stat_=stat_))
+        rng.shuffle(children)
+        directories.append(FileNode(path, depth=1, root=root, stat_=stat_dir, children=children))
+    return FileNode(root, depth=0, root=root, stat_=stat_dir, children=directories)
+
+
+def _natural_parts(name: str) -> list:
+    return [int(part) if part.isdigit() else part.casefold() for part in re.split(r"(\d+)", name)]
+
+
+def compare_natural(a: FileNode, b: FileNode) -> int:
+    a_, b_ = (_natural_parts(a.get_filename()), a.get_filename()), (_natural_parts(b.get_filename()), b.get_filename())
+    return (a_ > b_) - (a_ < b_)
+
+
+def compare_dirs_size(a: FileNode, b: FileNode) -> int:
+    a_ = (not a.is_dir(), -a.get_stat().st_size, a.get_filename())
+    b_ = (not b.is_dir(), -b.get_stat().st_size, b.get_filename())
+    return (a_ > b_) - (a_ < b_)
+
+
+class ComparatorSorter(BaseSorter):
+    def __init__(self, compare) -> None:
+        super(ComparatorSorter, self).__init__(mode=INPLACE_MODE)
+        self.key = functools.cmp_to_key(compare)
+
+    def sorted(self, nodes):
+        return sorted(nodes, key=self.key)
+
+
+def once(sorter: BaseSorter, tree: FileNode) -> float:
+    start = time.perf_counter()
+    sorter(tree)
+    return time.perf_counter() - start
+
+
+def main(files: int = 1000000) -> None:
+    print(f"stub tree: {files} files")
+    cases = (
+        ("natural", ComparatorSorter(compare_natural), NaturalSorter(mode=INPLACE_MODE)),
+        ("dirs first, largest", ComparatorSorter(compare_dirs_size),
+         KeySorter([dirs_first, descending(by_size), by_name], mode=INPLACE_MODE)),
+    )
+    for label, comparator_sorter, key_sorter in cases:
+        tree = stub_tree(files)
+        comparator = once(comparator_sorter, tree)
+        expected = [node.get_filename() for node in tree.walk(recursive=True)]
+        tree = stub_tree(files)
+        keyed = once(key_sorter, tree)
+        assert [node.get_filename() for node in tree.walk(recursive=True)] == expected
+        print(f"{label:>20}: cmp_to_key {comparator:6.2f} s, KeySorter {keyed:6.2f} s ({comparator / keyed:.1f}x)")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,56 @@
+"""
+Sorting while scraping (Scraper(sorter=...)) versus scraping and then sorting the tree with a Sorter, on a synthetic
+tree, plus the peak memory of rendering it with TreeCommandFormatter from the tree and from Scraper.stream()
+
+Usage: python experiments/bench_sort_scrape.py [depth] [dirs_per_dir] [files_per_dir]
+"""
+import sys
+import tracemalloc
+
+from fmtree.core.format import TreeCommandFormatter
+from fmtree.core.scraper import Scraper
+from fmtree.core.sorter import Sorter, NaturalSorter, INPLACE_MODE
+from bench_utils import temporary_tree, timeit
+
+
+class Discard:
+    """Text stream dropping what is written"""
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+
+def peak_memory(func) -> int:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(depth: int = 5, dirs_per_dir: int = 4, files_per_dir: int = 16) -> None:
+    with temporary_tree(depth=depth, dirs_per_dir=dirs_per_dir, files_per_dir=files_per_dir) as (root, count):
+        print(f"synthetic tree: {count} entries")
+        cases = {
+            "scrape, Sorter()": lambda: Sorter()(Scraper(root).run()),
+            "scrape, Sorter(INPLACE_MODE)": lambda: Sorter(mode=INPLACE_MODE)(Scraper(root).run()),
+            "Scraper(sorter=Sorter())": lambda: Scraper(root, sorter=Sorter()).run(),
+            "scrape, NaturalSorter()": lambda: NaturalSorter()(Scraper(root).run()),
+            "Scraper(sorter=NaturalSorter())": lambda: Scraper(root, sorter=NaturalSorter()).run(),
+        }
+        for label, func in cases.items():
+            print(f"{label:>32}: {timeit(func) * 1000:8.1f} ms")
+
+        def from_tree():
+            TreeCommandFormatter(Sorter(mode=INPLACE_MODE)(Scraper(root).run())).write(Discard())
+
+        def from_stream():
+            TreeCommandFormatter().write(Discard(), Scraper(root, sorter=Sorter()).stream())
+
+        print(f"sorted tree output, peak memory: tree {peak_memory(from_tree) / 1024:8.0f} KiB, "
+              f"stream {peak_memory(from_stream) / 1024:8.0f} KiB")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,52 @@
+"""
+Sorter modes on a stub tree of FileNodes: DEEPCOPY_MODE (copy.deepcopy, then sort), SHARE_MODE (copy only what
+changes) and INPLACE_MODE, on an unsorted tree, on a sorted tree and on a sorted tree with one unsorted directory
+
+Usage: python experiments/bench_sorter.py [files]
+"""
+import sys
+import time
+
+import pathlib2
+
+from fmtree.core.node import FileNode, stat_from_fields
+from fmtree.core.sorter import Sorter, DEEPCOPY_MODE, SHARE_MODE, INPLACE_MODE
+
+
+def stub_tree(files: int) -> FileNode:
+    """Directories of 100 files, files and directories in reverse name order"""
+    root = pathlib2.Path("/stub")
+    stat_dir = stat_from_fields(0o40755, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+    stat_file = stat_from_fields(0o100644, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+    directories = []
+    for d in reversed(range(files // 100)):
+        path = root / f"directory{d:06d}"
+        children = [FileNode(path / f"file{f:03d}.md", depth=2, root=root, stat_=stat_file) for f in reversed(range(100))]
+        directories.append(FileNode(path, depth=1, root=root, stat_=stat_dir, children=children))
+    return FileNode(root, depth=0, root=root, stat_=stat_dir, children=directories)
+
+
+def once(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main(files: int = 200000) -> None:
+    print(f"stub tree: {files} files")
+    modes = (("DEEPCOPY_MODE", DEEPCOPY_MODE), ("SHARE_MODE", SHARE_MODE), ("INPLACE_MODE", INPLACE_MODE))
+    for case in ("unsorted", "sorted", "one unsorted directory"):
+        timings = []
+        for label, mode in modes:
+            tree = stub_tree(files)
+            if case != "unsorted":
+                Sorter(mode=INPLACE_MODE)(tree)
+            if case == "one unsorted directory":
+                directory = tree.get_children()[len(tree.get_children()) // 2]
+                directory.set_children(directory.get_children()[::-1])
+            timings.append(f"{label} {once(lambda: Sorter(mode=mode)(tree)) * 1000:8.1f} ms")
+        print(f"{case:>22}: " + ", ".join(timings))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
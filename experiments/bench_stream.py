@@ -0,0 +1,41 @@
+"""
+Peak memory of building the whole tree with Scraper.run() versus walking it with Scraper.stream()
+
+Usage: python experiments/bench_stream.py [depth] [dirs_per_dir] [files_per_dir]
+"""
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+from fmtree.core.scraper import Scraper
+from fmtree.core.filter import MarkdownFilter
+from bench_utils import temporary_tree
+
+
+def measure(name: str, func: Callable) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{name:>8}: peak {peak / 2 ** 20:8.2f} MiB {seconds * 1000:8.1f} ms")
+
+
+def consume_stream(scraper: Scraper) -> None:
+    for _ in scraper.stream():
+        pass
+
+
+def main(depth: int = 4, dirs_per_dir: int = 5, files_per_dir: int = 20) -> None:
+    with temporary_tree(depth=depth, dirs_per_dir=dirs_per_dir, files_per_dir=files_per_dir) as (root, count):
+        print(f"synthetic tree: {count} entries")
+        scraper = Scraper(root, filters=[MarkdownFilter()])
+        measure("run", scraper.run)
+        scraper.tree = None
+        measure("stream", lambda: consume_stream(scraper))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
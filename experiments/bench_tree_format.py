@@ -0,0 +1,108 @@
+"""
+TreeCommandFormatter: the former recursive generators versus the explicit-stack renderer, on stub trees of 1M nodes
+(wide: 1000 directories of 1000 files, mixed: random shapes up to depth 12, deep: a chain of 1000 directories with
+1000 files each, deeper than the former renderer could handle, so that one is only timed with the new renderer)
+
+Usage: python experiments/bench_tree_format.py [nodes]
+"""
+import io
+import sys
+import random
+from typing import Iterator, List
+
+from fmtree.core.format import TreeCommandFormatter
+from bench_utils import timeit
+
+
+class LineCounter(io.TextIOBase):
+    """Discards text, counts lines (deep trees have lines of kilobytes, their text does not fit in memory)"""
+
+    def __init__(self) -> None:
+        self.lines = 0
+
+    def write(self, text: str) -> int:
+        self.lines += text.count("\n")
+        return len(text)
+
+
+class StubNode:
+    """The part of the node interface TreeCommandFormatter uses"""
+    __slots__ = ("name", "children")
+
+    def __init__(self, name: str, children: List["StubNode"] = None) -> None:
+        self.name = name
+        self.children = children if children is not None else []
+
+    def get_filename(self) -> str:
+        return self.name
+
+    def get_children(self) -> List["StubNode"]:
+        return self.children
+
+
+class RecursiveTreeCommandFormatter(TreeCommandFormatter):
+    """The renderer used before, kept here as the baseline"""
+
+    def iter_lines(self) -> Iterator[str]:
+        def iterate(node_, prefix: str = '') -> Iterator[str]:
+            children = node_.get_children()
+            pointers = [TreeCommandFormatter.tee] * (len(children) - 1) + [TreeCommandFormatter.last]
+            for pointer, node in zip(pointers, children):
+                yield prefix + pointer + node.get_filename()
+                if children:
+                    extension = TreeCommandFormatter.branch if pointer == TreeCommandFormatter.tee else \
+                        TreeCommandFormatter.space
+                    yield from iterate(node, prefix=prefix + extension)
+
+        yield self.root.get_filename()
+        yield from iterate(self.root)
+
+
+def wide(nodes: int) -> StubNode:
+    side = int(nodes ** 0.5)
+    return StubNode("root", [StubNode(f"dir{d}", [StubNode(f"file{f}.md") for f in range(side)]) for d in range(side)])
+
+
+def mixed(nodes: int, seed: int = 0) -> StubNode:
+    rng = random.Random(seed)
+    root = StubNode("root")
+    directories = [(root, 0)]
+    for i in range(nodes - 1):
+        parent, depth = directories[rng.randrange(len(directories))]
+        node = StubNode(f"entry{i}")
+        parent.children.append(node)
+        if depth < 12 and rng.random() < 0.1:
+            directories.append((node, depth + 1))
+    return root
+
+
+def deep(nodes: int) -> StubNode:
+    side = int(nodes ** 0.5)
+    root = node = StubNode("root")
+    for d in range(side):
+        child = StubNode(f"dir{d}")
+        node.children = [StubNode(f"file{f}.md") for f in range(side)] + [child]
+        node = child
+    return root
+
+
+def main(nodes: int = 1000000) -> None:
+    for label, make in (("wide", wide), ("mixed", mixed), ("deep", deep)):
+        tree = make(nodes)
+        counter = LineCounter()
+        TreeCommandFormatter(tree).write(counter)
+        new_seconds = timeit(lambda: TreeCommandFormatter(tree).write(LineCounter()), 3)
+        line = f"{label:>5}: {counter.lines} lines, explicit stack {new_seconds * 1000:8.1f} ms"
+        if label != "deep":
+            expected, got = io.StringIO(), io.StringIO()
+            RecursiveTreeCommandFormatter(tree).write(expected)
+            TreeCommandFormatter(tree).write(got)
+            assert expected.getvalue() == got.getvalue()
+            del expected, got
+            old_seconds = timeit(lambda: RecursiveTreeCommandFormatter(tree).write(LineCounter()), 3)
+            line += f", recursive {old_seconds * 1000:8.1f} ms ({old_seconds / new_seconds:.1f}x)"
+        print(line)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
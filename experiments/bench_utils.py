@@ -0,0 +1,166 @@
+"""
+Helpers shared by the benchmark scripts in this directory
+"""
+import os
+import time
+import tempfile
+import contextlib
+from typing import Callable, Dict, Iterator, Tuple
+
+import pathlib2
+
+
+def make_tree(root: pathlib2.Path, depth: int = 4, dirs_per_dir: int = 4, files_per_dir: int = 8,
+              extensions: Tuple[str, ...] = (".md", ".py", ".txt", ".png")) -> int:
+    """Create a synthetic directory tree for benchmarking
+
+    :param root: directory to create the tree in
+    :type root: pathlib2.Path
+    :param depth: number of directory levels below root, defaults to 4
+    :type depth: int, optional
+    :param dirs_per_dir: number of sub-directories in every directory, defaults to 4
+    :type dirs_per_dir: int, optional
+    :param files_per_dir: number of files in every directory, defaults to 8
+    :type files_per_dir: int, optional
+    :param extensions: file extensions used round-robin, defaults to (".md", ".py", ".txt", ".png")
+    :type extensions: Tuple[str, ...], optional
+    :return: number of entries (files and directories, root excluded) created
+    :rtype: int
+    """
+    count = 0
+    stack = [(root, 0)]
+    while stack:
+        path, level = stack.pop()
+        path.mkdir(parents=True, exist_ok=True)
+        for i in range(files_per_dir):
+            (path / f"file{i}{extensions[i % len(extensions)]}").write_text("# title\n")
+            count += 1
+        if level < depth:
+            for i in range(dirs_per_dir):
+                stack.append((path / f"dir{i}", level + 1))
+                count += 1
+    return count
+
+
+@contextlib.contextmanager
+def temporary_tree(**kwargs) -> Iterator[Tuple[pathlib2.Path, int]]:
+    """Context manager creating a synthetic tree (see make_tree) in a temporary directory
+
+    :yield: root of the tree and the number of entries in it
+    :rtype: Iterator[Tuple[pathlib2.Path, int]]
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        root = pathlib2.Path(tmp) / "root"
+        count = make_tree(root, **kwargs)
+        yield root, count
+
+
+class _CountingDirEntry:
+    """os.DirEntry proxy counting the calls that reach the file system (Linux semantics: d_type is free)"""
+
+    def __init__(self, entry: os.DirEntry, counter: Dict[str, int]) -> None:
+        self._entry = entry
+        self._counter = counter
+        self._stat_done = False
+
+    def __getattr__(self, item):
+        return getattr(self._entry, item)
+
+    def __fspath__(self) -> str:
+        return self._entry.__fspath__()
+
+    def _count_stat(self) -> None:
+        if not self._stat_done:
+            self._stat_done = True
+            self._counter["stat"] += 1
+
+    def stat(self, *, follow_symlinks: bool = True) -> os.stat_result:
+        self._count_stat()
+        return self._entry.stat(follow_symlinks=follow_symlinks)
+
+    def is_dir(self, *, follow_symlinks: bool = True) -> bool:
+        if follow_symlinks and self._entry.is_symlink():
+            self._count_stat()
+        return self._entry.is_dir(follow_symlinks=follow_symlinks)
+
+    def is_file(self, *, follow_symlinks: bool = True) -> bool:
+        if follow_symlinks and self._entry.is_symlink():
+            self._count_stat()
+        return self._entry.is_file(follow_symlinks=follow_symlinks)
+
+
+class _CountingScandir:
+    def __init__(self, iterator, counter: Dict[str, int]) -> None:
+        self._iterator = iterator
+        self._counter = counter
+
+    def __iter__(self):
+        return (_CountingDirEntry(entry, self._counter) for entry in self._iterator)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._iterator.close()
+
+
+@contextlib.contextmanager
+def count_syscalls() -> Iterator[Dict[str, int]]:
+    """Count file system calls made through os.scandir and pathlib2 while the context is active
+
+    os.scandir/os.stat/os.lstat/os.listdir and the pathlib2 accessor are patched; DirEntry type queries are only
+    counted when they need a stat (symbolic links), as d_type is returned by the directory listing itself.
+
+    :yield: counter dict with keys "stat", "lstat" and "listdir" (os.scandir and os.listdir)
+    :rtype: Iterator[Dict[str, int]]
+    """
+    counter = {"stat": 0, "lstat": 0, "listdir": 0}
+    accessor = pathlib2._NormalAccessor
+    saved = {name: getattr(os, name) for name in ("scandir", "stat", "lstat", "listdir")}
+    saved_accessor = {name: accessor.__dict__[name] for name in ("stat", "lstat", "listdir", "scandir")}
+
+    def counted(name: str, key: str) -> Callable:
+        func = saved[name]
+
+        def wrapper(*args, **kwargs):
+            counter[key] += 1
+            return func(*args, **kwargs)
+        return wrapper
+
+    def scandir(*args, **kwargs):
+        counter["listdir"] += 1
+        return _CountingScandir(saved["scandir"](*args, **kwargs), counter)
+
+    os.scandir = scandir
+    os.stat = counted("stat", "stat")
+    os.lstat = counted("lstat", "lstat")
+    os.listdir = counted("listdir", "listdir")
+    accessor.stat = staticmethod(lambda path, *args: os.stat(str(path), *args))
+    accessor.lstat = staticmethod(lambda path, *args: os.lstat(str(path), *args))
+    accessor.listdir = staticmethod(lambda path, *args: os.listdir(str(path), *args))
+    accessor.scandir = staticmethod(lambda path, *args: os.scandir(str(path), *args))
+    try:
+        yield counter
+    finally:
+        for name, func in saved.items():
+            setattr(os, name, func)
+        for name, func in saved_accessor.items():
+            setattr(accessor, name, func)
+
+
+def timeit(func: Callable, repeat: int = 5) -> float:
+    """Best wall time of several runs
+
+    :param func: function to time, called without arguments
+    :type func: Callable
+    :param repeat: number of runs, defaults to 5
+    :type repeat: int, optional
+    :return: best run time in seconds
+    :rtype: float
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,163 @@
+"""
+Aggregated subtree statistics (du-style sizes, file counts)
+
+Scraper(aggregate=True) sums up the regular files below every directory while the scan closes it, bottom-up from the
+stats it already has, and stores the result on the directory node (see FileNode.get_stats). compute_stats() does the
+same for trees scraped without it or restored from an export, from the stats held by the nodes. Neither touches the
+file system. Only what the tree holds is counted: files left out by filters are not, and a file reachable through
+several hard links is counted once per node, as du --count-links does.
+"""
+import heapq
+from typing import Dict, List, Union
+
+from fmtree.core.node import FileNode
+
+SIZE_UNITS = ("B", "KiB", "MiB", "GiB", "TiB", "PiB")
+
+
+class SubtreeStats:
+    """Totals of the subtree below a directory: st_size of its files, number of files and directories, and the latest
+    st_mtime_ns of its files (0 when there is no file)
+    """
+    __slots__ = ("size", "files", "directories", "newest_mtime_ns")
+
+    def __init__(self, size: int = 0, files: int = 0, directories: int = 0, newest_mtime_ns: int = 0) -> None:
+        self.size = size
+        self.files = files
+        self.directories = directories
+        self.newest_mtime_ns = newest_mtime_ns
+
+    def __eq__(self, other: "SubtreeStats") -> bool:
+        return isinstance(other, SubtreeStats) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return (f"SubtreeStats(size={self.size}, files={self.files}, directories={self.directories}, "
+                f"newest_mtime_ns={self.newest_mtime_ns})")
+
+    def add_file(self, stat_) -> None:
+        """Count a file of the subtree
+
+        :param stat_: stat of the file
+        :type stat_: os.stat_result
+        """
+        self.size += stat_.st_size
+        self.files += 1
+        if stat_.st_mtime_ns > self.newest_mtime_ns:
+            self.newest_mtime_ns = stat_.st_mtime_ns
+
+    def add_directory(self, stats: "SubtreeStats") -> None:
+        """Count a sub-directory of the subtree and everything below it
+
+        :param stats: totals of the sub-directory
+        :type stats: SubtreeStats
+        """
+        self.size += stats.size
+        self.files += stats.files
+        self.directories += stats.directories + 1
+        if stats.newest_mtime_ns > self.newest_mtime_ns:
+            self.newest_mtime_ns = stats.newest_mtime_ns
+
+    def to_dict(self) -> Dict[str, int]:
+        """
+        :return: the totals by name
+        :rtype: Dict[str, int]
+        """
+        return {"size": self.size, "files": self.files, "directories": self.directories,
+                "newest_mtime_ns": self.newest_mtime_ns}
+
+
+def compute_stats(root: FileNode) -> SubtreeStats:
+    """Compute and store (see FileNode.set_stats) the totals of every directory of a tree, from the stats of the nodes
+    Walks the tree once with an explicit stack.
+
+    :param root: root node of a tree of FileNode or CompactFileNode
+    :type root: FileNode
+    :return: totals of root
+    :rtype: SubtreeStats
+    """
+    # node, its totals, whether its children were pushed
+    stack = [(root, SubtreeStats(), False)]
+    parents = []
+    while stack:
+        node, stats, visited = stack.pop()
+        if not visited:
+            stack.append((node, stats, True))
+            parents.append(stats)
+            for child in reversed(node.get_children()):
+                if child.is_dir():
+                    stack.append((child, SubtreeStats(), False))
+                elif child.is_file():
+                    stats.add_file(child.get_stat())
+            continue
+        parents.pop()
+        node.set_stats(stats)
+        if parents:
+            parents[-1].add_directory(stats)
+    return root.get_stats()
+
+
+def largest_directories(root: FileNode, count: int = 10, by: str = "size",
+                        include_root: bool = False) -> List[FileNode]:
+    """The directories of a tree with the largest totals, from the stats stored by Scraper(aggregate=True) or
+    compute_stats(), which is called first when root has none
+
+    :param root: root node of the tree
+    :type root: FileNode
+    :param count: number of directories, defaults to 10
+    :type count: int, optional
+    :param by: total to rank by, "size", "files", "directories" or "newest_mtime_ns", defaults to "size"
+    :type by: str, optional
+    :param include_root: rank root as well, defaults to False
+    :type include_root: bool, optional
+    :raises ValueError: unknown total
+    :return: up to count directory nodes, largest first
+    :rtype: List[FileNode]
+    """
+    if by not in SubtreeStats.__slots__:
+        raise ValueError(f"Unknown total: {by}, choose from: {', '.join(SubtreeStats.__slots__)}")
+    if root.get_stats() is None:
+        compute_stats(root)
+    directories = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node is not root or include_root:
+            directories.append(node)
+        stack.extend(child for child in node.get_children() if child.is_dir())
+    return heapq.nlargest(count, directories, key=lambda node: getattr(node.get_stats(), by))
+
+
+def format_size(size: int) -> str:
+    """Human readable size in binary units, as du -h
+
+    :param size: size in bytes
+    :type size: int
+    :return: e.g. "512 B", "1.5 KiB", "23 MiB"
+    :rtype: str
+    """
+    value = float(size)
+    for unit in SIZE_UNITS:
+        if value < 1024 or unit == SIZE_UNITS[-1]:
+            break
+        value /= 1024
+    if unit == "B":
+        return f"{size} B"
+    return f"{value:.1f} {unit}" if value < 10 else f"{value:.0f} {unit}"
+
+
+def stats_label(node: FileNode) -> str:
+    """Name of a node followed by its totals, "docs [1.5 MiB, 12 files]" for a directory with stats and "a.md [512 B]"
+    for a file, the bare name otherwise
+
+    :param node: file node
+    :type node: FileNode
+    :return: label
+    :rtype: str
+    """
+    stats: Union[SubtreeStats, None] = node.get_stats()
+    if stats is not None:
+        files = "1 file" if stats.files == 1 else f"{stats.files} files"
+        return f"{node.get_filename()} [{format_size(stats.size)}, {files}]"
+    if node.is_file():
+        return f"{node.get_filename()} [{format_size(node.get_stat().st_size)}]"
+    return node.get_filename()
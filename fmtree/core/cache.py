@@ -0,0 +1,253 @@
+"""
+Persistent scan index of FileNode trees
+
+A scanned tree is stored as one row per node in an SQLite database (by default next to the scraped root), so another
+process can restore the tree, or only a subtree of it, without walking the file system. Unlike pickle, loading the
+index never runs code, so it can be read from shared storage.
+"""
+import stat
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Tuple, Type, Union
+
+import pathlib2
+
+from fmtree.core.node import BaseNode, FileNode, STAT_FIELDS, stat_to_fields, stat_from_fields
+from fmtree.core.filter import BaseFileFilter, describe_object
+from fmtree.core.sorter import BaseSorter
+
+SCHEMA_VERSION = 1
+FILE_TYPE = "f"
+DIR_TYPE = "d"
+OTHER_TYPE = "o"
+
+_SIGNED_LIMIT = 2 ** 63
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS nodes (
+    id INTEGER PRIMARY KEY,
+    parent INTEGER,
+    depth INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    path TEXT NOT NULL UNIQUE,
+    type TEXT NOT NULL,
+    pruned INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    {", ".join(f"{field} INTEGER NOT NULL" for field in STAT_FIELDS)}
+);
+CREATE INDEX IF NOT EXISTS nodes_parent ON nodes (parent);
+"""
+_COLUMNS = ("id", "parent", "depth", "name", "path", "type", "pruned", "position") + STAT_FIELDS
+_INSERT = f"INSERT INTO nodes ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+_SELECT = f"SELECT {', '.join(_COLUMNS)} FROM nodes"
+
+
+def _to_signed(value: int) -> int:
+    """SQLite integers are signed 64-bit, st_ino and st_dev may use the full unsigned range"""
+    return value - 2 * _SIGNED_LIMIT if value >= _SIGNED_LIMIT else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value + 2 * _SIGNED_LIMIT if value < 0 else value
+
+
+def _node_type(st_mode: int) -> str:
+    if stat.S_ISDIR(st_mode):
+        return DIR_TYPE
+    return FILE_TYPE if stat.S_ISREG(st_mode) else OTHER_TYPE
+
+
+def describe_settings(keep_empty_dir: bool, depth: Union[int, None], filters: Iterable[BaseFileFilter],
+                      sorter: BaseSorter = None) -> str:
+    """Describe the scraper settings a tree depends on, a cached tree is only valid for the same description
+    Filters are described by their describe(), so the description does not change between processes.
+
+    :param keep_empty_dir: keep_empty_dir of the scraper
+    :type keep_empty_dir: bool
+    :param depth: depth limit of the scraper
+    :type depth: Union[int, None]
+    :param filters: filters of the scraper
+    :type filters: Iterable[BaseFileFilter]
+    :param sorter: sorter of the scraper, defaults to None
+    :type sorter: BaseSorter, optional
+    :return: settings description
+    :rtype: str
+    """
+    described = [f"keep_empty_dir={keep_empty_dir!r}", f"depth={depth!r}"]
+    described.extend(filter_.describe() if isinstance(filter_, BaseFileFilter) else
+                     describe_object(filter_, vars(filter_)) for filter_ in filters)
+    if sorter is not None:
+        described.append(f"sorter={describe_object(sorter, vars(sorter))}")
+    return "; ".join(described)
+
+
+class ScanCache:
+    """
+    SQLite index of a scanned tree
+    Table nodes holds one row per node in pre-order: id, parent id, depth, name, path relative to the root, type
+    ("d", "f" or "o"), whether it is a pruned directory (see FileNode.get_pruned) and its position, and the stat
+    fields in STAT_FIELDS. Table meta holds the schema version, root, scraper settings and stat of the root.
+
+    >>> with ScanCache(ScanCache.default_path(root)) as cache:
+            cache.save(tree)
+            subtree = cache.load("docs/api")
+    """
+
+    def __init__(self, path: Union[pathlib2.Path, str]) -> None:
+        """Open (or create) a scan index
+
+        :param path: database file
+        :type path: Union[pathlib2.Path, str]
+        """
+        self.path = pathlib2.Path(path) if isinstance(path, str) else path
+        self.connection = sqlite3.connect(str(self.path))
+        self.connection.executescript(_SCHEMA)
+
+    @staticmethod
+    def default_path(root: pathlib2.Path) -> pathlib2.Path:
+        """Default index location, a hidden file next to the scraped root
+
+        :param root: scraped root directory
+        :type root: pathlib2.Path
+        :return: index path
+        :rtype: pathlib2.Path
+        """
+        return root.parent / f".{root.name}.fmtree.sqlite"
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "ScanCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def get_meta(self) -> Dict[str, str]:
+        """
+        :return: metadata stored with the tree, empty if nothing was saved yet
+        :rtype: Dict[str, str]
+        """
+        return dict(self.connection.execute("SELECT key, value FROM meta"))
+
+    def validate(self, root: pathlib2.Path, settings: str = None) -> bool:
+        """Check that the index holds a tree of root, scraped with the given settings
+
+        :param root: expected root directory, the same directory must still exist there
+        :type root: pathlib2.Path
+        :param settings: expected settings (see describe_settings), not checked when None, defaults to None
+        :type settings: str, optional
+        :return: whether the stored tree can be used
+        :rtype: bool
+        """
+        meta = self.get_meta()
+        if meta.get("version") != str(SCHEMA_VERSION) or meta.get("root") != str(root):
+            return False
+        if settings is not None and meta.get("settings") != settings:
+            return False
+        try:
+            root_stat = root.stat()
+        except OSError:
+            return False
+        return meta.get("root_dev") == str(root_stat.st_dev) and meta.get("root_ino") == str(root_stat.st_ino)
+
+    def _rows(self, tree: FileNode) -> Iterator[tuple]:
+        """Rows of tree in pre-order, pruned directories come before the kept children of their parent"""
+        next_id = 0
+        stack = [(tree, None, False, 0)]
+        while stack:
+            node, parent, pruned, position = stack.pop()
+            node_id = next_id
+            next_id += 1
+            fields = list(stat_to_fields(node.get_stat()))
+            fields[1], fields[2] = _to_signed(fields[1]), _to_signed(fields[2])
+            yield (node_id, parent, node.get_depth(), node.get_filename(), str(node.get_relative_path()),
+                   _node_type(node.get_stat().st_mode), int(pruned), position, *fields)
+            children = [(child, node_id, True, index) for index, child in node.get_pruned() or []]
+            children.extend((child, node_id, False, index) for index, child in enumerate(node.get_children()))
+            stack.extend(reversed(children))
+
+    def save(self, tree: FileNode, settings: str = "") -> None:
+        """Replace the stored tree
+
+        :param tree: root node of a scraped tree (created with a root path)
+        :type tree: FileNode
+        :param settings: settings the tree was scraped with (see describe_settings), defaults to ""
+        :type settings: str, optional
+        """
+        root = tree.get_root()
+        if root is None or tree.get_path() != root:
+            raise ValueError("Only complete trees scraped with a root path can be saved")
+        root_stat = tree.get_stat()
+        meta = {"version": SCHEMA_VERSION, "root": root, "settings": settings, "root_dev": root_stat.st_dev,
+                "root_ino": root_stat.st_ino, "pruned": int(tree.get_pruned() is not None)}
+        with self.connection:
+            self.connection.execute("DELETE FROM nodes")
+            self.connection.execute("DELETE FROM meta")
+            self.connection.executemany("INSERT INTO meta (key, value) VALUES (?, ?)",
+                                        [(key, str(value)) for key, value in meta.items()])
+            self.connection.executemany(_INSERT, self._rows(tree))
+
+    def load(self, relative_path: str = None, node_class: Type[BaseNode] = FileNode) -> BaseNode:
+        """Restore the stored tree, or the subtree at relative_path, without touching the file system
+
+        :param relative_path: path of the subtree root relative to the tree root, defaults to None (whole tree)
+        :type relative_path: str, optional
+        :param node_class: FileNode or CompactFileNode, defaults to FileNode
+        :type node_class: Type[BaseNode], optional
+        :raises ValueError: nothing is stored, or there is no node at relative_path
+        :return: restored root node, depths and relative paths stay relative to the scraped root
+        :rtype: BaseNode
+        """
+        meta = self.get_meta()
+        if "root" not in meta:
+            raise ValueError(f"No tree stored in {self.path}")
+        root = pathlib2.Path(meta["root"])
+        if relative_path is None:
+            rows = self.connection.execute(f"{_SELECT} ORDER BY id")
+        else:
+            relative_path = str(pathlib2.PurePath(relative_path))
+            rows = self.connection.execute(
+                f"WITH RECURSIVE subtree(id) AS (SELECT id FROM nodes WHERE path = ? "
+                f"UNION ALL SELECT nodes.id FROM nodes JOIN subtree ON nodes.parent = subtree.id) "
+                f"{_SELECT} WHERE id IN subtree ORDER BY id", (relative_path,))
+        tree = self._build(rows, root, meta.get("pruned") == "1", node_class)
+        if tree is None:
+            raise ValueError(f"No node at {relative_path} in {self.path}")
+        return tree
+
+    @staticmethod
+    def _build(rows: Iterable[tuple], root: pathlib2.Path, pruned_recorded: bool,
+               node_class: Type[BaseNode] = FileNode) -> Union[BaseNode, None]:
+        """Assemble pre-order rows into a tree, the parent of a row is the last node one level up
+        Children and pruned directories are collected on the stack and handed to a node when it is left
+        """
+        tree = None
+        stack: List[Tuple[int, BaseNode, list, Union[list, None]]] = []
+
+        def leave() -> None:
+            _, node, children, pruned_nodes = stack.pop()
+            node.set_children(children)
+            if pruned_nodes is not None:
+                node.set_pruned(pruned_nodes)
+
+        for row in rows:
+            node_id, parent, depth, name, path, type_, pruned, position = row[:8]
+            fields = list(row[8:])
+            fields[1], fields[2] = _to_unsigned(fields[1]), _to_unsigned(fields[2])
+            node = node_class(root / path if path != "." else root, depth=depth, root=root,
+                              stat_=stat_from_fields(*fields))
+            while stack and stack[-1][0] != parent:
+                leave()
+            if stack:
+                if pruned:
+                    if stack[-1][3] is None:
+                        stack[-1] = stack[-1][:3] + ([],)
+                    stack[-1][3].append((position, node))
+                else:
+                    stack[-1][2].append(node)
+            else:
+                tree = node
+            stack.append((node_id, node, [], [] if pruned_recorded and type_ == DIR_TYPE else None))
+        while stack:
+            leave()
+        return tree
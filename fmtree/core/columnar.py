@@ -0,0 +1,438 @@
+"""
+Columnar (struct-of-arrays) file trees
+
+A ColumnarTree stores a scanned tree as one array per field instead of one Python object per node, which keeps very
+large scans small in memory and out of the way of the garbage collector. Nodes are laid out in pre-order, so the
+subtree of node i is the index range [i, end[i]) and the children of i are found by index arithmetic:
+the first child is i + 1, the next sibling of child c is end[c].
+
+Columns are array.array objects and support the buffer protocol, so they can be wrapped without copying, e.g.
+numpy.frombuffer(tree.size, dtype=numpy.int64).
+"""
+from __future__ import annotations
+import io
+import os
+import json
+import stat
+import pickle
+from array import array
+from typing import Dict, Generator, Iterable, List, Tuple, Union
+
+import pathlib2
+
+from fmtree.core.node import BaseNode, UniqueFileIdentifier, stat_from_fields
+
+
+class ColumnarTree:
+    """
+    File tree stored as columns
+    parent, end, depth, name, mode, size, mtime_ns, ino and dev hold one value per node in pre-order. Names are
+    indices into the interned string table names. Depths are relative to the top node, see get_depth().
+
+    >>> tree = ColumnarTree.from_stream(Scraper(path).stream())
+        print(TreeCommandFormatter(tree.get_node()).generate().getvalue())
+    """
+
+    def __init__(self, base: pathlib2.Path, root: pathlib2.Path = None, depth_offset: int = None) -> None:
+        """Create an empty tree, use from_tree() or from_stream() to fill it
+
+        :param base: path of the top node
+        :type base: pathlib2.Path
+        :param root: root path the tree was scraped from, defaults to None
+        :type root: pathlib2.Path, optional
+        :param depth_offset: depth of the top node relative to root, defaults to None
+        :type depth_offset: int, optional
+        """
+        self.base = base
+        self.root = root
+        self.depth_offset = depth_offset
+        self.parent = array("q")
+        self.end = array("q")
+        self.depth = array("L")
+        self.name = array("L")
+        self.mode = array("L")
+        self.size = array("q")
+        self.mtime_ns = array("q")
+        self.ino = array("Q")
+        self.dev = array("Q")
+        self.names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    def _append(self, parent: int, depth: int, node: BaseNode) -> int:
+        """Append a node, its end is set to the next index, callers extend it when descendants are appended"""
+        index = len(self.parent)
+        filename = node.get_filename()
+        name_id = self._name_ids.get(filename)
+        if name_id is None:
+            name_id = self._name_ids[filename] = len(self.names)
+            self.names.append(filename)
+        stat_ = node.get_stat()
+        self.parent.append(parent)
+        self.end.append(index + 1)
+        self.depth.append(depth)
+        self.name.append(name_id)
+        self.mode.append(stat_.st_mode)
+        self.size.append(stat_.st_size)
+        self.mtime_ns.append(stat_.st_mtime_ns)
+        self.ino.append(stat_.st_ino)
+        self.dev.append(stat_.st_dev)
+        return index
+
+    @classmethod
+    def from_tree(cls, tree: BaseNode) -> ColumnarTree:
+        """Convert a tree of nodes (e.g. FileNode) into columns
+
+        :param tree: top node of the tree
+        :type tree: BaseNode
+        :return: the columnar tree
+        :rtype: ColumnarTree
+        """
+        columnar = cls(tree.get_path(), tree.get_root(), tree.get_depth())
+        stack = [(tree, -1, 0)]
+        while stack:
+            node, parent, depth = stack.pop()
+            index = columnar._append(parent, depth, node)
+            stack.extend((child, index, depth + 1) for child in reversed(node.get_children()))
+        columnar._set_ends()
+        return columnar
+
+    @classmethod
+    def from_stream(cls, events: Iterable[Tuple[int, BaseNode, bool]]) -> ColumnarTree:
+        """Build columns from pre-order (depth, node, is_last) events, as yielded by Scraper.stream(), without
+        holding the tree as nodes in memory
+
+        :param events: pre-order (depth, node, is_last) events
+        :type events: Iterable[Tuple[int, BaseNode, bool]]
+        :raises ValueError: there are no events
+        :return: the columnar tree
+        :rtype: ColumnarTree
+        """
+        columnar = None
+        ancestors: List[int] = []
+        for depth, node, _ in events:
+            if columnar is None:
+                columnar = cls(node.get_path(), node.get_root(), node.get_depth())
+                first_depth = depth
+            del ancestors[depth - first_depth:]
+            ancestors.append(columnar._append(ancestors[-1] if ancestors else -1, depth - first_depth, node))
+        if columnar is None:
+            raise ValueError("Cannot build a tree from an empty stream")
+        columnar._set_ends()
+        return columnar
+
+    def _set_ends(self) -> None:
+        """Set end of every node to one past its last descendant, children are appended after their parent"""
+        end, parent = self.end, self.parent
+        for index in range(len(parent) - 1, 0, -1):
+            if end[index] > end[parent[index]]:
+                end[parent[index]] = end[index]
+
+    def children(self, index: int) -> Generator[int, None, None]:
+        """Indices of the children of a node
+
+        :param index: node index
+        :type index: int
+        :yield: child index
+        :rtype: Generator[int, None, None]
+        """
+        child, stop = index + 1, self.end[index]
+        while child < stop:
+            yield child
+            child = self.end[child]
+
+    def relative_parts(self, index: int) -> List[str]:
+        """Names from below the top node down to a node
+
+        :param index: node index
+        :type index: int
+        :return: names, empty for the top node
+        :rtype: List[str]
+        """
+        parts = []
+        while index > 0:
+            parts.append(self.names[self.name[index]])
+            index = self.parent[index]
+        parts.reverse()
+        return parts
+
+    def get_node(self, index: int = 0) -> ColumnarNode:
+        """Node view of an index, the top node by default
+
+        :param index: node index, defaults to 0
+        :type index: int, optional
+        :return: node view
+        :rtype: ColumnarNode
+        """
+        return ColumnarNode(self, index)
+
+    def walk(self, recursive: bool = False, no_dir: bool = False) -> Generator[ColumnarNode, None, None]:
+        """Walk through the tree from the top node, see FileNode.walk
+
+        :param recursive: Recursive Search, defaults to False
+        :type recursive: bool, optional
+        :param no_dir: Don't consider directory, defaults to False
+        :type no_dir: bool, optional
+        :yield: node view
+        :rtype: Generator[ColumnarNode, None, None]
+        """
+        return self.get_node().walk(recursive, no_dir)
+
+    def to_dict(self, index: int = 0) -> Dict:
+        """Generate dict style file node tree, same output as FileNode.to_dict
+
+        :param index: index of the node to use as root, defaults to 0
+        :type index: int, optional
+        :return: dict representing the file tree rooted at index
+        :rtype: Dict
+        """
+        root = str(self.root)
+        top_path = self.base.joinpath(*self.relative_parts(index))
+        result = None
+        stack = [(index, top_path, None)]
+        while stack:
+            node, path, siblings = stack.pop()
+            depth = self.depth[node] + self.depth_offset if self.depth_offset is not None else None
+            item = {
+                "id": f"{self.dev[node]}{self.ino[node]}",
+                "depth": depth,
+                "filename": self.names[self.name[node]],
+                "path": str(path),
+                "relative_path": str(path.relative_to(self.root) if self.root else None),
+                "root": root,
+                "children": [],
+                "st_size": self.size[node],
+            }
+            if siblings is None:
+                result = item
+            else:
+                siblings.append(item)
+            stack.extend((child, path / self.names[self.name[child]], item["children"])
+                         for child in reversed(list(self.children(node))))
+        return result
+
+    def to_json(self, indent: int = 0) -> str:
+        """Generate json style file node tree
+
+        :param indent: number of space for indent, defaults to None
+        :type indent: int, optional
+        :return: json str representing the file tree
+        :rtype: str
+        """
+        return json.dumps(self.to_dict(), indent=indent)
+
+
+class ColumnarNode(BaseNode):
+    """
+    Flyweight node view of a ColumnarTree, a tree index and an index into its columns
+    Views are created on access and implement the FileNode getters, so formatters and sorters work on columnar trees.
+    Views of the same node are equal but not identical.
+    """
+    __slots__ = ("_tree", "_index")
+
+    def __init__(self, tree: ColumnarTree, index: int) -> None:
+        """
+        :param tree: the columnar tree
+        :type tree: ColumnarTree
+        :param index: index of the node in the columns
+        :type index: int
+        """
+        self._tree = tree
+        self._index = index
+
+    def __str__(self) -> str:
+        """Columnar Node to String Form
+
+        :return: absolute path of current file node in string form
+        :rtype: str
+        """
+        return str(self.get_path().absolute())
+
+    def __eq__(self, other: BaseNode) -> bool:
+        """decide whether 2 file nodes are identical
+
+        :param other: Another File Node to compare with
+        :type other: BaseNode
+        :return: The two nodes' id (UniqueFileIdentifier) are identical
+        :rtype: bool
+        """
+        return self.get_id() == other.get_id()
+
+    def __copy__(self) -> ColumnarNode:
+        return ColumnarNode(self._tree, self._index)
+
+    def __deepcopy__(self, memo: Dict) -> ColumnarNode:
+        return ColumnarNode(self._tree, self._index)
+
+    def get_index(self) -> int:
+        """
+        :return: index of this node in the columns of its tree
+        :rtype: int
+        """
+        return self._index
+
+    def get_tree(self) -> ColumnarTree:
+        """
+        :return: the columnar tree this node belongs to
+        :rtype: ColumnarTree
+        """
+        return self._tree
+
+    def get_children(self) -> List[ColumnarNode]:
+        """Get children nodes of current file node, new views are created on every call
+
+        :return: child file nodes
+        :rtype: List[ColumnarNode]
+        """
+        return [ColumnarNode(self._tree, child) for child in self._tree.children(self._index)]
+
+    def get_parent(self) -> Union[ColumnarNode, None]:
+        """parent node getter
+
+        :return: parent node, None for the top node
+        :rtype: Union[ColumnarNode, None]
+        """
+        parent = self._tree.parent[self._index]
+        return ColumnarNode(self._tree, parent) if parent >= 0 else None
+
+    def get_path(self) -> pathlib2.Path:
+        """file path getter
+
+        :return: file path of this file node
+        :rtype: pathlib2.Path
+        """
+        return self._tree.base.joinpath(*self._tree.relative_parts(self._index))
+
+    def get_filename(self) -> str:
+        """Filename getter
+
+        :return: filename of this file node
+        :rtype: str
+        """
+        return self._tree.names[self._tree.name[self._index]]
+
+    def get_stat(self) -> os.stat_result:
+        """file node stat getter, fields other than st_mode, st_size, st_mtime_ns, st_dev and st_ino are 0
+
+        :return: stat of this file node
+        :rtype: os.stat_result
+        """
+        tree, index = self._tree, self._index
+        return stat_from_fields(tree.mode[index], tree.ino[index], tree.dev[index], 0, 0, 0, tree.size[index], 0,
+                                tree.mtime_ns[index], 0)
+
+    def get_id(self) -> UniqueFileIdentifier:
+        """FileNode id getter
+
+        :return: UniqueFileIdentifier (id) of this file node
+        :rtype: UniqueFileIdentifier
+        """
+        return UniqueFileIdentifier.from_ids(self._tree.dev[self._index], self._tree.ino[self._index])
+
+    def get_depth(self) -> int:
+        """FileNode depth relative to root getter
+
+        :return: depth of this file node with respect to root path
+        :rtype: int
+        """
+        offset = self._tree.depth_offset
+        return self._tree.depth[self._index] + offset if offset is not None else None
+
+    def get_root(self) -> pathlib2.Path:
+        """root getter
+
+        :return: node's root path
+        :rtype: pathlib2.Path
+        """
+        return self._tree.root
+
+    def get_relative_path(self) -> pathlib2.Path:
+        """file node's relative path to root getter
+
+        :return: file node's relative path, None if there is no root
+        :rtype: pathlib2.Path
+        """
+        return self.get_path().relative_to(self._tree.root) if self._tree.root else None
+
+    def is_dir(self) -> bool:
+        """Test if self is a directory
+
+        :return: whether this is a directory FileNode
+        :rtype: bool
+        """
+        return stat.S_ISDIR(self._tree.mode[self._index])
+
+    def is_file(self) -> bool:
+        """Test if self is a file
+
+        :return: whether this is a file FileNode
+        :rtype: bool
+        """
+        return stat.S_ISREG(self._tree.mode[self._index])
+
+    def get_stats(self) -> None:
+        """Subtree totals are not kept in columns, see FileNode.get_stats
+
+        :return: None
+        :rtype: None
+        """
+        return None
+
+    def to_bytes(self) -> bytes:
+        """Serialize the view, together with its whole tree"""
+        return pickle.dumps(self)
+
+    def to_stream(self, stream: io) -> None:
+        """Serialize the view, together with its whole tree, and dump to given stream"""
+        return pickle.dump(self, stream)
+
+    def to_dict(self) -> Dict:
+        """Generate dict style file node tree using self as root node, same output as FileNode.to_dict
+
+        :return: dict representing file tree rooted at self
+        :rtype: Dict
+        """
+        return self._tree.to_dict(self._index)
+
+    def to_json(self, indent: int = 0) -> str:
+        """Generate json style file node tree using self as root node
+
+        :param indent: number of space for indent, defaults to None
+        :type indent: int, optional
+        :return: json str representing file tree rooted at self
+        :rtype: str
+        """
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def walk(self, recursive: bool = False, no_dir: bool = False) -> Generator[ColumnarNode, None, None]:
+        """Walk through the children (recursively) in pre-order, see FileNode.walk
+
+        :param recursive: Recursive Search, defaults to False
+        :type recursive: bool, optional
+        :param no_dir: Don't consider directory, defaults to False
+        :type no_dir: bool, optional
+        :yield: A file node
+        :rtype: Generator[ColumnarNode, None, None]
+        """
+        tree = self._tree
+        if not no_dir:
+            yield self
+        if not recursive:
+            for child in tree.children(self._index):
+                if stat.S_ISREG(tree.mode[child]):
+                    yield ColumnarNode(tree, child)
+            return
+        index, stop = self._index + 1, tree.end[self._index]
+        while index < stop:
+            mode = tree.mode[index]
+            if stat.S_ISDIR(mode):
+                if not no_dir:
+                    yield ColumnarNode(tree, index)
+                index += 1
+            elif stat.S_ISREG(mode):
+                yield ColumnarNode(tree, index)
+                index += 1
+            else:
+                index = tree.end[index]
@@ -0,0 +1,345 @@
+"""
+Filters deciding on file content
+
+A ContentFilter reads at most max_bytes from the start of every file it has to decide on, into a buffer reused by the
+thread reading it, and passes the bytes read to check(). Files of one listing are read on a thread pool, either passed
+in or owned by the filter, which shuts its own pool down in close(), at the end of a with block or once collected.
+Verdicts are cached by (st_dev, st_ino, st_mtime_ns, st_size), so scraping again (with the same filter object) does
+not read unchanged files again. Directories and other non-files are kept, as with the other file filters, and so are
+files whose name does not end with one of the extensions the filter is limited to.
+
+Put content filters after name based filters in a scraper's filter list, so they only read what the others keep.
+"""
+import re
+import struct
+import weakref
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Tuple, Union
+
+import pathlib2
+
+from fmtree.core.filter import BaseFileFilter, IGNORE_MODE
+
+DEFAULT_MAX_BYTES = 4096
+
+_local = threading.local()
+
+
+def read_head(path: pathlib2.Path, max_bytes: int) -> memoryview:
+    """Read up to max_bytes from the start of a file into the buffer of the calling thread
+    The view is only valid until the same thread reads the next file.
+
+    :param path: file to read
+    :type path: pathlib2.Path
+    :param max_bytes: maximum number of bytes to read
+    :type max_bytes: int
+    :raises OSError: the file cannot be read
+    :return: bytes read
+    :rtype: memoryview
+    """
+    buffer = getattr(_local, "buffer", None)
+    if buffer is None or len(buffer) < max_bytes:
+        buffer = _local.buffer = bytearray(max_bytes)
+    view = memoryview(buffer)[:max_bytes]
+    with open(str(path), "rb", buffering=0) as f:
+        size = 0
+        while size < max_bytes:
+            read = f.readinto(view[size:])
+            if not read:
+                break
+            size += read
+    return view[:size]
+
+
+class ContentFilter(BaseFileFilter):
+    """
+    Base class of filters deciding on the first bytes of files, see the module docstring
+    Subclasses implement check().
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, extensions: Iterable[str] = None, workers: int = 8,
+                 ignore_list: Iterable = None, root_path: pathlib2.Path = None, mode: int = IGNORE_MODE,
+                 prune_list: Iterable = None, executor: Executor = None) -> None:
+        """ContentFilter Initializer
+
+        :param max_bytes: number of bytes read from the start of a file at most, defaults to DEFAULT_MAX_BYTES
+        :type max_bytes: int, optional
+        :param extensions: only files ending with one of these are checked, others are kept, defaults to None (all)
+        :type extensions: Iterable[str], optional
+        :param workers: number of threads reading files of a listing, 1 reads them one by one, defaults to 8
+        :type workers: int, optional
+        :param ignore_list: list of regex to ignore, see BaseFileFilter, defaults to None
+        :type ignore_list: Iterable, optional
+        :param root_path: path to scrape, defaults to None
+        :type root_path: pathlib2.Path, optional
+        :param mode: mode of ignore_list, see BaseFileFilter, defaults to IGNORE_MODE
+        :type mode: int, optional
+        :param prune_list: directories not to descend into, see BaseFileFilter, defaults to None
+        :type prune_list: Iterable, optional
+        :param executor: executor reading files, left running by close(), defaults to None (a thread pool of workers
+            threads, started on first use and shut down by close())
+        :type executor: Executor, optional
+        """
+        super(ContentFilter, self).__init__(ignore_list=ignore_list, root_path=root_path, mode=mode,
+                                            prune_list=prune_list)
+        self.max_bytes = max_bytes
+        self.extensions = tuple(extensions) if extensions is not None else None
+        self.workers = workers
+        self._verdicts: Dict[Tuple[int, int, int, int], bool] = {}
+        self._executor = executor
+        self._executor_lock = threading.Lock()
+        self._finalizer = None
+
+    def get_executor(self) -> Executor:
+        """
+        :return: the executor passed in, else the filter's own thread pool, started on the first call
+        :rtype: Executor
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="fmtree-content")
+                # shut down with the filter when it is not closed
+                self._finalizer = weakref.finalize(self, self._executor.shutdown, wait=False)
+            return self._executor
+
+    def close(self) -> None:
+        """Shut down the thread pool of the filter, a later listing starts a new one; an executor passed in is left
+        running
+        """
+        with self._executor_lock:
+            if self._finalizer is not None:
+                self._finalizer()
+                self._finalizer = self._executor = None
+
+    def __enter__(self) -> "ContentFilter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def check(self, head: memoryview) -> bool:
+        """Decide on a file by its first bytes
+
+        :param head: up to max_bytes from the start of the file, only valid during the call
+        :type head: memoryview
+        :raises NotImplementedError: Abstract method has to be implemented
+        :return: whether to keep the file
+        :rtype: bool
+        """
+        raise NotImplementedError
+
+    def clear_cache(self) -> None:
+        """Forget all verdicts"""
+        self._verdicts = {}
+
+    def sniff(self, path: pathlib2.Path) -> bool:
+        """Read the start of a file and check() it, unreadable files are dropped
+
+        :param path: file to decide on
+        :type path: pathlib2.Path
+        :return: whether to keep the file
+        :rtype: bool
+        """
+        try:
+            head = read_head(path, self.max_bytes)
+        except OSError:
+            return False
+        try:
+            return bool(self.check(head))
+        finally:
+            head.release()
+
+    def _sniff_all(self, paths: List[pathlib2.Path]) -> List[bool]:
+        return [self.sniff(path) for path in paths]
+
+    def filter(self, items: Iterable) -> Iterable:
+        items = list(items)
+        verdicts: List[Union[bool, None]] = []
+        pending = []
+        for path in items:
+            if not path.is_file() or (self.extensions is not None and not path.name.endswith(self.extensions)):
+                verdicts.append(True)
+                continue
+            try:
+                stat_ = path.stat()
+            except OSError:
+                verdicts.append(False)
+                continue
+            key = (stat_.st_dev, stat_.st_ino, stat_.st_mtime_ns, stat_.st_size)
+            verdict = self._verdicts.get(key)
+            if verdict is None:
+                pending.append((len(verdicts), path, key))
+            verdicts.append(verdict)
+        if len(pending) > 1 and self.workers > 1:
+            # one task per worker rather than per file, handing over a few bytes of work per task costs more
+            paths = [path for _, path, _ in pending]
+            step = -(-len(paths) // self.workers)
+            results = []
+            for chunk in self.get_executor().map(self._sniff_all, [paths[i:i + step] for i in range(0, len(paths), step)]):
+                results.extend(chunk)
+        else:
+            results = [self.sniff(path) for _, path, _ in pending]
+        for (index, _, key), verdict in zip(pending, results):
+            verdicts[index] = self._verdicts[key] = verdict
+        return [path for path, verdict in zip(items, verdicts) if verdict]
+
+
+class TextFilter(ContentFilter):
+    """
+    Keep text files (or only binary files), a file is text when its first bytes have no NUL byte and are valid UTF-8
+    """
+
+    def __init__(self, text: bool = True, **kwargs) -> None:
+        """TextFilter Initializer
+
+        :param text: keep text files when True, binary files when False, defaults to True
+        :type text: bool, optional
+        :param kwargs: see ContentFilter
+        """
+        super(TextFilter, self).__init__(**kwargs)
+        self.text = text
+
+    @staticmethod
+    def is_text(head: memoryview) -> bool:
+        """
+        :param head: first bytes of a file
+        :type head: memoryview
+        :return: whether they look like text, a multi-byte character cut off at the end is allowed
+        :rtype: bool
+        """
+        data = bytes(head)
+        if b"\x00" in data:
+            return False
+        try:
+            data.decode("utf-8")
+        except UnicodeDecodeError as e:
+            # a character cut off by max_bytes is at most 3 bytes long
+            return e.reason == "unexpected end of data" and e.start >= len(data) - 3
+        return True
+
+    def check(self, head: memoryview) -> bool:
+        return self.is_text(head) == self.text
+
+
+_FRONT_MATTER = re.compile(rb"\A(?:\xef\xbb\xbf)?---[ \t]*\r?\n(.*?)^(?:---|\.\.\.)[ \t]*$", re.DOTALL | re.MULTILINE)
+_FIELD = re.compile(r"^([A-Za-z0-9_-]+)[ \t]*:[ \t]*(.*?)[ \t]*$", re.MULTILINE)
+
+
+def parse_front_matter(head: memoryview) -> Union[Dict[str, str], None]:
+    """Top level "key: value" fields of the YAML front matter at the start of a file
+    Values are returned as written, without quotes, nested structures are not parsed.
+
+    :param head: first bytes of a file
+    :type head: memoryview
+    :return: fields, None when there is no complete front matter block in head
+    :rtype: Union[Dict[str, str], None]
+    """
+    match = _FRONT_MATTER.match(head)
+    if match is None:
+        return None
+    fields = {}
+    for key, value in _FIELD.findall(match.group(1).decode("utf-8", "replace")):
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+            value = value[1:-1]
+        fields[key] = value
+    return fields
+
+
+class FrontMatterFilter(ContentFilter):
+    """
+    Keep markdown files whose front matter has the given field values, e.g. FrontMatterFilter({"draft": False})
+    Files without front matter are dropped, as are files whose front matter does not fit in max_bytes.
+    """
+
+    def __init__(self, fields: Dict[str, Union[str, int, float, bool, None]], extensions: Iterable[str] = (".md",),
+                 **kwargs) -> None:
+        """FrontMatterFilter Initializer
+
+        :param fields: required values by field name, compared as YAML scalars ("false", "False" and False are equal)
+        :type fields: Dict[str, Union[str, int, float, bool, None]]
+        :param extensions: files to check, others are kept, defaults to (".md",)
+        :type extensions: Iterable[str], optional
+        :param kwargs: see ContentFilter
+        """
+        super(FrontMatterFilter, self).__init__(extensions=extensions, **kwargs)
+        self.fields = {key: self._scalar(value) for key, value in fields.items()}
+
+    @staticmethod
+    def _scalar(value: Union[str, int, float, bool, None]) -> str:
+        if value is None:
+            return "null"
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        value = str(value)
+        lowered = value.lower()
+        if lowered in ("true", "false", "null", "~", ""):
+            return "null" if lowered in ("~", "") else lowered
+        return value
+
+    def check(self, head: memoryview) -> bool:
+        fields = parse_front_matter(head)
+        if fields is None:
+            return False
+        return all(key in fields and self._scalar(fields[key]) == value for key, value in self.fields.items())
+
+
+_PNG = b"\x89PNG\r\n\x1a\n"
+
+
+def image_format(head: memoryview) -> Union[str, None]:
+    """Format of an image whose header parses, from the first bytes of a file
+    PNG, GIF, JPEG, BMP, WEBP, AVIF and SVG are recognized; images with zero width or height are not.
+
+    :param head: first bytes of a file
+    :type head: memoryview
+    :return: "png", "gif", "jpeg", "bmp", "webp", "avif" or "svg", None when the header does not parse
+    :rtype: Union[str, None]
+    """
+    data = bytes(head[:64])
+    if data.startswith(_PNG):
+        if len(data) >= 24 and data[12:16] == b"IHDR":
+            width, height = struct.unpack(">II", data[16:24])
+            return "png" if width and height else None
+        return None
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        if len(data) >= 10:
+            width, height = struct.unpack("<HH", data[6:10])
+            return "gif" if width and height else None
+        return None
+    if data[:3] == b"\xff\xd8\xff":
+        return "jpeg"
+    if data[:2] == b"BM" and len(data) >= 26:
+        header_size = struct.unpack("<I", data[14:18])[0]
+        if header_size >= 40:
+            width, height = struct.unpack("<ii", data[18:26])
+            return "bmp" if width and height else None
+        return None
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    if data[4:8] == b"ftyp" and data[8:12] in (b"avif", b"avis"):
+        return "avif"
+    text = bytes(head).lstrip(b"\xef\xbb\xbf \t\r\n")
+    if text.startswith((b"<?xml", b"<svg", b"<!--", b"<!DOCTYPE svg")) and b"<svg" in text:
+        return "svg"
+    return None
+
+
+class ImageHeaderFilter(ContentFilter):
+    """
+    Keep files whose header parses as an image (see image_format), whatever their name
+    """
+
+    def __init__(self, formats: Iterable[str] = None, **kwargs) -> None:
+        """ImageHeaderFilter Initializer
+
+        :param formats: formats to keep (see image_format), defaults to None (all)
+        :type formats: Iterable[str], optional
+        :param kwargs: see ContentFilter
+        """
+        super(ImageHeaderFilter, self).__init__(**kwargs)
+        self.formats = tuple(formats) if formats is not None else None
+
+    def check(self, head: memoryview) -> bool:
+        format_ = image_format(head)
+        return format_ is not None and (self.formats is None or format_ in self.formats)
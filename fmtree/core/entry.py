@@ -0,0 +1,97 @@
+"""
+Directory entries as paths
+
+Scraper.scan_dir hands filters FileEntry objects instead of plain paths. A FileEntry is a pathlib2.Path which answers
+is_dir(), is_file(), is_symlink(), stat() and lstat() from the os.DirEntry it was listed with: the entry type comes
+with the directory listing (no system call on most file systems) and a stat is made at most once per entry. Its string
+is the one os.scandir already built, so str(path) does not join the parts again. Filters deciding on names and entry
+types therefore do no file system access at all.
+
+Answers reflect the file system at listing time, as a DirEntry does. Paths derived from a FileEntry (parent, joinpath,
+...) and a FileEntry after detach() behave as plain paths.
+"""
+import os
+
+import pathlib2
+
+_ConcretePath = type(pathlib2.Path())
+
+
+class FileEntry(_ConcretePath):
+    """
+    pathlib2.Path over an os.DirEntry, see the module docstring
+
+    >>> with os.scandir(str(directory)) as it:
+            paths = [FileEntry.from_dir_entry(directory, entry) for entry in it]
+    """
+    __slots__ = ("_entry",)
+
+    def _init(self, *args, **kwargs) -> None:
+        super(FileEntry, self)._init(*args, **kwargs)
+        self._entry = None
+
+    @classmethod
+    def from_dir_entry(cls, directory: pathlib2.Path, entry: os.DirEntry) -> "FileEntry":
+        """Path of an entry listed by os.scandir(str(directory))
+
+        :param directory: listed directory
+        :type directory: pathlib2.Path
+        :param entry: entry of the listing
+        :type entry: os.DirEntry
+        :return: path of the entry
+        :rtype: FileEntry
+        """
+        self = cls._from_parsed_parts(directory._drv, directory._root, directory._parts + [entry.name])
+        self._str = entry.path
+        self._entry = entry
+        return self
+
+    def get_entry(self) -> os.DirEntry:
+        """
+        :return: the DirEntry answering type and stat queries, None when detached
+        :rtype: os.DirEntry
+        """
+        return self._entry
+
+    def detach(self) -> "FileEntry":
+        """Drop the DirEntry (e.g. before storing the path in a tree), later queries go to the file system
+
+        :return: self
+        :rtype: FileEntry
+        """
+        self._entry = None
+        return self
+
+    def stat(self) -> os.stat_result:
+        if self._entry is None:
+            return super(FileEntry, self).stat()
+        return self._entry.stat()
+
+    def lstat(self) -> os.stat_result:
+        if self._entry is None:
+            return super(FileEntry, self).lstat()
+        return self._entry.stat(follow_symlinks=False)
+
+    def is_dir(self) -> bool:
+        if self._entry is None:
+            return super(FileEntry, self).is_dir()
+        try:
+            return self._entry.is_dir()
+        except OSError:
+            return False
+
+    def is_file(self) -> bool:
+        if self._entry is None:
+            return super(FileEntry, self).is_file()
+        try:
+            return self._entry.is_file()
+        except OSError:
+            return False
+
+    def is_symlink(self) -> bool:
+        if self._entry is None:
+            return super(FileEntry, self).is_symlink()
+        try:
+            return self._entry.is_symlink()
+        except OSError:
+            return False
@@ -0,0 +1,178 @@
+"""
+Streaming JSON and NDJSON export of file trees
+
+Trees are written piece by piece with an explicit stack instead of building the nested dict of FileNode.to_dict and
+one string of it, so memory only grows with the depth of the tree. Both work on a tree or on the pre-order
+(depth, node, is_last) events of Scraper.stream(), in which case the tree is never held in memory.
+The JSON output is identical to json.dumps(tree.to_dict(), indent=indent).
+"""
+import io
+import json
+from typing import Generator, Iterable, List, Tuple, Union
+
+from fmtree.core.node import BaseNode
+
+_encode = json.JSONEncoder().encode
+_BUFFER_SIZE = 1 << 16
+
+
+def tree_events(tree: BaseNode) -> Generator[Tuple[int, BaseNode, bool], None, None]:
+    """Pre-order (depth, node, is_last) events of a tree, like Scraper.stream(), depth is relative to tree
+
+    :param tree: top node of the tree
+    :type tree: BaseNode
+    :yield: depth below tree, node and whether it is the last child of its parent
+    :rtype: Generator[Tuple[int, BaseNode, bool], None, None]
+    """
+    stack = [(0, tree, True)]
+    while stack:
+        depth, node, is_last = stack.pop()
+        yield depth, node, is_last
+        children = node.get_children()
+        stack.extend((depth + 1, child, index == 0) for index, child in enumerate(reversed(children)))
+
+
+def _fields(node: BaseNode) -> List[Tuple[str, str]]:
+    """Encoded fields of FileNode.to_dict before "children" """
+    return [
+        ('"id"', _encode(str(node.get_id()))),
+        ('"depth"', _encode(node.get_depth())),
+        ('"filename"', _encode(node.get_filename())),
+        ('"path"', _encode(str(node.get_path()))),
+        ('"relative_path"', _encode(str(node.get_relative_path()))),
+        ('"root"', _encode(str(node.get_root()))),
+    ]
+
+
+def iter_json_from_stream(events: Iterable[Tuple[int, BaseNode, bool]],
+                          indent: Union[int, str] = None) -> Generator[str, None, None]:
+    """Encode pre-order (depth, node, is_last) events as nested JSON, piece by piece
+
+    :param events: pre-order (depth, node, is_last) events, e.g. Scraper.stream()
+    :type events: Iterable[Tuple[int, BaseNode, bool]]
+    :param indent: indent as in json.dumps, defaults to None
+    :type indent: Union[int, str], optional
+    :yield: pieces of the JSON document
+    :rtype: Generator[str, None, None]
+    """
+    if indent is not None and not isinstance(indent, str):
+        indent = " " * indent
+
+    def newline(level: int) -> str:
+        return "" if indent is None else "\n" + indent * level
+
+    item_separator = ", " if indent is None else ","
+    # per open node: encoded st_size, whether a child was written
+    stack: List[List] = []
+
+    def close() -> str:
+        level = len(stack) - 1
+        st_size, has_children = stack.pop()
+        return (newline(2 * level + 1) if has_children else "") + "]" + item_separator + newline(2 * level + 1) + \
+            '"st_size": ' + st_size + newline(2 * level) + "}"
+
+    first_depth = None
+    for depth, node, _ in events:
+        if first_depth is None:
+            first_depth = depth
+        level = depth - first_depth
+        while len(stack) > level:
+            yield close()
+        if stack:
+            yield (item_separator if stack[-1][1] else "") + newline(2 * level)
+            stack[-1][1] = True
+        key_indent = newline(2 * level + 1)
+        yield "{" + key_indent + (item_separator + key_indent).join(key + ": " + value for key, value in _fields(node))
+        yield item_separator + key_indent + '"children": ['
+        stack.append([_encode(node.get_stat().st_size), False])
+    while stack:
+        yield close()
+
+
+def iter_json(tree: BaseNode, indent: Union[int, str] = None) -> Generator[str, None, None]:
+    """Encode a tree as nested JSON, piece by piece, see iter_json_from_stream
+
+    :param tree: top node of the tree
+    :type tree: BaseNode
+    :param indent: indent as in json.dumps, defaults to None
+    :type indent: Union[int, str], optional
+    :yield: pieces of the JSON document
+    :rtype: Generator[str, None, None]
+    """
+    return iter_json_from_stream(tree_events(tree), indent)
+
+
+def iter_ndjson_from_stream(events: Iterable[Tuple[int, BaseNode, bool]]) -> Generator[str, None, None]:
+    """Encode pre-order (depth, node, is_last) events as NDJSON, one object per node and line
+    Objects have the fields of FileNode.to_dict without "children", plus "index", the position of the node in
+    pre-order, and "parent", the index of the parent node (null for the top node)
+
+    :param events: pre-order (depth, node, is_last) events, e.g. Scraper.stream()
+    :type events: Iterable[Tuple[int, BaseNode, bool]]
+    :yield: lines, with trailing newline
+    :rtype: Generator[str, None, None]
+    """
+    ancestors: List[int] = []
+    first_depth = None
+    for index, (depth, node, _) in enumerate(events):
+        if first_depth is None:
+            first_depth = depth
+        del ancestors[depth - first_depth:]
+        fields = [('"index"', _encode(index)), ('"parent"', _encode(ancestors[-1] if ancestors else None))]
+        fields.extend(_fields(node))
+        fields.append(('"st_size"', _encode(node.get_stat().st_size)))
+        yield "{" + ", ".join(key + ": " + value for key, value in fields) + "}\n"
+        ancestors.append(index)
+
+
+def iter_ndjson(tree: BaseNode) -> Generator[str, None, None]:
+    """Encode a tree as NDJSON, see iter_ndjson_from_stream
+
+    :param tree: top node of the tree
+    :type tree: BaseNode
+    :yield: lines, with trailing newline
+    :rtype: Generator[str, None, None]
+    """
+    return iter_ndjson_from_stream(tree_events(tree))
+
+
+def write_pieces(pieces: Iterable[str], stream: io.TextIOBase) -> None:
+    """Write pieces to a text stream, joined in batches of about 64 KiB to avoid one write call per piece
+
+    :param pieces: strings to write
+    :type pieces: Iterable[str]
+    :param stream: stream to write to
+    :type stream: io.TextIOBase
+    """
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= _BUFFER_SIZE:
+            stream.write("".join(buffer))
+            buffer, size = [], 0
+    stream.write("".join(buffer))
+
+
+def dump_json(tree: BaseNode, stream: io.TextIOBase, indent: Union[int, str] = None) -> None:
+    """Write a tree as nested JSON to a text stream, same output as json.dumps(tree.to_dict(), indent=indent)
+
+    :param tree: top node of the tree
+    :type tree: BaseNode
+    :param stream: stream to write to
+    :type stream: io.TextIOBase
+    :param indent: indent as in json.dumps, defaults to None
+    :type indent: Union[int, str], optional
+    """
+    write_pieces(iter_json(tree, indent), stream)
+
+
+def dump_ndjson(tree: BaseNode, stream: io.TextIOBase) -> None:
+    """Write a tree as NDJSON to a text stream, see iter_ndjson_from_stream
+
+    :param tree: top node of the tree
+    :type tree: BaseNode
+    :param stream: stream to write to
+    :type stream: io.TextIOBase
+    """
+    write_pieces(iter_ndjson(tree), stream)
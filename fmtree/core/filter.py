@@ -1,8 +1,9 @@
+import os
 import pathlib2
 from abc import ABC, abstractmethod
 
 import re
-from typing import List, Iterable, TypeVar
+from typing import Any, Callable, List, Iterable, TypeVar, Union
 
 from .constants import HTML_IMAGE_EXTENSIONS
 
@@ -11,6 +12,45 @@ ACCEPT_MODE = 0
 IGNORE_MODE = 1
 
 
+def describe_value(value: Any) -> str:
+    """Describe a filter setting the same way in every process: patterns by their source, sets and dicts in sorted
+    order, functions by qualified name (their repr holds an address) and filters by their describe()
+
+    :param value: setting
+    :type value: Any
+    :return: description
+    :rtype: str
+    """
+    if isinstance(value, BaseFileFilter):
+        return value.describe()
+    if isinstance(value, re.Pattern):
+        return repr(value.pattern)
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(map(describe_value, value)) + "]"
+    if isinstance(value, (set, frozenset)):
+        return "{" + ", ".join(sorted(map(describe_value, value))) + "}"
+    if isinstance(value, dict):
+        return "{" + ", ".join(sorted(f"{describe_value(key)}: {describe_value(item)}"
+                                      for key, item in value.items())) + "}"
+    if callable(value) and hasattr(value, "__qualname__"):
+        return f"{value.__module__}.{value.__qualname__}"
+    return repr(value)
+
+
+def describe_object(object_: Any, settings: dict) -> str:
+    """Describe an object as its qualified type name and settings, "module.Type(key=value, ...)" with keys sorted
+
+    :param object_: object to describe
+    :type object_: Any
+    :param settings: settings of object_ by name
+    :type settings: dict
+    :return: description
+    :rtype: str
+    """
+    state = ", ".join(f"{key}={describe_value(value)}" for key, value in sorted(settings.items()))
+    return f"{type(object_).__module__}.{type(object_).__qualname__}({state})"
+
+
 class BaseFilter(ABC):
     """
     Path filter abstract class
@@ -39,8 +79,18 @@ class BaseFilter(ABC):
 
 
 class BaseFileFilter(BaseFilter):
-
-    def __init__(self, ignore_list: Iterable = None, root_path: pathlib2.Path = None, mode: int = IGNORE_MODE) -> None:
+    # True when the filter keeps exactly the paths passing the ignore_list stage of __call__ and keep(), which lets
+    # compile_filters merge it with its neighbours (see keep); a subclass defining filter() or __call__ opts out
+    # unless it sets per_item again
+    per_item = False
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super(BaseFileFilter, cls).__init_subclass__(**kwargs)
+        if "per_item" not in vars(cls) and ("filter" in vars(cls) or "__call__" in vars(cls)):
+            cls.per_item = False
+
+    def __init__(self, ignore_list: Iterable = None, root_path: pathlib2.Path = None, mode: int = IGNORE_MODE,
+                 prune_list: Iterable = None) -> None:
         """BaseFilter Initializer
 
         :param ignore_list: list of regex to ignore, defaults to None
@@ -49,9 +99,13 @@ class BaseFileFilter(BaseFilter):
         :type root_path: pathlib2.Path, optional
         :param mode: whether the filter is for keeping files or filtering out files, defaults to IGNORE_MODE
         :type mode: int, optional
+        :param prune_list: list of regex of directories (relative path, full match) not to descend into, see prune(),
+            defaults to None
+        :type prune_list: Iterable, optional
         """
 
         self.ignore_list = list(map(re.compile, ignore_list)) if ignore_list else []
+        self.prune_list = list(map(re.compile, prune_list)) if prune_list else []
         self.root_path = root_path
         assert mode == ACCEPT_MODE or mode == IGNORE_MODE
         self.mode = mode
@@ -64,6 +118,39 @@ class BaseFileFilter(BaseFilter):
         """
         self.root_path = root_path.resolve().absolute()
 
+    def describe(self) -> str:
+        """Describe the settings of the filter, equal settings are described the same way in every process
+        A scan index is only reused by scrapers whose filters have the same descriptions (see cache.describe_settings).
+        The public attributes are described (see describe_value), except root_path; subclasses keeping settings in
+        private attributes pass them to _describe, caches and other private state are left out.
+
+        :return: description
+        :rtype: str
+        """
+        return self._describe()
+
+    def _describe(self, **settings) -> str:
+        public = {key: value for key, value in vars(self).items() if not key.startswith("_") and key != "root_path"}
+        public.update(settings)
+        return describe_object(self, public)
+
+    def begin_scrape(self) -> None:
+        """Called by the scraper before every scrape, filters keeping state that may be outdated by then (e.g. files
+        read from the scraped tree) drop it here
+        """
+
+    def reuses_listing(self, directory: pathlib2.Path) -> bool:
+        """Whether the entries this filter kept of a directory in the previous scrape are still the ones it keeps, as
+        long as the directory itself is unchanged, so an incremental rescan may reuse them (see Scraper.run).
+        Filters deciding on more than the entries themselves return False once that changed.
+
+        :param directory: directory about to be rescanned
+        :type directory: pathlib2.Path
+        :return: whether the previous listing of directory may be reused
+        :rtype: bool
+        """
+        return True
+
     # @abstractmethod
     def filter(self, items: Iterable) -> Iterable:
         """apply filter to iterable
@@ -76,6 +163,63 @@ class BaseFileFilter(BaseFilter):
         """
         raise NotImplementedError
 
+    def prune_patterns(self) -> List[re.Pattern]:
+        """Patterns of directories (relative path, full match) that prune() skips
+        Besides prune_list, in IGNORE_MODE an ignore_list pattern "<dir>/.*" or "<dir>/.+" ignores everything below
+        the directories fully matching <dir>, so they are pruned as well (patterns with "|" are left alone)
+
+        :return: compiled patterns
+        :rtype: List[re.Pattern]
+        """
+        patterns = list(self.prune_list)
+        if self.mode == IGNORE_MODE:
+            for pattern in self.ignore_list:
+                source = pattern.pattern
+                if isinstance(source, str) and source.endswith(("/.*", "/.+")) and "|" not in source:
+                    try:
+                        patterns.append(re.compile(source[:-3], pattern.flags))
+                    except re.error:
+                        continue
+        return patterns
+
+    def prune(self, path: pathlib2.Path) -> bool:
+        """Decide, before it is listed, that nothing in a directory is kept, so the scraper does not descend into it
+        A pruned directory is treated as having no kept children (it stays in the tree only with keep_empty_dir).
+        Override to prune on other grounds.
+
+        :param path: directory about to be scraped
+        :type path: pathlib2.Path
+        :return: whether to skip the directory as a whole
+        :rtype: bool
+        """
+        patterns = self.prune_patterns()
+        if not patterns:
+            return False
+        relative_path = str(path.relative_to(self.root_path))
+        return any(pattern.fullmatch(relative_path) for pattern in patterns)
+
+    def keep(self, path: pathlib2.Path) -> bool:
+        """Decide on a single path, filters that decide path by path implement this and filter() with it and set
+        per_item, which lets compile_filters merge them into one pass
+
+        :param path: path to decide on
+        :type path: pathlib2.Path
+        :raises NotImplementedError: the filter only works on whole lists, see filter()
+        :return: whether to keep path
+        :rtype: bool
+        """
+        raise NotImplementedError
+
+    def keep_test(self) -> Callable[[pathlib2.Path, dict], bool]:
+        """keep() as used by compile_filters, a function of a path and a dict shared by all tests of that path (e.g.
+        to compute its stat or relative path once), override to compile the decision ahead of the pass
+
+        :return: function telling whether to keep a path
+        :rtype: Callable[[pathlib2.Path, dict], bool]
+        """
+        keep = self.keep
+        return lambda path, cache: keep(path)
+
     def __call__(self, paths: Iterable[pathlib2.Path]) -> Iterable[pathlib2.Path]:
         """__call__ function to apply filter
         A wrapper for self.filter, pre-filter based on ignore_list first, then pass the result into self.filter
@@ -97,6 +241,7 @@ class BaseFileFilter(BaseFilter):
 
 class IdentityFilter(BaseFileFilter):
     """Useless filter, return what it receives"""
+    per_item = True
 
     def filter(self, items: Iterable) -> Iterable:
         """return what it gets directly, does no filtering
@@ -108,24 +253,32 @@ class IdentityFilter(BaseFileFilter):
         """
         return items
 
+    def keep(self, path: pathlib2.Path) -> bool:
+        return True
+
 
 class MarkdownFilter(BaseFileFilter):
     """
     A filter that keeps only markdown files and intermediate directories (non-files)
     """
+    per_item = True
 
     def filter(self, items: Iterable) -> Iterable:
-        return list(
-            filter(lambda path: path.name.endswith(".md") and path.is_file() if path.is_file() else True, items))
+        return [path for path in items if self.keep(path)]
+
+    def keep(self, path: pathlib2.Path) -> bool:
+        # markdown names are kept whether they are files or not, so only other names need the entry type
+        return path.name.endswith(".md") or not path.is_file()
 
 
 class ExtensionFilter(BaseFileFilter):
     """
     A filter that only keeps files with given extensions and intermediate directories (non-files)
     """
+    per_item = True
 
     def __init__(self, extensions: List[str], ignore_list: Iterable = None, root_path: pathlib2.Path = None,
-                 mode: int = IGNORE_MODE) -> None:
+                 mode: int = IGNORE_MODE, prune_list: Iterable = None) -> None:
         """Initialize Extension Filter
 
         :param extensions: list of allowed file extensions
@@ -136,35 +289,52 @@ class ExtensionFilter(BaseFileFilter):
         :type root_path: pathlib2.Path, optional
         :param mode: [description], defaults to IGNORE_MODE
         :type mode: int, optional
+        :param prune_list: directories not to descend into, see BaseFileFilter, defaults to None
+        :type prune_list: Iterable, optional
         """
-        super(ExtensionFilter, self).__init__(ignore_list=ignore_list, root_path=root_path, mode=mode)
+        super(ExtensionFilter, self).__init__(ignore_list=ignore_list, root_path=root_path, mode=mode,
+                                              prune_list=prune_list)
         self._extensions = extensions
 
+    def describe(self) -> str:
+        # the order of the extensions does not matter, ImageFilter builds them from a set
+        return self._describe(extensions=sorted(set(self._extensions)))
+
     def filter(self, items: List[T]) -> List[T]:
         """
         Decide if the given path has one of the allowed extensions (self._extensions)
         :param items: Iterable, files to be filtered
         :return: filtered files with either directory or allowed extensions
         """
-        return list(
-            filter(lambda filepath: sum(
-                map(lambda ext: filepath.name.endswith(ext) or filepath.is_dir(), self._extensions)) > 0, items))
+        return [filepath for filepath in items if self.keep(filepath)]
+
+    def keep(self, path: pathlib2.Path) -> bool:
+        """
+        :param path: path to decide on
+        :return: whether path is a directory or has one of the allowed extensions, never when there are none
+        """
+        return bool(self._extensions) and (path.name.endswith(tuple(self._extensions)) or path.is_dir())
 
 
 class RegexFilter(BaseFileFilter):
     """
     Filter with Regular Expression
     """
+    per_item = True
 
     def __init__(self, regex_patterns: List[str], ignore_list: Iterable = None, root_path: pathlib2.Path = None,
-                 mode: int = IGNORE_MODE) -> None:
+                 mode: int = IGNORE_MODE, prune_list: Iterable = None) -> None:
         """
         Initialize a Regular Expression Filter with a regex pattern
         :param regex_patterns: regular expression list
         """
-        super(RegexFilter, self).__init__(ignore_list=ignore_list, root_path=root_path, mode=mode)
+        super(RegexFilter, self).__init__(ignore_list=ignore_list, root_path=root_path, mode=mode,
+                                          prune_list=prune_list)
         self._patterns = [re.compile(pattern) for pattern in regex_patterns]
 
+    def describe(self) -> str:
+        return self._describe(patterns=self._patterns)
+
     def filter(self, items: Iterable) -> Iterable:
         """
         Take a path and decide whether it matches the regular expression self._pattern
@@ -172,10 +342,14 @@ class RegexFilter(BaseFileFilter):
         :return: Iterable: filter out file paths that don't match regular expression
         """
 
-        return list(
-            filter(lambda filepath: sum(
-                map(lambda pattern: pattern.match(str(filepath)) is not None or filepath.is_dir(), self._patterns)) > 0,
-                items))
+        return [filepath for filepath in items if self.keep(filepath)]
+
+    def keep(self, path: pathlib2.Path) -> bool:
+        """
+        :param path: path to decide on
+        :return: whether path is a directory or matches one of the patterns, never when there are none
+        """
+        return bool(self._patterns) and (any(pattern.match(str(path)) for pattern in self._patterns) or path.is_dir())
 
 
 class ImageFilter(ExtensionFilter):
@@ -184,7 +358,7 @@ class ImageFilter(ExtensionFilter):
     """
 
     def __init__(self, image_extensions: List[str] = HTML_IMAGE_EXTENSIONS, ignore_list: Iterable = None,
-                 root_path: pathlib2.Path = None, mode: int = IGNORE_MODE):
+                 root_path: pathlib2.Path = None, mode: int = IGNORE_MODE, prune_list: Iterable = None):
         """ImageFilter Initializer
 
         :param image_extensions: target extensions, defaults to HTML_IMAGE_EXTENSIONS
@@ -195,13 +369,179 @@ class ImageFilter(ExtensionFilter):
         :type root_path: pathlib2.Path, optional
         :param mode: whether the filter is IGNORE_MODE or ACCEPT_MODE, defaults to IGNORE_MODE
         :type mode: int, optional
+        :param prune_list: directories not to descend into, see BaseFileFilter, defaults to None
+        :type prune_list: Iterable, optional
         """
         # make both upper and lowercase extensions list
         new_image_exts = []
         new_image_exts.extend([ext.upper() for ext in image_extensions])
         new_image_exts.extend([ext.lower() for ext in image_extensions])
         new_image_exts = list(set(new_image_exts))
-        super(ImageFilter, self).__init__(new_image_exts, ignore_list=ignore_list, root_path=root_path, mode=mode)
+        super(ImageFilter, self).__init__(new_image_exts, ignore_list=ignore_list, root_path=root_path, mode=mode,
+                                          prune_list=prune_list)
 
-    def filter(self, items: List[T]) -> List[T]:
-        return super().filter(items)
+
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+
+def merge_patterns(patterns: List[re.Pattern], full: bool = False) -> Callable[[str], bool]:
+    """Merge patterns into one test of whether any of them matches (re.match) a string
+    Patterns are joined into a single alternation compiled with their shared flags, unless one of them is a bytes
+    pattern or uses back-references (group numbers change when joined), their flags differ, or the alternation does
+    not compile (e.g. inline flags in the middle, repeated group names)
+
+    :param patterns: compiled patterns
+    :type patterns: List[re.Pattern]
+    :param full: test with re.fullmatch instead, defaults to False
+    :type full: bool, optional
+    :return: function telling whether any pattern matches
+    :rtype: Callable[[str], bool]
+    """
+    method = "fullmatch" if full else "match"
+    if len(patterns) == 1:
+        match = getattr(patterns[0], method)
+        return lambda string: match(string) is not None
+    flags = patterns[0].flags
+    if not any(not isinstance(pattern.pattern, str) or _BACKREFERENCE.search(pattern.pattern) or pattern.flags != flags
+               for pattern in patterns):
+        try:
+            merged = getattr(re.compile("|".join(f"(?:{pattern.pattern})" for pattern in patterns), flags), method)
+        except re.error:
+            pass
+        else:
+            return lambda string: merged(string) is not None
+    matches = [getattr(pattern, method) for pattern in patterns]
+    return lambda string: any(match(string) for match in matches)
+
+
+def _defined_in(cls: type, name: str) -> type:
+    return next(klass for klass in cls.__mro__ if name in vars(klass))
+
+
+def relative_path_getter(root_path: Union[pathlib2.Path, None]) -> Callable[[pathlib2.Path, dict], str]:
+    """Relative path getter as in str(path.relative_to(root_path)), by string slicing, for keep_test() functions
+    Results are stored in the cache dict of the path, so filters with the same root share them
+
+    :param root_path: root the paths are relative to, the root_path of a filter
+    :type root_path: Union[pathlib2.Path, None]
+    :return: function of a path and its cache dict (see BaseFileFilter.keep_test) returning the relative path
+    :rtype: Callable[[pathlib2.Path, dict], str]
+    """
+    root = str(root_path) if root_path is not None else None
+    prefix = root if root is None or root.endswith(os.sep) else root + os.sep
+
+    def relative(path: pathlib2.Path, cache: dict) -> str:
+        relative_path = cache.get(root)
+        if relative_path is None:
+            string = str(path)
+            if root is not None and string.startswith(prefix):
+                relative_path = string[len(prefix):]
+            elif string == root:
+                relative_path = "."
+            else:
+                relative_path = str(path.relative_to(root_path))
+            cache[root] = relative_path
+        return relative_path
+
+    return relative
+
+
+def _ignore_test(filter_: BaseFileFilter) -> Union[Callable[[pathlib2.Path, dict], bool], None]:
+    """Per-path test of the ignore_list stage of BaseFileFilter.__call__, None when it keeps everything"""
+    if filter_.mode == IGNORE_MODE and not filter_.ignore_list:
+        return None
+    if filter_.mode == ACCEPT_MODE and not filter_.ignore_list:
+        return lambda path, cache: False
+    matches = merge_patterns(filter_.ignore_list)
+    relative = relative_path_getter(filter_.root_path)
+    if filter_.mode == IGNORE_MODE:
+        return lambda path, cache: not matches(relative(path, cache))
+    return lambda path, cache: matches(relative(path, cache))
+
+
+def _pass(tests: List[Callable[[pathlib2.Path, dict], bool]]) -> Callable[[Iterable[pathlib2.Path]], List[pathlib2.Path]]:
+    """One pass over paths keeping those passing all tests, tests of a path share its relative path cache"""
+    tests = tuple(tests)
+
+    def run(paths: Iterable[pathlib2.Path]) -> List[pathlib2.Path]:
+        kept = []
+        for path in paths:
+            cache = {}
+            for test in tests:
+                if not test(path, cache):
+                    break
+            else:
+                kept.append(path)
+        return kept
+
+    return run
+
+
+def compile_filters(filters: Iterable[BaseFilter]) -> Callable[[Iterable[pathlib2.Path]], List[pathlib2.Path]]:
+    """Turn a list of filters into one callable, equivalent to applying them one after another
+    Consecutive filters that decide path by path (see BaseFileFilter.per_item) are merged into a single pass over the
+    paths: the relative path is computed once per path, ignore_list patterns are merged (see merge_patterns) and the
+    first rule that drops a path stops its evaluation. Other filters are called on the whole list in between.
+    Filters have to be complete (e.g. root_path set) when they are compiled, later changes to their settings are not
+    seen by the result (Scraper compiles its filters again for every scrape).
+
+    :param filters: filters, in the order they apply
+    :type filters: Iterable[BaseFilter]
+    :return: function taking paths and returning the kept ones, in order
+    :rtype: Callable[[Iterable[pathlib2.Path]], List[pathlib2.Path]]
+    """
+    stages = []
+    tests = []
+    for filter_ in filters:
+        if isinstance(filter_, BaseFileFilter) and filter_.per_item:
+            ignore_test = _ignore_test(filter_)
+            if ignore_test is not None:
+                tests.append(ignore_test)
+            if type(filter_).keep is not IdentityFilter.keep:
+                tests.append(filter_.keep_test())
+            continue
+        if tests:
+            stages.append(_pass(tests))
+            tests = []
+        stages.append(filter_)
+    if tests:
+        stages.append(_pass(tests))
+
+    def apply(paths: Iterable[pathlib2.Path]) -> List[pathlib2.Path]:
+        for stage in stages:
+            paths = stage(paths)
+        return paths if isinstance(paths, list) else list(paths)
+
+    return apply
+
+
+def compile_pruning(filters: Iterable[BaseFilter]) -> Callable[[pathlib2.Path], bool]:
+    """Turn the prune() rules of a list of filters into one test of whether a directory is pruned by any of them
+    Pattern rules (see BaseFileFilter.prune_patterns) are merged per filter, overridden prune() methods are called.
+
+    :param filters: filters
+    :type filters: Iterable[BaseFilter]
+    :return: function taking a directory path and telling whether not to descend into it
+    :rtype: Callable[[pathlib2.Path], bool]
+    """
+    tests = []
+    for filter_ in filters:
+        if not isinstance(filter_, BaseFileFilter):
+            continue
+        if _defined_in(type(filter_), "prune") is not BaseFileFilter:
+            tests.append(lambda path, cache, prune=filter_.prune: prune(path))
+            continue
+        patterns = filter_.prune_patterns()
+        if patterns:
+            matches = merge_patterns(patterns, full=True)
+            relative = relative_path_getter(filter_.root_path)
+            tests.append(lambda path, cache, matches=matches, relative=relative: matches(relative(path, cache)))
+    if not tests:
+        return lambda path: False
+    tests = tuple(tests)
+
+    def prune(path: pathlib2.Path) -> bool:
+        cache = {}
+        return any(test(path, cache) for test in tests)
+
+    return prune
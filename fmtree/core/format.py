@@ -1,32 +1,124 @@
 import io
-from typing import Iterable, List, Union
+from typing import Iterable, Iterator, List, Union, Tuple
 from abc import ABC, abstractmethod
 
 import pathlib2
 
 from fmtree.core.node import FileNode
+from fmtree.core.aggregate import stats_label
+
+
+WRITE_BUFFER_SIZE = 1 << 16
+
+
+def write_lines(lines: Iterable[str], stream: io.TextIOBase, buffer_size: int = WRITE_BUFFER_SIZE) -> None:
+    """Write lines to a text stream, each followed by a newline, joined in batches of about buffer_size characters so
+    neither one write call per line nor the whole text is needed
+
+    :param lines: lines without line endings
+    :type lines: Iterable[str]
+    :param stream: stream to write to
+    :type stream: io.TextIOBase
+    :param buffer_size: number of characters written at once, defaults to WRITE_BUFFER_SIZE
+    :type buffer_size: int, optional
+    """
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line) + 1
+        if size >= buffer_size:
+            buffer.append("")
+            stream.write("\n".join(buffer))
+            buffer, size = [], 0
+    if buffer:
+        buffer.append("")
+        stream.write("\n".join(buffer))
 
 
 class BaseFormatter(ABC):
     """
     Base Class of all formatters
-    The reason the abstract method generate() isn't a static method and root is required to initialize an instance of 
+    The reason the abstract method generate() isn't a static method and root is required to initialize an instance of
     this class is because there are a few other methods in this class that requires the object to remember the content
+
+    Formatters producing lines implement iter_lines() (and iter_lines_from_stream() when they can work on
+    Scraper.stream()), and generate() by calling the base one, which collects the lines in self.stringio. write()
+    renders them straight into a stream instead, with a bounded buffer, so output starts at once and the text is never
+    held in memory as a whole. Formatters implementing generate() alone are written out through self.stringio.
+    Formatters only read node data (names, stats, children), never the file system, so restored trees (see
+    fmtree.core.serialize and fmtree.core.cache) can be formatted where the files do not exist.
     """
 
-    def __init__(self, root: FileNode) -> None:
+    def __init__(self, root: FileNode = None) -> None:
         self.root = root
         self.stringio = io.StringIO()
 
+    def iter_lines(self) -> Iterator[str]:
+        """Lines of the formatted file tree of self.root, without line endings
+
+        :raises NotImplementedError: the formatter only implements generate()
+        :return: lines
+        :rtype: Iterator[str]
+        """
+        raise NotImplementedError
+
+    def iter_lines_from_stream(self, events: Iterable[Tuple[int, FileNode, bool]]) -> Iterator[str]:
+        """Lines of the formatted file tree of pre-order (depth, node, is_last) events, as yielded by Scraper.stream()
+        Only formatters that do not need to look ahead in the tree support this.
+
+        :param events: pre-order (depth, node, is_last) events
+        :type events: Iterable[Tuple[int, FileNode, bool]]
+        :raises NotImplementedError: the formatter cannot work on a stream
+        :return: lines
+        :rtype: Iterator[str]
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def generate(self) -> io.StringIO:
         """Generate a string form file tree given the root to the tree
+        Formatters implementing iter_lines() return super().generate(), which writes its lines into self.stringio.
 
-        :raises NotImplementedError: Abstract class must be implemented
         :return: string form file tree
         :rtype: io.StringIO
         """
-        raise NotImplementedError
+        write_lines(self.iter_lines(), self.stringio)
+        return self.stringio
+
+    def generate_from_stream(self, events: Iterable[Tuple[int, FileNode, bool]]) -> io.StringIO:
+        """Generate a string form file tree from pre-order (depth, node, is_last) events, as yielded by
+        Scraper.stream(), instead of from self.root. The tree is never held in memory as a whole.
+        Only formatters that do not need to look ahead in the tree support this.
+
+        :param events: pre-order (depth, node, is_last) events
+        :type events: Iterable[Tuple[int, FileNode, bool]]
+        :raises NotImplementedError: the formatter cannot work on a stream
+        :return: string form file tree
+        :rtype: io.StringIO
+        """
+        write_lines(self.iter_lines_from_stream(events), self.stringio)
+        return self.stringio
+
+    def write(self, stream: io.TextIOBase, events: Iterable[Tuple[int, FileNode, bool]] = None,
+              buffer_size: int = WRITE_BUFFER_SIZE) -> None:
+        """Render the file tree of self.root (or of events, see generate_from_stream) straight into a text stream,
+        without going through self.stringio, at most about buffer_size characters are buffered
+
+        :param stream: stream to write to
+        :type stream: io.TextIOBase
+        :param events: pre-order (depth, node, is_last) events to format instead of self.root, defaults to None
+        :type events: Iterable[Tuple[int, FileNode, bool]], optional
+        :param buffer_size: number of characters written at once, defaults to WRITE_BUFFER_SIZE
+        :type buffer_size: int, optional
+        """
+        if events is not None:
+            write_lines(self.iter_lines_from_stream(events), stream, buffer_size)
+        elif type(self).iter_lines is BaseFormatter.iter_lines:
+            # formatter only implementing generate()
+            self.generate()
+            self.to_stream(stream)
+        else:
+            write_lines(self.iter_lines(), stream, buffer_size)
 
     def get_stringio(self) -> io.StringIO:
         """Getter for stringio. Content of generated string-form file tree is stored in self.stringio
@@ -47,10 +139,24 @@ class BaseFormatter(ABC):
         path = str(filename.absolute()) if isinstance(filename, pathlib2.Path) else filename
         file_mode = "a" if append else "w"
         with open(path, file_mode) as f:
-            f.write(self.stringio.getvalue())
+            self.to_stream(f)
 
     def to_stream(self, stream: io.TextIOBase) -> None:
-        stream.write(self.stringio.getvalue())
+        """Copy what was generated into self.stringio to a text stream, in chunks rather than as one more copy of it
+
+        :param stream: stream to write to
+        :type stream: io.TextIOBase
+        """
+        position = self.stringio.tell()
+        self.stringio.seek(0)
+        try:
+            while True:
+                chunk = self.stringio.read(WRITE_BUFFER_SIZE)
+                if not chunk:
+                    break
+                stream.write(chunk)
+        finally:
+            self.stringio.seek(position)
 
 
 class TabFormatter(BaseFormatter):
@@ -60,15 +166,16 @@ class TabFormatter(BaseFormatter):
         super(TabFormatter, self).__init__(root)
 
     def generate(self) -> io.StringIO:
-        def iterate(node_: FileNode) -> None:
-            print("\t" * node_.get_depth() +
-                  node_.get_filename(), file=self.stringio)
+        return super(TabFormatter, self).generate()
+
+    def iter_lines(self) -> Iterator[str]:
+        def iterate(node_: FileNode) -> Iterator[str]:
+            yield "\t" * node_.get_depth() + node_.get_filename()
             if node_.get_children():
                 for node in node_.get_children():
-                    iterate(node)
+                    yield from iterate(node)
 
-        iterate(self.root)
-        return self.stringio
+        return iterate(self.root)
 
 
 class TreeCommandFormatter(BaseFormatter):
@@ -80,48 +187,107 @@ class TreeCommandFormatter(BaseFormatter):
     tee = '├── '
     last = '└── '
 
-    def __init__(self, root: FileNode) -> None:
+    def __init__(self, root: FileNode = None, stats: bool = False) -> None:
+        """
+        :param root: root node, defaults to None
+        :param stats: follow names with sizes, and directories with their totals (see fmtree.core.aggregate.stats_label)
+            when the tree has them, defaults to False
+        """
         super(TreeCommandFormatter, self).__init__(root)
+        self.stats = stats
 
     def generate(self) -> io.StringIO:
-        def iterate(node_: FileNode, prefix: str = '') -> Iterable:
-            children = node_.get_children()
-            # contents each get pointers that are ├── with a final └── :
-            pointers = [TreeCommandFormatter.tee] * \
-                (len(children) - 1) + [TreeCommandFormatter.last]
-            for pointer, node in zip(pointers, children):
-                yield prefix + pointer + node.get_filename()
-                if children:  # extend the prefix and recurse:
-                    extension = TreeCommandFormatter.branch if pointer == TreeCommandFormatter.tee else \
-                        TreeCommandFormatter.space
-                    # i.e. space because last, └── , above so no more |
-                    yield from iterate(node, prefix=prefix + extension)
-
-        self.stringio.write(self.root.get_filename() + "\n")
-        for line in iterate(self.root):
-            self.stringio.write(line + "\n")
-        return self.stringio
+        return super(TreeCommandFormatter, self).generate()
+
+    def iter_lines(self) -> Iterator[str]:
+        """Lines of the tree, rendered with an explicit stack (no recursion limit, no generator per level)
+        Every directory on the stack holds its children, the position of the next one and the line prefixes of its
+        entries: pointers ├── and └── and the prefixes handed down to their own children (│ and space), each built
+        once per directory rather than once per line.
+        """
+        with_stats = self.stats
+        yield stats_label(self.root) if with_stats else self.root.get_filename()
+        children = self.root.get_children()
+        if not children:
+            return
+        tee, last, branch, space = TreeCommandFormatter.tee, TreeCommandFormatter.last, \
+            TreeCommandFormatter.branch, TreeCommandFormatter.space
+        # children, index of the next child, line prefix of ├── entries, of the └── entry, prefix below ├── entries,
+        # prefix below the └── entry
+        stack = [[children, 0, tee, last, branch, space]]
+        while stack:
+            frame = stack[-1]
+            children, index, tee_prefix, last_prefix, branch_prefix, space_prefix = frame
+            end = len(children) - 1
+            while index <= end:
+                node = children[index]
+                index += 1
+                grandchildren = node.get_children()
+                if index <= end:
+                    yield tee_prefix + (stats_label(node) if with_stats else node.get_filename())
+                    if grandchildren:
+                        frame[1] = index
+                        stack.append([grandchildren, 0, branch_prefix + tee, branch_prefix + last,
+                                      branch_prefix + branch, branch_prefix + space])
+                        break
+                else:
+                    yield last_prefix + (stats_label(node) if with_stats else node.get_filename())
+                    if grandchildren:
+                        # the last child replaces its parent on the stack, nothing is left to do there
+                        stack[-1] = [grandchildren, 0, space_prefix + tee, space_prefix + last,
+                                     space_prefix + branch, space_prefix + space]
+                        break
+            else:
+                stack.pop()
+
+    def iter_lines_from_stream(self, events: Iterable[Tuple[int, FileNode, bool]]) -> Iterator[str]:
+        # prefixes[depth] is the prefix of the children of the latest node seen at that depth
+        prefixes = ['']
+        for depth, node, is_last in events:
+            name = stats_label(node) if self.stats else node.get_filename()
+            if depth == 0:
+                yield name
+                continue
+            prefix = prefixes[depth - 1]
+            del prefixes[depth:]
+            pointer = TreeCommandFormatter.last if is_last else TreeCommandFormatter.tee
+            yield prefix + pointer + name
+            prefixes.append(prefix + (TreeCommandFormatter.space if is_last else TreeCommandFormatter.branch))
 
 
 class ListFileFormatter(BaseFormatter):
     """List all file nodes, no styling at all"""
-    def __init__(self, root: FileNode) -> None:
+    def __init__(self, root: FileNode = None) -> None:
         super(ListFileFormatter, self).__init__(root)
         self.paths = []
 
-    def generate(self) -> io.StringIO:
-        def iterate(node_: FileNode) -> Iterable:
-            if node_.get_path().is_file():
+    def _iter_files(self) -> Iterator[pathlib2.Path]:
+        def iterate(node_: FileNode) -> Iterator[pathlib2.Path]:
+            if node_.is_file():
                 yield node_.get_path()
             children = node_.get_children()
             for child_node in children:
                 yield from iterate(child_node)
 
-        for path in iterate(self.root):
+        return iterate(self.root)
+
+    def generate(self) -> io.StringIO:
+        """Also collects the paths listed into self.paths, see get_paths"""
+        for path in self._iter_files():
             self.stringio.write(str(path) + "\n")
             self.paths.append(path)
         return self.stringio
 
+    def iter_lines(self) -> Iterator[str]:
+        """Paths are not collected into self.paths here, that would hold every file in memory"""
+        return map(str, self._iter_files())
+
+    def iter_lines_from_stream(self, events: Iterable[Tuple[int, FileNode, bool]]) -> Iterator[str]:
+        """Paths are not collected into self.paths here, that would hold every file of the stream in memory"""
+        for depth, node, is_last in events:
+            if node.is_file():
+                yield str(node.get_path())
+
     def get_paths(self) -> List[pathlib2.Path]:
         return self.paths
 
@@ -133,7 +299,10 @@ class HTMLFormatter(BaseFormatter):
         self.paths = []
 
     def generate(self) -> io.StringIO:
-        def iterate(node_: FileNode) -> Iterable:
+        return super(HTMLFormatter, self).generate()
+
+    def iter_lines(self) -> Iterator[str]:
+        def iterate(node_: FileNode) -> Iterator[str]:
             prefix_tabs = node_.get_depth() * '\t'
             if node_.is_file():
                 yield f"{prefix_tabs}<li>{node_.get_filename()}</li>"
@@ -145,40 +314,55 @@ class HTMLFormatter(BaseFormatter):
                 yield from iterate(child_node)
             if node_.is_dir():
                 yield f"{prefix_tabs}</ul>"
-        for line in iterate(self.root):
-            self.stringio.write(line + "\n")
-        return self.stringio
+
+        return iterate(self.root)
 
 
 class MarkdownContentFormatter(BaseFormatter):
     """MarkDown style file tree formatter"""
-    def __init__(self, root: FileNode) -> None:
+    def __init__(self, root: FileNode = None) -> None:
         super(MarkdownContentFormatter, self).__init__(root)
 
     def generate(self) -> io.StringIO:
-        def iterate(node_: FileNode) -> Iterable:
+        return super(MarkdownContentFormatter, self).generate()
+
+    def iter_lines(self) -> Iterator[str]:
+        def iterate(node_: FileNode) -> Iterator[str]:
             prefix_tabs = node_.get_depth() * '\t'
             yield f"{prefix_tabs}- {node_.get_filename()}"
             children = node_.get_children()
             for child_node in children:
                 yield from iterate(child_node)
 
-        for line in iterate(self.root):
-            self.stringio.write(line + "\n")
-        return self.stringio
+        return iterate(self.root)
+
+    def iter_lines_from_stream(self, events: Iterable[Tuple[int, FileNode, bool]]) -> Iterator[str]:
+        for depth, node, is_last in events:
+            prefix_tabs = depth * '\t'
+            yield f"{prefix_tabs}- {node.get_filename()}"
 
 
 class HTMLFormatter(BaseFormatter):
-    def __init__(self, root: FileNode) -> None:
+    def __init__(self, root: FileNode, stats: bool = False) -> None:
+        """
+        :param root: root node
+        :param stats: follow names with sizes, and directories with their totals (see fmtree.core.aggregate.stats_label)
+            when the tree has them, defaults to False
+        """
         super(HTMLFormatter, self).__init__(root)
+        self.stats = stats
 
     def generate(self) -> io.StringIO:
-        def iterate(node_: FileNode) -> Iterable:
+        return super(HTMLFormatter, self).generate()
+
+    def iter_lines(self) -> Iterator[str]:
+        def iterate(node_: FileNode) -> Iterator[str]:
             prefix_tabs = (node_.get_depth()) * '\t'
+            name = stats_label(node_) if self.stats else node_.get_filename()
             if node_.is_file():
-                yield f"{prefix_tabs}<li>{node_.get_filename()}</li>"
+                yield f"{prefix_tabs}<li>{name}</li>"
             else:
-                yield f"{prefix_tabs}\t<li>{node_.get_filename()}</li>"
+                yield f"{prefix_tabs}\t<li>{name}</li>"
                 yield f"{prefix_tabs}\t<ul>"
 
             children = node_.get_children()
@@ -188,11 +372,9 @@ class HTMLFormatter(BaseFormatter):
             if not node_.is_file():
                 yield f"{prefix_tabs}\t</ul>"
 
-        self.stringio.write("<ul>\n")
-        for line in iterate(self.root):
-            self.stringio.write(line + "\n")
-        self.stringio.write("</ul>\n")
-        return self.stringio
+        yield "<ul>"
+        yield from iterate(self.root)
+        yield "</ul>"
 
 
 class MarkdownLinkContentFormatter(BaseFormatter):
@@ -201,9 +383,12 @@ class MarkdownLinkContentFormatter(BaseFormatter):
         super(MarkdownLinkContentFormatter, self).__init__(root)
 
     def generate(self) -> io.StringIO:
-        def iterate(node_: FileNode) -> Iterable:
+        return super(MarkdownLinkContentFormatter, self).generate()
+
+    def iter_lines(self) -> Iterator[str]:
+        def iterate(node_: FileNode) -> Iterator[str]:
             prefix_tabs = node_.get_depth() * '\t'
-            if node_.get_path().is_file():
+            if node_.is_file():
                 link = './' + \
                        str(node_.get_path().relative_to(self.root.get_path()))
                 yield f"{prefix_tabs}- [{node_.get_filename()}]({link})"
@@ -214,10 +399,7 @@ class MarkdownLinkContentFormatter(BaseFormatter):
             for child_node in children:
                 yield from iterate(child_node)
 
-        for line in iterate(self.root):
-            self.stringio.write(line + "\n")
-
-        return self.stringio
+        return iterate(self.root)
 
 
 class GithubMarkdownContentFormatter(BaseFormatter):
@@ -237,48 +419,45 @@ class GithubMarkdownContentFormatter(BaseFormatter):
         self.link_dir_readme = link_dir_readme
 
     def generate(self) -> io.StringIO:
-        def iterate(node_: FileNode) -> None:
+        return super(GithubMarkdownContentFormatter, self).generate()
+
+    def iter_lines(self) -> Iterator[str]:
+        def iterate(node_: FileNode) -> Iterator[str]:
             prefix_tabs = (node_.get_depth() -
                            int(self.ignore_root_dir)) * '\t'
             path = node_.get_path()
             link = './' + str(path.relative_to(self.root.get_path()))
+            children = node_.get_children()
             if not (node_.get_depth() == 0 and self.ignore_root_dir):
                 # Ignore Root Directory, show only top level files (start with children of root directory)
-                if path.is_dir():
+                if node_.is_dir():
                     if self.full_dir_link:
                         # link for intermediate directory
-                        print(
-                            f"{prefix_tabs}- [{node_.get_filename()}]({link})", file=self.stringio)
+                        yield f"{prefix_tabs}- [{node_.get_filename()}]({link})"
                     else:
                         # if this is a directory and contains a README.md, then add a link for this directory
                         # no link for current directory otherwise. This behavior is based on self.dir_link
-                        if self.dir_link and (path / "README.md").exists():
+                        if self.dir_link and any(child.get_filename() == "README.md" for child in children):
                             if self.link_dir_readme:
                                 link = './' + \
                                        str(path.relative_to(
                                            self.root.get_path()) / 'README.md')
-                                print(
-                                    f"{prefix_tabs}- [{node_.get_filename()}]({link})", file=self.stringio)
+                                yield f"{prefix_tabs}- [{node_.get_filename()}]({link})"
                             else:
-                                print(
-                                    f"{prefix_tabs}- [{node_.get_filename()}]({link})", file=self.stringio)
+                                yield f"{prefix_tabs}- [{node_.get_filename()}]({link})"
                         else:
-                            print(
-                                f"{prefix_tabs}- {node_.get_filename()}", file=self.stringio)
-                elif path.is_file():
+                            yield f"{prefix_tabs}- {node_.get_filename()}"
+                elif node_.is_file():
                     # current node is a file (should be a markdown), if self.remove_md_ext, .md will be removed from
                     # the display name
                     display_name = node_.get_filename().replace(".md", "") \
                         if node_.get_filename()[-3:] == ".md" and self.remove_md_ext else node_.get_filename()
-                    if not (self.no_readme_link and path.name == "README.md"):
+                    if not (self.no_readme_link and node_.get_filename() == "README.md"):
                         # README.md files will not get a link when self.no_readme_link is True
-                        print(
-                            f"{prefix_tabs}- [{display_name}]({link})", file=self.stringio)
+                        yield f"{prefix_tabs}- [{display_name}]({link})"
                 else:
                     raise ValueError("Unhandled Error")
-            children = node_.get_children()
             for child_node in children:
-                iterate(child_node)
+                yield from iterate(child_node)
 
-        iterate(self.root)
-        return self.stringio
+        return iterate(self.root)
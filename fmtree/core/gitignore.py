@@ -0,0 +1,315 @@
+"""
+.gitignore aware filtering
+
+GitignoreFilter reads ignore files (.gitignore and .ignore by default) in every directory the scraper lists and drops
+the entries they ignore, following git's rules: blank lines and "#" comments are skipped, "!" re-includes, a trailing
+"/" only matches directories, a "/" at the start or in the middle anchors the pattern to the directory of the ignore
+file, "*", "?" and "[...]" do not match "/", and "**" matches across directories. Later rules win over earlier ones and
+rules in deeper directories win over rules of their parents. Ignored directories are dropped from the listing of
+their parent, so they are never listed themselves.
+
+Ignore files are read again on every scrape. An incremental rescan only reuses the listing of an unchanged directory
+when the rules that apply to it are the same as in the previous scrape.
+"""
+import os
+import re
+import functools
+import threading
+from typing import Dict, Iterable, List, Tuple, Union
+
+import pathlib2
+
+from fmtree.core.filter import BaseFileFilter, IGNORE_MODE
+
+
+def translate_glob(pattern: str) -> str:
+    """Translate a glob pattern into a regular expression on "/" separated relative paths, as git matches patterns
+    "*", "?" and "[...]" do not match "/", "**/" at the start, "/**/" in the middle and "/**" at the end match any
+    number of directories. A pattern without "/" matches names at any depth, one with "/" the whole relative path, a
+    leading "/" is dropped.
+
+    :param pattern: glob pattern
+    :type pattern: str
+    :return: regular expression (for re.fullmatch)
+    :rtype: str
+    """
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    parts = []
+    index = 0
+    if pattern.startswith("**/"):
+        parts.append("(?:.*/)?")
+        index = 3
+        anchored = True
+    while index < len(pattern):
+        char = pattern[index]
+        if pattern.startswith("/**/", index):
+            parts.append("/(?:.*/)?")
+            index += 4
+        elif pattern.startswith("/**", index) and index + 3 == len(pattern):
+            parts.append("/.*")
+            index += 3
+        elif char == "*":
+            while index < len(pattern) and pattern[index] == "*":
+                index += 1
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+            index += 1
+        elif char == "[":
+            end = index + 1
+            if end < len(pattern) and pattern[end] in "!^":
+                end += 1
+            if end < len(pattern) and pattern[end] == "]":
+                end += 1
+            end = pattern.find("]", end)
+            if end < 0:
+                parts.append(re.escape(char))
+                index += 1
+                continue
+            body = pattern[index + 1:end]
+            if body[:1] in ("!", "^"):
+                body = "^" + body[1:]
+            parts.append("(?!/)[" + body.replace("\\", "\\\\") + "]")
+            index = end + 1
+        elif char == "\\" and index + 1 < len(pattern):
+            parts.append(re.escape(pattern[index + 1]))
+            index += 2
+        else:
+            parts.append(re.escape(char))
+            index += 1
+    regex = "".join(parts)
+    if not anchored:
+        regex = "(?:.*/)?" + regex
+    return regex
+
+
+def translate(pattern: str) -> Union[Tuple[str, bool, bool], None]:
+    """Translate a line of an ignore file into a regular expression on paths relative to the ignore file's directory
+
+    :param pattern: line of an ignore file
+    :type pattern: str
+    :return: regular expression (for re.fullmatch), whether the rule re-includes (!) and whether it only matches
+        directories, None for blank lines and comments
+    :rtype: Union[Tuple[str, bool, bool], None]
+    """
+    pattern = pattern.rstrip("\n").rstrip("\r")
+    stripped = pattern.rstrip(" ")
+    if stripped != pattern and stripped.endswith("\\"):
+        # a space quoted with a backslash is kept
+        stripped += " "
+    pattern = stripped
+    if not pattern or pattern.startswith("#"):
+        return None
+    negate = pattern.startswith("!")
+    if negate:
+        pattern = pattern[1:]
+    dir_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    if not pattern:
+        return None
+    return translate_glob(pattern), negate, dir_only
+
+
+@functools.lru_cache(maxsize=4096)
+def _compile_rule(line: str) -> Union[Tuple[re.Pattern, bool, bool], None]:
+    """translate() and compile a line, lines repeated across ignore files are compiled once"""
+    rule = translate(line)
+    return (re.compile(rule[0], re.DOTALL), rule[1], rule[2]) if rule is not None else None
+
+
+class _Level:
+    """Rules of the ignore files of one directory, matched on paths relative to it
+    Rules are tried last to first, the first match decides. Once the rules have been tried often enough to pay for
+    it, they are combined into one alternation in reverse order (the first alternative that matches is the last
+    matching rule), so the cost of a match no longer grows with the number of rules.
+    """
+    __slots__ = ("prefix", "rules", "tries", "combined")
+    COMBINE_AFTER = 4096
+
+    def __init__(self, directory: str, rules: List[Tuple[re.Pattern, bool, bool]]) -> None:
+        self.prefix = directory if directory.endswith(os.sep) else directory + os.sep
+        self.rules = rules[::-1]
+        self.tries = 0
+        self.combined = None
+
+    def _combine(self) -> re.Pattern:
+        return re.compile("|".join(f"({regex.pattern})" for regex, _, _ in self.rules), re.DOTALL)
+
+    def match(self, relative_path: str, path: pathlib2.Path) -> Union[bool, None]:
+        """
+        :return: True when ignored, False when re-included, None when no rule matches
+        """
+        start = 0
+        # tries is not locked, concurrent matches at worst combine the rules a little later or twice
+        if self.combined is None:
+            self.tries += len(self.rules)
+            if self.tries > self.COMBINE_AFTER:
+                self.combined = self._combine()
+        if self.combined is not None:
+            match = self.combined.fullmatch(relative_path)
+            if match is None:
+                return None
+            start = match.lastindex - 1
+            _, negate, dir_only = self.rules[start]
+            if not dir_only:
+                return not negate
+        # directory-only rules are skipped for other entries
+        is_dir = None
+        for regex, negate, dir_only in self.rules[start:]:
+            if regex.fullmatch(relative_path) is not None:
+                if dir_only:
+                    if is_dir is None:
+                        is_dir = path.is_dir()
+                    if not is_dir:
+                        continue
+                return not negate
+        return None
+
+
+class GitignoreFilter(BaseFileFilter):
+    """
+    Drop entries ignored by .gitignore (and .ignore) files found in the scraped directories, see the module docstring
+    Each ignore file is read and compiled once, the rule stack of a directory is shared with its sub-directories
+    unless they have ignore files of their own, and matching an entry costs one regular expression per directory
+    with ignore files above it. Entries named in always_ignore (.git by default) are dropped in every directory.
+
+    >>> scraper = Scraper(Path("~/repo").expanduser(), filters=[GitignoreFilter()])
+    """
+    per_item = True
+
+    def __init__(self, ignore_files: Iterable[str] = (".gitignore", ".ignore"), always_ignore: Iterable[str] = (".git",),
+                 ignore_list: Iterable = None, root_path: pathlib2.Path = None, mode: int = IGNORE_MODE,
+                 prune_list: Iterable = None) -> None:
+        """GitignoreFilter Initializer
+
+        :param ignore_files: names of ignore files, later ones win, defaults to (".gitignore", ".ignore")
+        :type ignore_files: Iterable[str], optional
+        :param always_ignore: names dropped in every directory, defaults to (".git",)
+        :type always_ignore: Iterable[str], optional
+        :param ignore_list: list of regex to ignore, see BaseFileFilter, defaults to None
+        :type ignore_list: Iterable, optional
+        :param root_path: path to scrape, defaults to None
+        :type root_path: pathlib2.Path, optional
+        :param mode: mode of ignore_list, see BaseFileFilter, defaults to IGNORE_MODE
+        :type mode: int, optional
+        :param prune_list: directories not to descend into, see BaseFileFilter, defaults to None
+        :type prune_list: Iterable, optional
+        """
+        super(GitignoreFilter, self).__init__(ignore_list=ignore_list, root_path=root_path, mode=mode,
+                                              prune_list=prune_list)
+        self.ignore_files = tuple(ignore_files)
+        self.always_ignore = tuple(always_ignore)
+        self._directory_rules: Dict[str, Tuple[_Level, ...]] = {}
+        self._previous_rules: Dict[str, Tuple[_Level, ...]] = {}
+        self._lock = threading.Lock()
+
+    def set_root_path(self, root_path: pathlib2.Path) -> None:
+        """root_path setter, also forgets the ignore files read so far
+
+        :param root_path: path to scrape
+        :type root_path: pathlib2.Path
+        """
+        super(GitignoreFilter, self).set_root_path(root_path)
+        self.clear_cache()
+
+    def clear_cache(self) -> None:
+        """Forget the ignore files read so far, so changed ones are read again"""
+        self._directory_rules = {}
+        self._previous_rules = {}
+
+    def begin_scrape(self) -> None:
+        """Read ignore files again in the coming scrape, the rules read so far are kept for reuses_listing"""
+        self._previous_rules = self._directory_rules
+        self._directory_rules = {}
+
+    def reuses_listing(self, directory: pathlib2.Path) -> bool:
+        """The listing of a directory can be reused when the rules applying to it are the ones of the previous scrape
+
+        :param directory: directory about to be rescanned
+        :type directory: pathlib2.Path
+        :return: whether the previous listing of directory may be reused
+        :rtype: bool
+        """
+        directory = str(directory)
+        current = self.rules_of(directory)
+        previous = self._previous_rules.get(directory)
+        if previous is None or len(previous) != len(current):
+            return False
+        return all(old is new or (old.prefix == new.prefix and old.rules == new.rules)
+                   for old, new in zip(previous, current))
+
+    def _read_rules(self, directory: str) -> List[Tuple[re.Pattern, bool, bool]]:
+        rules = []
+        for name in self.ignore_files:
+            try:
+                with open(os.path.join(directory, name), "r", encoding="utf-8", errors="surrogateescape") as f:
+                    lines = f.readlines()
+            except OSError:
+                continue
+            rules.extend(rule for rule in map(_compile_rule, lines) if rule is not None)
+        return rules
+
+    def rules_of(self, directory: str) -> Tuple[_Level, ...]:
+        """Rule stack of a directory, from the root down, read from ignore files of the directory and its parents up
+        to root_path
+
+        :param directory: directory path (string)
+        :type directory: str
+        :return: levels with rules, outermost first
+        :rtype: Tuple[_Level, ...]
+        """
+        stack = self._directory_rules.get(directory)
+        if stack is not None:
+            return stack
+        # ParallelScraper calls filters from several threads, each ignore file is read once all the same
+        with self._lock:
+            return self._read_stack(directory)
+
+    def _read_stack(self, directory: str) -> Tuple[_Level, ...]:
+        cache = self._directory_rules
+        stack = cache.get(directory)
+        if stack is not None:
+            return stack
+        missing = [directory]
+        root = str(self.root_path) if self.root_path is not None else None
+        while directory != root:
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                break
+            directory = parent
+            stack = cache.get(directory)
+            if stack is not None:
+                break
+            missing.append(directory)
+        stack = stack or ()
+        for directory in reversed(missing):
+            rules = self._read_rules(directory)
+            if rules:
+                stack = stack + (_Level(directory, rules),)
+            cache[directory] = stack
+        return stack
+
+    def is_ignored(self, path: pathlib2.Path) -> bool:
+        """Whether the ignore files above path ignore it
+
+        :param path: path of a scraped entry
+        :type path: pathlib2.Path
+        :return: whether path is ignored
+        :rtype: bool
+        """
+        string = str(path)
+        directory, name = os.path.split(string)
+        if name in self.always_ignore:
+            return True
+        for level in reversed(self.rules_of(directory)):
+            decision = level.match(string[len(level.prefix):], path)
+            if decision is not None:
+                return decision
+        return False
+
+    def filter(self, items: Iterable) -> Iterable:
+        return [path for path in items if self.keep(path)]
+
+    def keep(self, path: pathlib2.Path) -> bool:
+        return not self.is_ignored(path)
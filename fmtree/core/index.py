@@ -0,0 +1,155 @@
+"""
+Indexed lookups on scraped trees
+
+A TreeIndex maps relative paths to nodes, nodes to their parent and file identities (st_dev, st_ino, see
+UniqueFileIdentifier) to the nodes sharing them, so finding a node by path is a dict lookup instead of a walk, its
+ancestors cost one lookup per level and hard links of a file are found at once. Scraper(indexed=True) fills the index
+while it scrapes (see Scraper.get_index), and again on every run, incremental rescans included; TreeIndex(tree) builds
+one for any other tree. The index holds the nodes of one tree, changes made to the tree afterwards are not seen.
+"""
+import os
+from typing import Dict, List, Union
+
+import pathlib2
+
+from fmtree.core.node import FileNode, UniqueFileIdentifier
+
+
+class TreeIndex:
+    """
+    Path, parent and file identity lookups on a tree of FileNode (or CompactFileNode), see the module docstring
+
+    >>> index = TreeIndex(tree)
+    >>> node = index.get_node("docs/index.md")
+    >>> [parent.get_filename() for parent in index.ancestors(node)]
+    ['docs', 'root']
+    """
+
+    def __init__(self, root: FileNode = None) -> None:
+        """
+        :param root: root node of a tree to index, defaults to None (empty index, see add_children and set_root)
+        :type root: FileNode, optional
+        """
+        self.root = None
+        self._nodes: Dict[str, FileNode] = {}
+        self._parents: Dict[int, FileNode] = {}
+        self._by_id: Dict[UniqueFileIdentifier, FileNode] = {}
+        # nodes of file identities seen more than once (hard links), the first one stays in _by_id
+        self._links: Dict[UniqueFileIdentifier, List[FileNode]] = {}
+        if root is not None:
+            stack = [(root, "")]
+            while stack:
+                node, key = stack.pop()
+                self.add_children(node, key)
+                prefix = key + "/" if key else ""
+                stack.extend((child, prefix + child.get_filename()) for child in node.get_children() if child.is_dir())
+            self.set_root(root)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, path: Union[pathlib2.Path, str]) -> bool:
+        return self.get_node(path) is not None
+
+    def _add_id(self, node: FileNode) -> None:
+        file_id = node.get_id()
+        first = self._by_id.setdefault(file_id, node)
+        if first is not node:
+            self._links.setdefault(file_id, [first]).append(node)
+
+    def add_children(self, directory: FileNode, key: str) -> None:
+        """Index the children of a directory, directories are indexed by their parent (the root by set_root)
+
+        :param directory: directory node
+        :type directory: FileNode
+        :param key: relative path of directory, "/" separated, "" for the root
+        :type key: str
+        """
+        prefix = key + "/" if key else ""
+        nodes, parents = self._nodes, self._parents
+        for child in directory.get_children():
+            nodes[prefix + child.get_filename()] = child
+            parents[id(child)] = directory
+            self._add_id(child)
+
+    def set_root(self, root: FileNode) -> None:
+        """Index the root node
+
+        :param root: root node
+        :type root: FileNode
+        """
+        self.root = root
+        self._nodes[""] = root
+        self._add_id(root)
+
+    def _key(self, path: Union[pathlib2.Path, str]) -> str:
+        path = pathlib2.PurePath(path)
+        if path.is_absolute():
+            if self.root is None:
+                return str(path)
+            try:
+                path = path.relative_to(self.root.get_path())
+            except ValueError:
+                return str(path)
+        return "/".join(part for part in path.parts if part != os.curdir)
+
+    def get_node(self, path: Union[pathlib2.Path, str]) -> Union[FileNode, None]:
+        """Node at a path
+
+        :param path: path relative to the root ("" or "." for the root), or absolute path below the root
+        :type path: Union[pathlib2.Path, str]
+        :return: the node, None when the tree has no node there
+        :rtype: Union[FileNode, None]
+        """
+        if isinstance(path, str):
+            node = self._nodes.get(path)
+            if node is not None:
+                return node
+        return self._nodes.get(self._key(path))
+
+    def get_parent(self, node: FileNode) -> Union[FileNode, None]:
+        """
+        :param node: indexed node
+        :type node: FileNode
+        :return: parent node, None for the root and for nodes not in the index
+        :rtype: Union[FileNode, None]
+        """
+        return self._parents.get(id(node))
+
+    def ancestors(self, node: FileNode) -> List[FileNode]:
+        """
+        :param node: indexed node
+        :type node: FileNode
+        :return: parent, grandparent and so on up to the root
+        :rtype: List[FileNode]
+        """
+        result = []
+        parent = self._parents.get(id(node))
+        while parent is not None:
+            result.append(parent)
+            parent = self._parents.get(id(parent))
+        return result
+
+    def nodes_by_id(self, file_id: UniqueFileIdentifier) -> List[FileNode]:
+        """Nodes of a file, in the order they were indexed: Scraper(indexed=True) indexes the children of a directory
+        when it closes it (post-order), TreeIndex(tree) directory by directory from the root
+
+        :param file_id: file identity
+        :type file_id: UniqueFileIdentifier
+        :return: nodes of the file, several for hard links, empty when there is none
+        :rtype: List[FileNode]
+        """
+        links = self._links.get(file_id)
+        if links is not None:
+            return list(links)
+        node = self._by_id.get(file_id)
+        return [node] if node is not None else []
+
+    def hardlinks(self, node: FileNode) -> List[FileNode]:
+        """
+        :param node: indexed node
+        :type node: FileNode
+        :return: the other nodes of the same file
+        :rtype: List[FileNode]
+        """
+        return [other for other in self.nodes_by_id(node.get_id()) if other is not node]
@@ -5,9 +5,41 @@ import stat
 import pickle
 import pathlib2
 from abc import ABC, abstractmethod
-from typing import List, Union, io, Dict, Generator
+from typing import List, Union, io, Dict, Generator, Tuple, TYPE_CHECKING
 import json
 
+if TYPE_CHECKING:
+    from fmtree.core.aggregate import SubtreeStats
+
+STAT_FIELDS = ("st_mode", "st_ino", "st_dev", "st_nlink", "st_uid", "st_gid", "st_size", "st_atime_ns", "st_mtime_ns",
+               "st_ctime_ns")
+
+
+def stat_to_fields(stat_: os.stat_result) -> tuple:
+    """Extract the stat fields fmtree persists (see STAT_FIELDS) from a stat result
+
+    :param stat_: stat result
+    :type stat_: os.stat_result
+    :return: field values in the order of STAT_FIELDS
+    :rtype: tuple
+    """
+    return (stat_.st_mode, stat_.st_ino, stat_.st_dev, stat_.st_nlink, stat_.st_uid, stat_.st_gid, stat_.st_size,
+            stat_.st_atime_ns, stat_.st_mtime_ns, stat_.st_ctime_ns)
+
+
+def stat_from_fields(st_mode: int, st_ino: int, st_dev: int, st_nlink: int, st_uid: int, st_gid: int, st_size: int,
+                     st_atime_ns: int, st_mtime_ns: int, st_ctime_ns: int) -> os.stat_result:
+    """Build a stat result from persisted fields (see STAT_FIELDS), so nodes can be restored without stat-ing
+
+    :return: stat result, fields fmtree does not persist (e.g. st_blocks) are missing
+    :rtype: os.stat_result
+    """
+    return os.stat_result(
+        (st_mode, st_ino, st_dev, st_nlink, st_uid, st_gid, st_size,
+         st_atime_ns // 1000000000, st_mtime_ns // 1000000000, st_ctime_ns // 1000000000),
+        {"st_atime": st_atime_ns / 1e9, "st_mtime": st_mtime_ns / 1e9, "st_ctime": st_ctime_ns / 1e9,
+         "st_atime_ns": st_atime_ns, "st_mtime_ns": st_mtime_ns, "st_ctime_ns": st_ctime_ns})
+
 
 class UniqueFileIdentifier:
     """
@@ -18,14 +50,34 @@ class UniqueFileIdentifier:
     detecting duplicate files
     """
 
-    def __init__(self, path: pathlib2.Path):
+    def __init__(self, path: pathlib2.Path, stat_: os.stat_result = None):
         """Initialize UniqueFile Identifier by setting st_dev and st_ino
 
         :param path: a file path of type pathlib2.Path
         :type path: pathlib2.Path
+        :param stat_: stat of path if already known, path is only stat-ed when this is None, defaults to None
+        :type stat_: os.stat_result, optional
         """
-        self.st_dev = path.stat().st_dev
-        self.st_ino = path.stat().st_ino
+        if stat_ is None:
+            stat_ = path.stat()
+        self.st_dev = stat_.st_dev
+        self.st_ino = stat_.st_ino
+
+    @classmethod
+    def from_ids(cls, st_dev: int, st_ino: int) -> UniqueFileIdentifier:
+        """Create an identifier from st_dev and st_ino directly
+
+        :param st_dev: device of the file
+        :type st_dev: int
+        :param st_ino: inode of the file
+        :type st_ino: int
+        :return: the identifier
+        :rtype: UniqueFileIdentifier
+        """
+        file_id = cls.__new__(cls)
+        file_id.st_dev = st_dev
+        file_id.st_ino = st_ino
+        return file_id
 
     def __str__(self) -> str:
         """Convert to string type by concatenating st_dev and st_ino, which should be unique in a file system
@@ -56,6 +108,8 @@ class UniqueFileIdentifier:
 
 
 class BaseNode(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def __str__(self) -> str:
         """__str__ as an abstract method every child class must implement
@@ -124,6 +178,7 @@ class FileNode(BaseNode):
         depth: int = None,
         root: pathlib2.Path = None,
         children: Union[List, None] = None,
+        stat_: os.stat_result = None,
     ) -> None:
         """FileNode Initializer
 
@@ -135,15 +190,19 @@ class FileNode(BaseNode):
         :type root: pathlib2.Path, optional
         :param children: List of Node when current node is a directory, None if current node is a file, defaults to None
         :type children: Union[List, None], optional
+        :param stat_: stat of path if already known (e.g. from os.scandir), path is stat-ed when None, defaults to None
+        :type stat_: os.stat_result, optional
         """
         self._path = path
         self._root = root
         self._relative_path = self._path.relative_to(self._root) if self._root else None
         self._depth = depth
         self._filename = path.name
-        self._stat = path.stat()
+        self._stat = stat_ if stat_ is not None else path.stat()
         self._children = children if children else []
-        self._id = UniqueFileIdentifier(self._path)
+        self._id = UniqueFileIdentifier(self._path, self._stat)
+        self._pruned = None
+        self._stats = None
 
     def __str__(self) -> str:
         """File Node to String Form
@@ -179,6 +238,40 @@ class FileNode(BaseNode):
         """
         self._children = children
 
+    def get_pruned(self) -> Union[List[Tuple[int, FileNode]], None]:
+        """Directories left out of the children of this node because nothing was kept below them
+        Only recorded by Scraper(incremental=True), so that Scraper.run(previous_tree=...) can pick them up again
+
+        :return: (position in children, node) pairs, None when pruned directories were not recorded
+        :rtype: Union[List[Tuple[int, FileNode]], None]
+        """
+        return getattr(self, "_pruned", None)
+
+    def set_pruned(self, pruned: Union[List[Tuple[int, FileNode]], None]) -> None:
+        """pruned directories setter, see get_pruned
+
+        :param pruned: (position in children, node) pairs
+        :type pruned: Union[List[Tuple[int, FileNode]], None]
+        """
+        self._pruned = pruned
+
+    def get_stats(self) -> Union[SubtreeStats, None]:
+        """Totals of the subtree below this directory (see fmtree.core.aggregate)
+        Only stored by Scraper(aggregate=True) and fmtree.core.aggregate.compute_stats
+
+        :return: totals, None for files and when they were not computed
+        :rtype: Union[SubtreeStats, None]
+        """
+        return getattr(self, "_stats", None)
+
+    def set_stats(self, stats: Union[SubtreeStats, None]) -> None:
+        """subtree totals setter, see get_stats
+
+        :param stats: totals of the subtree
+        :type stats: Union[SubtreeStats, None]
+        """
+        self._stats = stats
+
     def get_path(self) -> pathlib2.Path:
         """file path getter
 
@@ -307,4 +400,314 @@ class FileNode(BaseNode):
             if child.is_dir() and recursive:
                 yield from child.walk(recursive, no_dir)
             elif child.is_file():
-                yield child
\ No newline at end of file
+                yield child
+
+
+class CompactFileNode(BaseNode):
+    """
+    Memory-lean FileNode with the same getters, for very large trees
+    Instead of full and relative paths, a node keeps its name and a reference to its parent node (the parent
+    directory path while it is not attached to one yet), paths are built when asked for. Of the stat, only the fields
+    fmtree uses are kept: st_mode, st_size, st_mtime_ns, st_dev and st_ino. There is no __dict__ per node.
+    """
+    __slots__ = ("_name", "_parent", "_root", "_depth", "_children", "_pruned", "_stats", "_st_mode", "_st_size",
+                 "_st_mtime_ns", "_st_dev", "_st_ino")
+
+    def __init__(
+        self,
+        path: pathlib2.Path,
+        depth: int = None,
+        root: pathlib2.Path = None,
+        children: Union[List, None] = None,
+        stat_: os.stat_result = None,
+    ) -> None:
+        """CompactFileNode Initializer, takes the same arguments as FileNode
+
+        :param path: file path
+        :type path: pathlib2.Path
+        :param depth: depth of file/directory relative to root, defaults to None
+        :type depth: int, optional
+        :param root: root path, can be None, defaults to None
+        :type root: pathlib2.Path, optional
+        :param children: child nodes when current node is a directory, they get this node as parent, defaults to None
+        :type children: Union[List, None], optional
+        :param stat_: stat of path if already known, path is stat-ed when None, defaults to None
+        :type stat_: os.stat_result, optional
+        """
+        if stat_ is None:
+            stat_ = path.stat()
+        self._name = path.name
+        self._parent = path.parent
+        self._root = root
+        self._depth = depth
+        self._pruned = None
+        self._stats = None
+        self._st_mode = stat_.st_mode
+        self._st_size = stat_.st_size
+        self._st_mtime_ns = stat_.st_mtime_ns
+        self._st_dev = stat_.st_dev
+        self._st_ino = stat_.st_ino
+        self.set_children(children if children else [])
+
+    def __str__(self) -> str:
+        """Compact File Node to String Form
+
+        :return: absolute path of current file node in string form
+        :rtype: str
+        """
+        return str(self.get_path().absolute())
+
+    def __eq__(self, other: BaseNode) -> bool:
+        """decide whether 2 file nodes are identical
+
+        :param other: Another File Node to compare with
+        :type other: BaseNode
+        :return: The two nodes' id (UniqueFileIdentifier) are identical
+        :rtype: bool
+        """
+        return self.get_id() == other.get_id()
+
+    def __copy__(self) -> CompactFileNode:
+        """Make a shallow copy, the copy shares children and parent with self
+
+        :return: the shallow copy
+        :rtype: CompactFileNode
+        """
+        result = CompactFileNode.__new__(CompactFileNode)
+        for slot in CompactFileNode.__slots__:
+            setattr(result, slot, getattr(self, slot))
+        return result
+
+    def __deepcopy__(self, memo: Dict) -> CompactFileNode:
+        """Make a deep copy of the subtree of this node, with an explicit stack (no recursion limit)
+        The parent is not copied: the copy keeps the parent of self, unless that parent is copied in the same
+        copy.deepcopy call (it is in memo), so copying a subtree does not copy the rest of the tree.
+
+        :param memo: memo
+        :type memo: Dict
+        :return: A deepcopy of self
+        :rtype: CompactFileNode
+        """
+        copied = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if id(node) in memo:
+                continue
+            memo[id(node)] = CompactFileNode.__new__(CompactFileNode)
+            copied.append(node)
+            stack.extend(node._children)
+            stack.extend(pruned for _, pruned in node._pruned or [])
+        for node in copied:
+            result = memo[id(node)]
+            for slot in CompactFileNode.__slots__:
+                setattr(result, slot, copy.deepcopy(getattr(node, slot), memo) if slot == "_stats" else getattr(node, slot))
+            result._parent = memo.get(id(node._parent), node._parent)
+            result._children = [memo[id(child)] for child in node._children]
+            if node._pruned is not None:
+                result._pruned = [(position, memo[id(pruned)]) for position, pruned in node._pruned]
+        return memo[id(self)]
+
+    def get_children(self) -> List[CompactFileNode]:
+        """Get children nodes of current file node
+
+        :return: child file nodes
+        :rtype: List[CompactFileNode]
+        """
+        return self._children
+
+    def set_children(self, children: List[CompactFileNode], adopt: bool = True) -> None:
+        """children attribute setter, children get this node as parent
+
+        :param children: child nodes of a file node
+        :type children: List[CompactFileNode]
+        :param adopt: give the children this node as parent, False leaves them attached to the parent they have (for
+            nodes shared with another tree, see set_parent), defaults to True
+        :type adopt: bool, optional
+        """
+        if adopt:
+            for child in children:
+                child._parent = self
+        self._children = children
+
+    def get_pruned(self) -> Union[List[Tuple[int, CompactFileNode]], None]:
+        """Directories left out of the children of this node, see FileNode.get_pruned
+
+        :return: (position in children, node) pairs, None when pruned directories were not recorded
+        :rtype: Union[List[Tuple[int, CompactFileNode]], None]
+        """
+        return self._pruned
+
+    def set_pruned(self, pruned: Union[List[Tuple[int, CompactFileNode]], None]) -> None:
+        """pruned directories setter, see FileNode.get_pruned
+
+        :param pruned: (position in children, node) pairs
+        :type pruned: Union[List[Tuple[int, CompactFileNode]], None]
+        """
+        for _, node in pruned or []:
+            node._parent = self
+        self._pruned = pruned
+
+    def get_stats(self) -> Union[SubtreeStats, None]:
+        """Totals of the subtree below this directory, see FileNode.get_stats
+
+        :return: totals, None for files and when they were not computed
+        :rtype: Union[SubtreeStats, None]
+        """
+        return self._stats
+
+    def set_stats(self, stats: Union[SubtreeStats, None]) -> None:
+        """subtree totals setter, see FileNode.get_stats
+
+        :param stats: totals of the subtree
+        :type stats: Union[SubtreeStats, None]
+        """
+        self._stats = stats
+
+    def get_parent(self) -> Union[CompactFileNode, None]:
+        """parent node getter
+
+        :return: parent node, None if this node is not attached to a parent
+        :rtype: Union[CompactFileNode, None]
+        """
+        return self._parent if isinstance(self._parent, CompactFileNode) else None
+
+    def set_parent(self, parent: Union[CompactFileNode, pathlib2.Path]) -> None:
+        """parent setter, the node is not added to the children of parent (see set_children)
+
+        :param parent: parent node, or the parent directory path to detach the node
+        :type parent: Union[CompactFileNode, pathlib2.Path]
+        """
+        self._parent = parent
+
+    def get_path(self) -> pathlib2.Path:
+        """file path getter, built from the names up to the first node without parent node
+
+        :return: file path of this file node
+        :rtype: pathlib2.Path
+        """
+        names = []
+        node = self
+        while isinstance(node, CompactFileNode):
+            names.append(node._name)
+            node = node._parent
+        return node.joinpath(*reversed(names))
+
+    def get_filename(self) -> str:
+        """Filename getter
+
+        :return: filename of this file node
+        :rtype: str
+        """
+        return self._name
+
+    def get_stat(self) -> os.stat_result:
+        """file node stat getter, fields other than st_mode, st_size, st_mtime_ns, st_dev and st_ino are 0
+
+        :return: stat of this file node
+        :rtype: os.stat_result
+        """
+        return stat_from_fields(self._st_mode, self._st_ino, self._st_dev, 0, 0, 0, self._st_size, 0,
+                                self._st_mtime_ns, 0)
+
+    def get_id(self) -> UniqueFileIdentifier:
+        """FileNode id getter
+
+        :return: UniqueFileIdentifier (id) of this file node
+        :rtype: UniqueFileIdentifier
+        """
+        return UniqueFileIdentifier.from_ids(self._st_dev, self._st_ino)
+
+    def get_depth(self) -> int:
+        """FileNode depth relative to root getter
+
+        :return: depth of this file node with respect to root path
+        :rtype: int
+        """
+        return self._depth
+
+    def get_root(self) -> pathlib2.Path:
+        """root getter
+
+        :return: node's root path
+        :rtype: pathlib2.Path
+        """
+        return self._root
+
+    def get_relative_path(self) -> pathlib2.Path:
+        """file node's relative path to root getter
+
+        :return: file node's relative path, None if there is no root
+        :rtype: pathlib2.Path
+        """
+        return self.get_path().relative_to(self._root) if self._root else None
+
+    def is_dir(self) -> bool:
+        """Test if self is a directory
+
+        :return: whether this is a directory FileNode
+        :rtype: bool
+        """
+        return stat.S_ISDIR(self._st_mode)
+
+    def is_file(self) -> bool:
+        """Test if self is a file
+
+        :return: whether this is a file FileNode
+        :rtype: bool
+        """
+        return stat.S_ISREG(self._st_mode)
+
+    def to_bytes(self) -> bytes:
+        return pickle.dumps(self)
+
+    def to_stream(self, stream: io) -> None:
+        return pickle.dump(self, stream)
+
+    def to_dict(self) -> Dict:
+        """Generate dict style file node tree using self as root node, same output as FileNode.to_dict
+
+        :return: dict representing file tree rooted at self
+        :rtype: Dict
+        """
+        def to_dict(node: CompactFileNode, path: pathlib2.Path) -> Dict:
+            return {
+                "id": str(node.get_id()),
+                "depth": node._depth,
+                "filename": node._name,
+                "path": str(path),
+                "relative_path": str(path.relative_to(node._root) if node._root else None),
+                "root": str(node._root),
+                "children": [to_dict(child, path / child._name) for child in node._children],
+                "st_size": node._st_size,
+            }
+
+        return to_dict(self, self.get_path())
+
+    def to_json(self, indent: int = 0) -> str:
+        """Generate json style file node tree using self as root node
+
+        :param indent: number of space for indent, defaults to None
+        :type indent: int, optional
+        :return: json str representing file tree rooted at self
+        :rtype: str
+        """
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def walk(self, recursive: bool = False, no_dir: bool = False) -> Generator[CompactFileNode]:
+        """Walk through the children (recursively), see FileNode.walk
+
+        :param recursive: Recursive Search, defaults to False
+        :type recursive: bool, optional
+        :param no_dir: Don't consider directory, defaults to False
+        :type no_dir: bool, optional
+        :yield: A file node
+        :rtype: Generator[CompactFileNode]
+        """
+        if not no_dir:
+            yield self
+        for child in self._children:
+            if child.is_dir() and recursive:
+                yield from child.walk(recursive, no_dir)
+            elif child.is_file():
+                yield child
@@ -0,0 +1,372 @@
+"""
+Predicate filters on names and stat fields
+
+GlobFilter, SizeFilter, ModifiedFilter and OwnerFilter decide on files only (directories and other non-files are
+kept, as with the other file filters) and compose with & (all), | (any) and ~ (not), e.g.::
+
+    GlobFilter(["**/*.md"]) & SizeFilter(min_size=1) & ~ModifiedFilter(before=datetime(2020, 1, 1))
+
+A composition is compiled once, when the filter list is compiled (see compile_filters), into nested closures: glob
+patterns are merged into one regular expression, bounds are turned into integer comparisons and cheap predicates run
+first. The stat of a path is taken at most once per path and shared by all predicates; paths listed by the scraper are
+FileEntry objects whose stat comes with the directory entry, and is the one the scraper keeps in the tree anyway.
+"""
+import os
+import re
+import fnmatch
+import datetime
+from typing import Callable, Iterable, List, Union
+
+import pathlib2
+
+from fmtree.core.filter import BaseFileFilter, IGNORE_MODE, merge_patterns, relative_path_getter
+from fmtree.core.gitignore import translate_glob
+
+Test = Callable[[pathlib2.Path, dict], bool]
+
+_STAT = object()
+
+
+def _stat(path: pathlib2.Path, cache: dict) -> os.stat_result:
+    """Stat of path, taken once and kept in the cache dict of the path"""
+    stat_ = cache.get(_STAT)
+    if stat_ is None:
+        stat_ = cache[_STAT] = path.stat()
+    return stat_
+
+
+class PredicateFilter(BaseFileFilter):
+    """
+    Base class of composable filters deciding on files, see the module docstring
+    Subclasses implement predicate(). When composed, only the ignore_list of the outermost filter applies.
+    """
+    per_item = True
+    #: relative cost of predicate(), cheaper predicates run first in compositions
+    cost = 1
+
+    def predicate(self) -> Test:
+        """Compile the decision on a file
+
+        :raises NotImplementedError: Abstract method has to be implemented
+        :return: function of a file path and its cache dict (see BaseFileFilter.keep_test), telling whether to keep it
+        :rtype: Test
+        """
+        raise NotImplementedError
+
+    def keep_test(self) -> Test:
+        predicate = self.predicate()
+
+        def test(path: pathlib2.Path, cache: dict) -> bool:
+            if not path.is_file():
+                return True
+            try:
+                return predicate(path, cache)
+            except OSError:
+                return False
+
+        return test
+
+    def keep(self, path: pathlib2.Path) -> bool:
+        return self.keep_test()(path, {})
+
+    def filter(self, items: Iterable) -> Iterable:
+        test = self.keep_test()
+        return [path for path in items if test(path, {})]
+
+    def __and__(self, other: "PredicateFilter") -> "AllFilter":
+        return AllFilter([self, other])
+
+    def __or__(self, other: "PredicateFilter") -> "AnyFilter":
+        return AnyFilter([self, other])
+
+    def __invert__(self) -> "NotFilter":
+        return NotFilter(self)
+
+    def __repr__(self) -> str:
+        state = ", ".join(f"{key}={value!r}" for key, value in sorted(vars(self).items()) if key != "root_path")
+        return f"{type(self).__name__}({state})"
+
+
+class AllFilter(PredicateFilter):
+    """Keep files all filters keep"""
+
+    def __init__(self, filters: Iterable[PredicateFilter], ignore_list: Iterable = None,
+                 root_path: pathlib2.Path = None, mode: int = IGNORE_MODE, prune_list: Iterable = None) -> None:
+        """AllFilter Initializer, nested AllFilter are flattened
+
+        :param filters: filters to combine
+        :type filters: Iterable[PredicateFilter]
+        :param ignore_list: list of regex to ignore, see BaseFileFilter, defaults to None
+        :type ignore_list: Iterable, optional
+        :param root_path: path to scrape, defaults to None
+        :type root_path: pathlib2.Path, optional
+        :param mode: mode of ignore_list, see BaseFileFilter, defaults to IGNORE_MODE
+        :type mode: int, optional
+        :param prune_list: directories not to descend into, see BaseFileFilter, defaults to None
+        :type prune_list: Iterable, optional
+        """
+        super(AllFilter, self).__init__(ignore_list=ignore_list, root_path=root_path, mode=mode,
+                                        prune_list=prune_list)
+        self.filters: List[PredicateFilter] = []
+        for filter_ in filters:
+            if type(filter_) is type(self) and not filter_.ignore_list and not filter_.prune_list:
+                self.filters.extend(filter_.filters)
+            else:
+                self.filters.append(filter_)
+
+    @property
+    def cost(self) -> int:
+        return sum(filter_.cost for filter_ in self.filters)
+
+    def set_root_path(self, root_path: pathlib2.Path) -> None:
+        super(AllFilter, self).set_root_path(root_path)
+        for filter_ in self.filters:
+            filter_.set_root_path(root_path)
+
+    def _tests(self) -> List[Test]:
+        return [filter_.predicate() for filter_ in sorted(self.filters, key=lambda filter_: filter_.cost)]
+
+    def predicate(self) -> Test:
+        tests = self._tests()
+        if not tests:
+            return lambda path, cache: True
+        if len(tests) == 1:
+            return tests[0]
+        if len(tests) == 2:
+            first, second = tests
+            return lambda path, cache: first(path, cache) and second(path, cache)
+
+        def all_(path: pathlib2.Path, cache: dict) -> bool:
+            for test in tests:
+                if not test(path, cache):
+                    return False
+            return True
+
+        return all_
+
+
+class AnyFilter(AllFilter):
+    """Keep files any of the filters keeps"""
+
+    def predicate(self) -> Test:
+        tests = self._tests()
+        if not tests:
+            return lambda path, cache: False
+        if len(tests) == 1:
+            return tests[0]
+        if len(tests) == 2:
+            first, second = tests
+            return lambda path, cache: first(path, cache) or second(path, cache)
+
+        def any_(path: pathlib2.Path, cache: dict) -> bool:
+            for test in tests:
+                if test(path, cache):
+                    return True
+            return False
+
+        return any_
+
+
+class NotFilter(PredicateFilter):
+    """Keep files a filter drops"""
+
+    def __init__(self, filter_: PredicateFilter, ignore_list: Iterable = None, root_path: pathlib2.Path = None,
+                 mode: int = IGNORE_MODE, prune_list: Iterable = None) -> None:
+        """NotFilter Initializer
+
+        :param filter_: filter to negate
+        :type filter_: PredicateFilter
+        :param ignore_list: list of regex to ignore, see BaseFileFilter, defaults to None
+        :type ignore_list: Iterable, optional
+        :param root_path: path to scrape, defaults to None
+        :type root_path: pathlib2.Path, optional
+        :param mode: mode of ignore_list, see BaseFileFilter, defaults to IGNORE_MODE
+        :type mode: int, optional
+        :param prune_list: directories not to descend into, see BaseFileFilter, defaults to None
+        :type prune_list: Iterable, optional
+        """
+        super(NotFilter, self).__init__(ignore_list=ignore_list, root_path=root_path, mode=mode,
+                                        prune_list=prune_list)
+        self.filter_ = filter_
+
+    @property
+    def cost(self) -> int:
+        return self.filter_.cost
+
+    def set_root_path(self, root_path: pathlib2.Path) -> None:
+        super(NotFilter, self).set_root_path(root_path)
+        self.filter_.set_root_path(root_path)
+
+    def predicate(self) -> Test:
+        test = self.filter_.predicate()
+        return lambda path, cache: not test(path, cache)
+
+
+class GlobFilter(PredicateFilter):
+    """
+    Keep files matching any of the glob patterns, see gitignore.translate_glob: patterns without "/" match the file
+    name ("*.md"), others the path relative to the scraped root ("docs/**/*.md", "**" matches any number of
+    directories)
+    """
+    cost = 0
+
+    def __init__(self, patterns: Iterable[str], ignore_list: Iterable = None, root_path: pathlib2.Path = None,
+                 mode: int = IGNORE_MODE, prune_list: Iterable = None) -> None:
+        """GlobFilter Initializer
+
+        :param patterns: glob patterns
+        :type patterns: Iterable[str]
+        :param ignore_list: list of regex to ignore, see BaseFileFilter, defaults to None
+        :type ignore_list: Iterable, optional
+        :param root_path: path to scrape, defaults to None
+        :type root_path: pathlib2.Path, optional
+        :param mode: mode of ignore_list, see BaseFileFilter, defaults to IGNORE_MODE
+        :type mode: int, optional
+        :param prune_list: directories not to descend into, see BaseFileFilter, defaults to None
+        :type prune_list: Iterable, optional
+        """
+        super(GlobFilter, self).__init__(ignore_list=ignore_list, root_path=root_path, mode=mode,
+                                         prune_list=prune_list)
+        self.patterns = list(patterns)
+
+    def predicate(self) -> Test:
+        name_patterns = [re.compile(fnmatch.translate(pattern)) for pattern in self.patterns if "/" not in pattern]
+        path_patterns = [re.compile(translate_glob(pattern), re.DOTALL) for pattern in self.patterns
+                         if "/" in pattern]
+        tests = []
+        if name_patterns:
+            name_matches = merge_patterns(name_patterns, full=True)
+            tests.append(lambda path, cache: name_matches(path.name))
+        if path_patterns:
+            path_matches = merge_patterns(path_patterns, full=True)
+            relative = relative_path_getter(self.root_path)
+            if os.sep == "/":
+                tests.append(lambda path, cache: path_matches(relative(path, cache)))
+            else:
+                tests.append(lambda path, cache: path_matches(relative(path, cache).replace(os.sep, "/")))
+        if not tests:
+            return lambda path, cache: False
+        if len(tests) == 1:
+            return tests[0]
+        first, second = tests
+        return lambda path, cache: first(path, cache) or second(path, cache)
+
+
+class SizeFilter(PredicateFilter):
+    """Keep files whose size (st_size, in bytes) is within bounds"""
+
+    def __init__(self, min_size: int = None, max_size: int = None, ignore_list: Iterable = None,
+                 root_path: pathlib2.Path = None, mode: int = IGNORE_MODE, prune_list: Iterable = None) -> None:
+        """SizeFilter Initializer
+
+        :param min_size: smallest size kept, defaults to None (no bound)
+        :type min_size: int, optional
+        :param max_size: largest size kept, defaults to None (no bound)
+        :type max_size: int, optional
+        :param ignore_list: list of regex to ignore, see BaseFileFilter, defaults to None
+        :type ignore_list: Iterable, optional
+        :param root_path: path to scrape, defaults to None
+        :type root_path: pathlib2.Path, optional
+        :param mode: mode of ignore_list, see BaseFileFilter, defaults to IGNORE_MODE
+        :type mode: int, optional
+        :param prune_list: directories not to descend into, see BaseFileFilter, defaults to None
+        :type prune_list: Iterable, optional
+        """
+        super(SizeFilter, self).__init__(ignore_list=ignore_list, root_path=root_path, mode=mode,
+                                         prune_list=prune_list)
+        self.min_size = min_size
+        self.max_size = max_size
+
+    def predicate(self) -> Test:
+        low = self.min_size if self.min_size is not None else 0
+        high = self.max_size if self.max_size is not None else float("inf")
+        return lambda path, cache: low <= _stat(path, cache).st_size <= high
+
+
+def _to_ns(value: Union[datetime.datetime, float, int, None]) -> Union[int, None]:
+    """Time as integer nanoseconds since the epoch, naive datetimes are local time"""
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        value = value.timestamp()
+    return int(round(value * 1_000_000_000))
+
+
+class ModifiedFilter(PredicateFilter):
+    """Keep files modified (st_mtime_ns) since a time and/or before a time"""
+
+    def __init__(self, since: Union[datetime.datetime, float] = None, before: Union[datetime.datetime, float] = None,
+                 ignore_list: Iterable = None, root_path: pathlib2.Path = None, mode: int = IGNORE_MODE,
+                 prune_list: Iterable = None) -> None:
+        """ModifiedFilter Initializer
+
+        :param since: earliest modification time kept, datetime or seconds since the epoch, defaults to None
+        :type since: Union[datetime.datetime, float], optional
+        :param before: modification times kept are earlier than this, defaults to None
+        :type before: Union[datetime.datetime, float], optional
+        :param ignore_list: list of regex to ignore, see BaseFileFilter, defaults to None
+        :type ignore_list: Iterable, optional
+        :param root_path: path to scrape, defaults to None
+        :type root_path: pathlib2.Path, optional
+        :param mode: mode of ignore_list, see BaseFileFilter, defaults to IGNORE_MODE
+        :type mode: int, optional
+        :param prune_list: directories not to descend into, see BaseFileFilter, defaults to None
+        :type prune_list: Iterable, optional
+        """
+        super(ModifiedFilter, self).__init__(ignore_list=ignore_list, root_path=root_path, mode=mode,
+                                             prune_list=prune_list)
+        self.since_ns = _to_ns(since)
+        self.before_ns = _to_ns(before)
+
+    def predicate(self) -> Test:
+        since, before = self.since_ns, self.before_ns
+        if since is not None and before is not None:
+            return lambda path, cache: since <= _stat(path, cache).st_mtime_ns < before
+        if since is not None:
+            return lambda path, cache: _stat(path, cache).st_mtime_ns >= since
+        if before is not None:
+            return lambda path, cache: _stat(path, cache).st_mtime_ns < before
+        return lambda path, cache: True
+
+
+class OwnerFilter(PredicateFilter):
+    """Keep files owned by a user and/or group"""
+
+    def __init__(self, user: Union[str, int] = None, group: Union[str, int] = None, ignore_list: Iterable = None,
+                 root_path: pathlib2.Path = None, mode: int = IGNORE_MODE, prune_list: Iterable = None) -> None:
+        """OwnerFilter Initializer, names are resolved to ids once, here (POSIX only)
+
+        :param user: user name or uid, defaults to None (any)
+        :type user: Union[str, int], optional
+        :param group: group name or gid, defaults to None (any)
+        :type group: Union[str, int], optional
+        :param ignore_list: list of regex to ignore, see BaseFileFilter, defaults to None
+        :type ignore_list: Iterable, optional
+        :param root_path: path to scrape, defaults to None
+        :type root_path: pathlib2.Path, optional
+        :param mode: mode of ignore_list, see BaseFileFilter, defaults to IGNORE_MODE
+        :type mode: int, optional
+        :param prune_list: directories not to descend into, see BaseFileFilter, defaults to None
+        :type prune_list: Iterable, optional
+        :raises KeyError: unknown user or group name
+        """
+        super(OwnerFilter, self).__init__(ignore_list=ignore_list, root_path=root_path, mode=mode,
+                                          prune_list=prune_list)
+        if isinstance(user, str):
+            import pwd
+            user = pwd.getpwnam(user).pw_uid
+        if isinstance(group, str):
+            import grp
+            group = grp.getgrnam(group).gr_gid
+        self.uid = user
+        self.gid = group
+
+    def predicate(self) -> Test:
+        uid, gid = self.uid, self.gid
+        if uid is not None and gid is not None:
+            return lambda path, cache: _stat(path, cache).st_uid == uid and _stat(path, cache).st_gid == gid
+        if uid is not None:
+            return lambda path, cache: _stat(path, cache).st_uid == uid
+        if gid is not None:
+            return lambda path, cache: _stat(path, cache).st_gid == gid
+        return lambda path, cache: True
@@ -1,10 +1,73 @@
-from fmtree.core.node import FileNode
-from fmtree.core.filter import BaseFileFilter
-from typing import Tuple, Iterable
+from fmtree.core.node import FileNode, CompactFileNode, UniqueFileIdentifier
+from fmtree.core.filter import BaseFileFilter, compile_filters, compile_pruning
+from fmtree.core.cache import ScanCache, describe_settings
+from fmtree.core.columnar import ColumnarTree
+from fmtree.core.entry import FileEntry
+from fmtree.core.aggregate import SubtreeStats
+from fmtree.core.index import TreeIndex
+from fmtree.core.sorter import BaseSorter, KeySorter
+from typing import Any, Callable, Tuple, Iterable, List, AsyncIterator, Generator, Union
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+import os
+import stat
+import asyncio
+import threading
 import pathlib2
 
 
+class _ScrapeFrame:
+    """A directory on the explicit stack of Scraper.scrape
+    peeked, resolved and candidate hold the lookahead state of Scraper.stream, previous and reused the node of this
+    directory in the previous tree of an incremental rescan, stats the totals of the kept entries so far
+    """
+    __slots__ = ("path", "depth", "stat", "entries", "index", "children", "found_any", "pruned", "peeked", "resolved",
+                 "candidate", "previous", "reused", "stats")
+
+    def __init__(self, path: pathlib2.Path, depth: int, stat_: os.stat_result,
+                 entries: List[Tuple[pathlib2.Path, os.stat_result]]) -> None:
+        self.path = path
+        self.depth = depth
+        self.stat = stat_
+        self.entries = entries
+        self.index = 0
+        self.children = []
+        self.found_any = False
+        self.pruned = []
+        self.peeked = None
+        self.resolved = False
+        self.candidate = None
+        self.previous = None
+        self.reused = False
+        self.stats = SubtreeStats()
+
+
+class _ListedEntry:
+    """A kept entry of a listing as the sorter of a Scraper sees it, answering the node getters sort keys use from the
+    path and stat of the listing
+    """
+    __slots__ = ("path", "stat")
+
+    def __init__(self, path: pathlib2.Path, stat_: os.stat_result) -> None:
+        self.path = path
+        self.stat = stat_
+
+    def get_path(self) -> pathlib2.Path:
+        return self.path
+
+    def get_filename(self) -> str:
+        return self.path.name
+
+    def get_stat(self) -> os.stat_result:
+        return self.stat
+
+    def is_dir(self) -> bool:
+        return stat.S_ISDIR(self.stat.st_mode)
+
+    def is_file(self) -> bool:
+        return stat.S_ISREG(self.stat.st_mode)
+
+
 class BaseScraper(ABC):
     def __init__(self, path: pathlib2.Path, scrape_now: bool = False, filters: Iterable[BaseFileFilter] = None):
         """Base Scraper Initializer
@@ -67,45 +130,688 @@ class Scraper(BaseScraper):
     """
 
     def __init__(self, path: pathlib2.Path, filters: Iterable[BaseFileFilter] = None, scrape_now: bool = False,
-                 keep_empty_dir: bool = False, depth: int = None) -> None:
+                 keep_empty_dir: bool = False, depth: int = None, incremental: bool = False,
+                 compact: bool = False, sorter: Union[BaseSorter, Callable[[FileNode], Any]] = None,
+                 aggregate: bool = False, indexed: bool = False) -> None:
         """
         Initialize Scraper with different properties and addons
         :param path: target path to scrape
         :param filters: filters for filtering out unwanted files
         :param scrape_now: start scraping right after initialization
+        :param incremental: record pruned directories on their parent node (see FileNode.get_pruned), so that a
+            later run(previous_tree=...) can reuse directories even when keep_empty_dir is False
+        :param compact: build the tree out of CompactFileNode instead of FileNode, for very large trees
+        :param sorter: sorter (see fmtree.core.sorter) or sort key ordering every listing as it is scraped, so run()
+            returns a sorted tree and stream() yields in sorted order, without a sorting pass over the tree
+        :param aggregate: store the totals of every directory (size, files, ...) on its node while scraping, see
+            fmtree.core.aggregate and FileNode.get_stats
+        :param indexed: index the tree by path, parent and file identity while scraping, see get_index
         """
         self._keep_empty_dir = keep_empty_dir
         self.depth_limit = depth
+        self.incremental = incremental
+        self.node_class = CompactFileNode if compact else FileNode
+        self.sorter = sorter if sorter is None or isinstance(sorter, BaseSorter) else KeySorter([sorter])
+        self.aggregate = aggregate
+        self.indexed = indexed
+        self.index = None
+        self._compiled_filters = None
         super(Scraper, self).__init__(
             path, scrape_now=scrape_now, filters=filters)
         if not self.root.exists():
             raise ValueError(f"Path Not Exist: {str(self.root)}")
 
-    def scrape(self, path: pathlib2.Path, depth: int) -> Tuple[FileNode, bool]:
+    def compiled_filters(self) -> Callable[[Iterable[pathlib2.Path]], List[pathlib2.Path]]:
+        """self.filters compiled into one callable (see compile_filters), compiled again at the start of every scrape,
+        so changes to the settings of a filter apply from the next scrape on, and when the list changes
+
+        :return: function taking paths and returning the kept ones
+        :rtype: Callable[[Iterable[pathlib2.Path]], List[pathlib2.Path]]
+        """
+        return self._compile()[1]
+
+    def _compile(self) -> Tuple[tuple, Callable, Callable]:
+        filters = tuple(self.filters)
+        compiled = self._compiled_filters
+        if compiled is None or compiled[0] != filters:
+            compiled = self._compiled_filters = (filters, compile_filters(filters), compile_pruning(filters))
+        return compiled
+
+    def _begin_scrape(self) -> None:
+        """Call begin_scrape of every filter, then compile the filters again"""
+        for filter_ in self.filters:
+            filter_.begin_scrape()
+        self._compiled_filters = None
+        self._compile()
+
+    def descends(self, path: pathlib2.Path, depth: int) -> bool:
+        """Whether a directory is listed when scraped, it is not at the depth limit or pruned by a filter (see
+        BaseFileFilter.prune), the root is never pruned. Directories that are not listed are treated as empty.
+
+        :param path: directory
+        :type path: pathlib2.Path
+        :param depth: depth of the directory with respect to the root node
+        :type depth: int
+        :return: whether to list the directory
+        :rtype: bool
+        """
+        return depth != self.depth_limit and (depth == 0 or not self._compile()[2](path))
+
+    def scan_dir(self, path: pathlib2.Path) -> List[Tuple[pathlib2.Path, os.stat_result]]:
+        """List a directory with os.scandir, apply filters and stat every kept entry exactly once
+
+        Filters receive FileEntry paths, which answer is_dir(), is_file() and stat() from the os.DirEntry of the
+        listing, so filters deciding on names and entry types make no system calls. Stat results are cached by the
+        DirEntry as well, so the returned stat can be handed over to FileNode and UniqueFileIdentifier without touching
+        the file system again. Returned paths are detached from their DirEntry (see FileEntry.detach).
+        Entries that cannot be stat-ed (e.g. broken symbolic links) are skipped. Entries are ordered by the sorter,
+        if any (see sort_entries).
+
+        :param path: directory to list
+        :type path: pathlib2.Path
+        :return: kept paths paired with their (symlink-following) stat
+        :rtype: List[Tuple[pathlib2.Path, os.stat_result]]
+        """
+        with os.scandir(str(path)) as it:
+            entries = [FileEntry.from_dir_entry(path, entry) for entry in it]
+        paths = self.compiled_filters()(entries)
+        result = []
+        for filepath in paths:
+            try:
+                filestat = filepath.stat()
+            except OSError:
+                continue
+            if isinstance(filepath, FileEntry):
+                filepath.detach()
+            result.append((filepath, filestat))
+        return self.sort_entries(result)
+
+    def sort_entries(self, entries: List[Tuple[pathlib2.Path, os.stat_result]]
+                     ) -> List[Tuple[pathlib2.Path, os.stat_result]]:
+        """Order a listing with self.sorter, before any node is made of it
+        The sorter gets the entries as objects answering get_path(), get_filename(), get_stat(), is_dir() and is_file()
+        like nodes do (no children, no depth), which is what the sort keys of fmtree.core.sorter use. Like in a tree,
+        entries the sorter leaves out are dropped.
+
+        :param entries: kept paths paired with their stat, see scan_dir
+        :type entries: List[Tuple[pathlib2.Path, os.stat_result]]
+        :return: the entries in sorted order
+        :rtype: List[Tuple[pathlib2.Path, os.stat_result]]
+        """
+        if self.sorter is None or len(entries) < 2:
+            return entries
+        listed = self.sorter.sorted([_ListedEntry(path, stat_) for path, stat_ in entries])
+        return [(entry.path, entry.stat) for entry in listed]
+
+    def _is_unchanged(self, previous: FileNode, stat_: os.stat_result) -> bool:
+        """Decide whether the listing of a directory can be taken from its node in the previous tree
+        A directory is unchanged when it is still the same inode and its st_mtime_ns did not move, which holds as long
+        as no entry was added, removed or renamed in it. Pruned directories must be known unless keep_empty_dir is set,
+        and every filter must still keep the same entries (see BaseFileFilter.reuses_listing).
+
+        :param previous: node of the directory in the previous tree
+        :type previous: FileNode
+        :param stat_: current stat of the directory
+        :type stat_: os.stat_result
+        :return: whether the previous listing is still valid
+        :rtype: bool
+        """
+        old = previous.get_stat()
+        return (previous.is_dir() and old.st_ino == stat_.st_ino and old.st_dev == stat_.st_dev and
+                old.st_mtime_ns == stat_.st_mtime_ns and
+                (self._keep_empty_dir or previous.get_pruned() is not None) and
+                all(filter_.reuses_listing(previous.get_path()) for filter_ in self.filters))
+
+    @staticmethod
+    def _reuse_listing(previous: FileNode) -> List[Tuple[pathlib2.Path, os.stat_result]]:
+        """Rebuild the listing of an unchanged directory from its node in the previous tree
+        Only sub-directories are stat-ed again (they are rescanned themselves), files keep their previous stat
+
+        :param previous: node of the directory in the previous tree
+        :type previous: FileNode
+        :return: kept paths paired with their stat, see scan_dir
+        :rtype: List[Tuple[pathlib2.Path, os.stat_result]]
         """
-        Use recursion to scrape a given path and return a tree structure
+        nodes = list(previous.get_children())
+        for position, node in reversed(previous.get_pruned() or []):
+            nodes.insert(position, node)
+        entries = []
+        for node in nodes:
+            if node.is_dir():
+                try:
+                    entries.append((node.get_path(), os.stat(str(node.get_path()))))
+                except OSError:
+                    continue
+            else:
+                entries.append((node.get_path(), node.get_stat()))
+        return entries
+
+    def _open_frame(self, path: pathlib2.Path, depth: int, stat_: os.stat_result,
+                    previous: FileNode = None) -> _ScrapeFrame:
+        """List a directory and wrap it into a stack frame, directories at the depth limit are not listed
+
+        :param path: directory to open
+        :type path: pathlib2.Path
+        :param depth: depth of the directory with respect to the root node
+        :type depth: int
+        :param stat_: stat of the directory
+        :type stat_: os.stat_result
+        :param previous: node of the directory in the previous tree of an incremental rescan, defaults to None
+        :type previous: FileNode, optional
+        :return: frame holding the filtered entries of the directory
+        :rtype: _ScrapeFrame
+        """
+        reused = False
+        if not self.descends(path, depth):
+            entries = []
+        elif previous is not None and self._is_unchanged(previous, stat_):
+            entries = self.sort_entries(self._reuse_listing(previous))
+            reused = True
+        else:
+            entries = self.scan_dir(path)
+        frame = _ScrapeFrame(path, depth, stat_, entries)
+        if previous is not None:
+            frame.previous = {node.get_filename(): node for node in previous.get_children()}
+            frame.previous.update((node.get_filename(), node) for _, node in previous.get_pruned() or [])
+            frame.reused = reused
+        return frame
+
+    def scrape(self, path: pathlib2.Path, depth: int, stat_: os.stat_result = None,
+               previous: FileNode = None) -> Tuple[FileNode, bool]:
+        """
+        Scrape a given path with an explicit stack and return a tree structure
+        Every directory is pushed when entered and turned into a FileNode when all its entries are processed, so the
+        depth of the tree is not bounded by the recursion limit.
+        A directory is added to self.history before it is entered, which stops symbolic link loops.
         :param path: target file path to scrape
         :param depth: depth of node with respect to the root node
+        :param stat_: stat of path if already known, defaults to None
+        :param previous: node of path in a previous scan, unchanged directories are not listed again, defaults to None
         :return: the scraped file node tree and whether any target files set by filters were found
+        With indexed=True, self.index is replaced by the index of the new tree.
         """
-        children = []
-        found_any = False
-        paths = list(path.iterdir())
-        for filter_ in self.filters:
-            paths = filter_(paths)
-        if depth != self.depth_limit:
-            for filepath in paths:
-                node = FileNode(filepath, depth=depth + 1, root=self.root)
-                if (filepath.is_symlink() or filepath.is_dir()) and node.get_id() not in self.history:
-                    subtree, found_any_ = self.scrape(filepath, depth + 1)
-                    if found_any_:
-                        found_any = True
-                    if self._keep_empty_dir or found_any_:
-                        children.append(subtree)
-                elif filepath.is_file():
-                    children.append(node)
-                    found_any = True
+        if stat_ is None:
+            stat_ = path.stat()
+        self._begin_scrape()
+        steps = self._assemble(path, depth, stat_, previous)
+        try:
+            request = next(steps)
+            while True:
+                request = steps.send(self._open_frame(*request))
+        except StopIteration as stop:
+            return stop.value
+
+    def _assemble(self, path: pathlib2.Path, depth: int, stat_: os.stat_result, previous: FileNode = None,
+                  emit: bool = False) -> Generator[Union[tuple, FileNode], _ScrapeFrame, Tuple[FileNode, bool]]:
+        """Tree building loop of scrape(), shared with AsyncScraper.iter_nodes, which makes no file system calls
+        Yields (path, depth, stat, previous) for every directory to open and expects its frame (see _open_frame) to be
+        sent back, so the caller decides where directories are listed. With emit, it also yields every kept node once
+        it is complete: files as soon as their directory is opened, directories after their subtree, the root last.
+
+        :param path: target file path to scrape
+        :param depth: depth of node with respect to the root node
+        :param stat_: stat of path
+        :param previous: node of path in a previous scan, see scrape, defaults to None
+        :param emit: yield the kept nodes as well, defaults to False
+        :return: the scraped file node tree and whether any target files set by filters were found
+        """
+        self.history.add(UniqueFileIdentifier(path, stat_))
+        index = TreeIndex() if self.indexed else None
+        root_length = len(str(path))
+        stack = [(yield path, depth, stat_, previous)]
+        while True:
+            frame = stack[-1]
+            entries = frame.entries
+            while frame.index < len(entries):
+                filepath, filestat = entries[frame.index]
+                frame.index += 1
+                file_id = UniqueFileIdentifier(filepath, filestat)
+                if stat.S_ISDIR(filestat.st_mode) and file_id not in self.history:
+                    self.history.add(file_id)
+                    previous = frame.previous.get(filepath.name) if frame.previous else None
+                    stack.append((yield filepath, frame.depth + 1, filestat, previous))
+                    break
+                elif stat.S_ISREG(filestat.st_mode):
+                    node = frame.previous.get(filepath.name) if frame.reused else None
+                    if node is None:
+                        node = self.node_class(filepath, depth=frame.depth + 1, root=self.root, stat_=filestat)
+                    elif self.aggregate:
+                        # reused file nodes keep their previous stat
+                        filestat = node.get_stat()
+                    frame.children.append(node)
+                    frame.found_any = True
+                    if self.aggregate:
+                        frame.stats.add_file(filestat)
+                    if emit:
+                        yield node
+                self.history.add(file_id)
+            else:
+                stack.pop()
+                node = self.node_class(frame.path, children=frame.children, depth=frame.depth, root=self.root,
+                                       stat_=frame.stat)
+                if self.incremental:
+                    node.set_pruned(frame.pruned)
+                if self.aggregate:
+                    node.set_stats(frame.stats)
+                if index is not None and frame.children:
+                    index.add_children(node, str(frame.path)[root_length:].lstrip(os.sep).replace(os.sep, "/"))
+                if not stack:
+                    if index is not None:
+                        index.set_root(node)
+                        self.index = index
+                    if emit:
+                        yield node
+                    return node, frame.found_any
+                parent = stack[-1]
+                if frame.found_any:
+                    parent.found_any = True
+                if self._keep_empty_dir or frame.found_any:
+                    parent.children.append(node)
+                    if self.aggregate:
+                        parent.stats.add_directory(frame.stats)
+                    if emit:
+                        yield node
+                elif self.incremental:
+                    parent.pruned.append((len(parent.children), node))
+
+    def run(self, inplace: bool = True, previous_tree: FileNode = None) -> FileNode:
+        """scrape the given path and form a tree structure
+
+        With previous_tree, the scrape is incremental: directories whose st_ino and st_mtime_ns match their node in
+        previous_tree are not listed again and their file nodes are reused as they are (so st_size and other stat
+        fields of those files are the previous ones), only sub-directories are stat-ed to look for changes below.
+        previous_tree must come from a scrape of the same root with the same filters and depth; with
+        keep_empty_dir=False it should come from Scraper(incremental=True), other directories are listed again.
+
+        :param inplace: set tree inplace, defaults to True
+        :type inplace: bool, optional
+        :param previous_tree: tree of a previous run to rescan incrementally, defaults to None
+        :type previous_tree: FileNode, optional
+        :raises ValueError: previous_tree has a different root
+        :return: the scraped tree of file nodes
+        :rtype: FileNode
+        """
+        if previous_tree is not None and previous_tree.get_path() != self.root:
+            raise ValueError(f"Previous tree root {previous_tree.get_path()} does not match {self.root}")
+        self.history = set()
+        tree, found_any = self.scrape(self.root, 0, previous=previous_tree)
+        if inplace:
+            self.tree = tree
+        return tree
+
+    def get_index(self) -> Union[TreeIndex, None]:
+        """
+        :return: index of the tree of the last scrape (see fmtree.core.index), None unless the scraper is indexed
+        :rtype: Union[TreeIndex, None]
+        """
+        return self.index
+
+    def _settings(self) -> str:
+        return describe_settings(self._keep_empty_dir, self.depth_limit, self.filters, self.sorter)
+
+    def _cache_path(self, path: Union[pathlib2.Path, str, None]) -> pathlib2.Path:
+        return ScanCache.default_path(self.root) if path is None else pathlib2.Path(path)
+
+    def save_cache(self, path: Union[pathlib2.Path, str] = None) -> None:
+        """Store self.tree in a persistent scan index (see fmtree.core.cache.ScanCache)
+
+        :param path: index file, defaults to None (ScanCache.default_path next to the root)
+        :type path: Union[pathlib2.Path, str], optional
+        """
+        if self.tree is None:
+            raise ValueError("Nothing scraped yet, call run() first")
+        with ScanCache(self._cache_path(path)) as cache:
+            cache.save(self.tree, self._settings())
+
+    def load_cache(self, path: Union[pathlib2.Path, str] = None, relative_path: str = None,
+                   inplace: bool = True) -> FileNode:
+        """Restore a tree from a persistent scan index instead of walking the file system
+
+        :param path: index file, defaults to None (ScanCache.default_path next to the root)
+        :type path: Union[pathlib2.Path, str], optional
+        :param relative_path: only load the subtree at this path relative to the root, defaults to None
+        :type relative_path: str, optional
+        :param inplace: set tree inplace (only when the whole tree is loaded), defaults to True
+        :type inplace: bool, optional
+        :raises ValueError: the index is missing or was written for another root or other settings
+        :return: the restored tree
+        :rtype: FileNode
+        """
+        path = self._cache_path(path)
+        if not path.exists():
+            raise ValueError(f"Scan index not found: {path}")
+        with ScanCache(path) as cache:
+            if not cache.validate(self.root, self._settings()):
+                raise ValueError(f"Scan index {path} does not match {self.root} or the scraper settings")
+            tree = cache.load(relative_path, node_class=self.node_class)
+        if inplace and relative_path is None:
+            self.tree = tree
+        return tree
+
+    def update_cache(self, path: Union[pathlib2.Path, str] = None, inplace: bool = True) -> FileNode:
+        """Rescan incrementally from the tree in a persistent scan index and store the result back
+        A missing or invalid index is replaced by a full scan
+
+        :param path: index file, defaults to None (ScanCache.default_path next to the root)
+        :type path: Union[pathlib2.Path, str], optional
+        :param inplace: set tree inplace, defaults to True
+        :type inplace: bool, optional
+        :return: the scraped tree of file nodes
+        :rtype: FileNode
+        """
+        try:
+            previous = self.load_cache(path, inplace=False)
+        except ValueError:
+            previous = None
+        tree = self.run(inplace=inplace, previous_tree=previous)
+        settings = self._settings()
+        with ScanCache(self._cache_path(path)) as cache:
+            cache.save(tree, settings)
+        return tree
+
+    def _peek(self, frame: _ScrapeFrame) -> Union[FileNode, _ScrapeFrame, None]:
+        """Resolve the next kept child of a directory being streamed without consuming it
+        With keep_empty_dir=False a sub-directory is only kept if a file is found below it, which is found out by
+        peeking depth-first into it. Every directory opened on the way keeps its listing and its own peeked child, so
+        the lookahead is picked up again when the stream gets there instead of listing anything twice.
+
+        :param frame: directory being streamed
+        :type frame: _ScrapeFrame
+        :return: a file node, the frame of a kept sub-directory, or None if there is no kept child left
+        :rtype: Union[FileNode, _ScrapeFrame, None]
+        """
+        if frame.resolved:
+            return frame.peeked
+        chain = [frame]
+        while chain:
+            current = chain[-1]
+            candidate = current.candidate
+            if candidate is not None:
+                current.candidate = None
+                if candidate.peeked is not None:
+                    current.peeked = candidate
+                    current.resolved = True
+                    chain.pop()
+                    continue
+            entries = current.entries
+            while current.index < len(entries):
+                filepath, filestat = entries[current.index]
+                current.index += 1
+                file_id = UniqueFileIdentifier(filepath, filestat)
+                if stat.S_ISDIR(filestat.st_mode) and file_id not in self.history:
+                    self.history.add(file_id)
+                    subframe = self._open_frame(filepath, current.depth + 1, filestat)
+                    if self._keep_empty_dir:
+                        current.peeked = subframe
+                    else:
+                        current.candidate = subframe
+                        chain.append(subframe)
+                    break
+                elif stat.S_ISREG(filestat.st_mode):
+                    current.peeked = self.node_class(filepath, depth=current.depth + 1, root=self.root, stat_=filestat)
+                    self.history.add(file_id)
+                    break
+                self.history.add(file_id)
+            else:
+                current.peeked = None
+            if current.candidate is None:
+                current.resolved = True
+                chain.pop()
+        return frame.peeked
+
+    def stream(self) -> Generator[Tuple[int, FileNode, bool], None, None]:
+        """Scrape self.root without building the tree, yield (depth, node, is_last) in pre-order as the walk proceeds
+
+        is_last tells whether node is the last kept child of its parent. Nodes are yielded without children, only the
+        directories on the current path and their listings are held in memory, plus a lookahead into the next sibling
+        when keep_empty_dir=False.
+        The yielded nodes and their order are the same as Scraper.run() gives, unless a directory is reachable
+        through several symbolic links, where the lookahead may pick another one of them first.
+
+        >>> formatter = TreeCommandFormatter()
+        >>> formatter.generate_from_stream(Scraper(Path("/data")).stream())
+
+        :yield: depth, file node and whether it is the last child of its parent
+        :rtype: Generator[Tuple[int, FileNode, bool], None, None]
+        """
+        self.history = set()
+        self._begin_scrape()
+        root_stat = self.root.stat()
+        self.history.add(UniqueFileIdentifier(self.root, root_stat))
+        stack = [self._open_frame(self.root, 0, root_stat)]
+        yield 0, self.node_class(self.root, depth=0, root=self.root, stat_=root_stat), True
+        while stack:
+            frame = stack[-1]
+            child = self._peek(frame)
+            frame.peeked = None
+            frame.resolved = False
+            if child is None:
+                stack.pop()
+                continue
+            is_last = self._peek(frame) is None
+            if isinstance(child, _ScrapeFrame):
+                yield child.depth, self.node_class(child.path, depth=child.depth, root=self.root, stat_=child.stat), is_last
+                stack.append(child)
+            else:
+                yield child.get_depth(), child, is_last
+
+    def run_columnar(self) -> ColumnarTree:
+        """scrape the given path into a ColumnarTree, the tree is never held in memory as nodes
+        self.tree is not set
+
+        :return: the scraped tree as columns
+        :rtype: ColumnarTree
+        """
+        return ColumnarTree.from_stream(self.stream())
+
+
+class ParallelScraper(Scraper):
+    """
+    Scraper that lists and stats directories on a thread pool, for file systems with high latency (e.g. NFS)
+    Workers run Scraper.scan_dir and submit listings of the sub-directories they find, so the pool crawls ahead of
+    the calling thread. The tree is still assembled by the calling thread in the same order as Scraper does, and
+    self.history is only read and written by that thread, so the resulting tree is the same as the one built by
+    Scraper. Workers keep their own set of submitted directories, which stops them on symbolic link loops.
+    At most prefetch listings are held ahead of the calling thread (submitted, running or done but not taken yet), the
+    sub-directories found while the limit is reached are listed when the calling thread gets to them, so memory does
+    not grow with the width of the tree.
+    Filters and the sorter are called from the worker threads, concurrently, and must be thread-safe: state they keep
+    across calls has to be locked, as GitignoreFilter does with the ignore files it reads. Filters are compiled (see
+    Scraper.compiled_filters) by the calling thread before the workers start.
+    """
+
+    def __init__(self, path: pathlib2.Path, filters: Iterable[BaseFileFilter] = None, scrape_now: bool = False,
+                 keep_empty_dir: bool = False, depth: int = None, workers: int = None, compact: bool = False,
+                 sorter: Union[BaseSorter, Callable[[FileNode], Any]] = None, aggregate: bool = False,
+                 indexed: bool = False, incremental: bool = False, prefetch: int = None) -> None:
+        """
+        Initialize ParallelScraper, see Scraper for the other arguments
+        :param workers: maximum number of threads listing directories, defaults to None (ThreadPoolExecutor default)
+        :param prefetch: maximum number of directory listings held ahead of the calling thread, defaults to None (4
+            per worker)
+        """
+        self.workers = workers
+        if prefetch is None:
+            prefetch = 4 * (workers if workers is not None else min(32, (os.cpu_count() or 1) + 4))
+        self.prefetch = prefetch
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._submitted = set()
+        super(ParallelScraper, self).__init__(path, filters=filters, scrape_now=scrape_now,
+                                              keep_empty_dir=keep_empty_dir, depth=depth, compact=compact,
+                                              sorter=sorter, aggregate=aggregate, indexed=indexed,
+                                              incremental=incremental)
+
+    def _prefetch(self, path: pathlib2.Path, depth: int) -> List[Tuple[pathlib2.Path, os.stat_result]]:
+        """List a directory and submit listings of its sub-directories to the pool
+
+        :param path: directory to list
+        :type path: pathlib2.Path
+        :param depth: depth of the directory with respect to the root node
+        :type depth: int
+        :return: kept paths paired with their stat, see Scraper.scan_dir
+        :rtype: List[Tuple[pathlib2.Path, os.stat_result]]
+        """
+        entries = self.scan_dir(path)
+        if depth + 1 != self.depth_limit:
+            with self._lock:
+                for filepath, filestat in entries:
+                    if self._pool is None or len(self._pending) >= self.prefetch:
+                        break
+                    file_id = UniqueFileIdentifier(filepath, filestat)
+                    if stat.S_ISDIR(filestat.st_mode) and file_id not in self._submitted and \
+                            self.descends(filepath, depth + 1):
+                        self._submitted.add(file_id)
+                        self._pending[filepath] = self._pool.submit(self._prefetch, filepath, depth + 1)
+        return entries
+
+    def _open_frame(self, path: pathlib2.Path, depth: int, stat_: os.stat_result,
+                    previous: FileNode = None) -> _ScrapeFrame:
+        """Take the prefetched listing of a directory, or list it here if no worker has picked it up yet
+        Incremental rescans (previous is set) are not prefetched
+
+        :param path: directory to open
+        :type path: pathlib2.Path
+        :param depth: depth of the directory with respect to the root node
+        :type depth: int
+        :param stat_: stat of the directory
+        :type stat_: os.stat_result
+        :param previous: node of the directory in the previous tree of an incremental rescan, defaults to None
+        :type previous: FileNode, optional
+        :return: frame holding the filtered entries of the directory
+        :rtype: _ScrapeFrame
+        """
+        if previous is not None:
+            return super(ParallelScraper, self)._open_frame(path, depth, stat_, previous)
+        with self._lock:
+            future = self._pending.pop(path, None)
+        if not self.descends(path, depth):
+            entries = []
+        elif future is None or future.cancel():
+            entries = self._prefetch(path, depth)
+        else:
+            entries = future.result()
+        return _ScrapeFrame(path, depth, stat_, entries)
+
+    def scrape(self, path: pathlib2.Path, depth: int, stat_: os.stat_result = None,
+               previous: FileNode = None) -> Tuple[FileNode, bool]:
+        """
+        Scrape a given path with a thread pool and return a tree structure
+        :param path: target file path to scrape
+        :param depth: depth of node with respect to the root node
+        :param stat_: stat of path if already known, defaults to None
+        :param previous: node of path in a previous scan, see Scraper.scrape, defaults to None
+        :return: the scraped file node tree and whether any target files set by filters were found
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            self._pool = pool
+            try:
+                return super(ParallelScraper, self).scrape(path, depth, stat_, previous)
+            finally:
+                with self._lock:
+                    self._pool = None
+                    for future in self._pending.values():
+                        future.cancel()
+                    self._pending = {}
+                    self._submitted = set()
+
+
+class AsyncScraper(ParallelScraper):
+    """
+    Scraper for asyncio applications, every file system call runs on a bounded thread pool instead of the event loop
+
+    >>> scraper = AsyncScraper(Path("/srv/www"), filters=[MarkdownFilter()], workers=8)
+    >>> tree = await scraper.arun()
+    >>> async for node in scraper.iter_nodes():
+            print(node.get_path())
+
+    Directories are prefetched the same way as in ParallelScraper and filters, depth, keep_empty_dir, incremental
+    rescans and the other options behave as in Scraper. Filters are only called on the pool, since they may read
+    files (e.g. GitignoreFilter). The synchronous methods inherited from ParallelScraper (run(), scrape(),
+    update_cache(), scrape_now=True) are still available and block the calling thread.
+    """
+
+    async def _open_frame_async(self, path: pathlib2.Path, depth: int, stat_: os.stat_result,
+                                previous: FileNode = None) -> _ScrapeFrame:
+        """Awaitable version of ParallelScraper._open_frame, which runs on the pool unless a worker is listing the
+        directory already, then its listing is awaited without holding a thread
+
+        :param path: directory to open
+        :type path: pathlib2.Path
+        :param depth: depth of the directory with respect to the root node
+        :type depth: int
+        :param stat_: stat of the directory
+        :type stat_: os.stat_result
+        :param previous: node of the directory in the previous tree of an incremental rescan, defaults to None
+        :type previous: FileNode, optional
+        :return: frame holding the filtered entries of the directory
+        :rtype: _ScrapeFrame
+        """
+        if previous is None:
+            with self._lock:
+                future = self._pending.pop(path, None)
+            # directories are only prefetched when they are listed at all (see _prefetch)
+            if future is not None and not future.cancel():
+                return _ScrapeFrame(path, depth, stat_, await asyncio.wrap_future(future))
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._open_frame, path, depth, stat_, previous)
+
+    async def iter_nodes(self, previous_tree: FileNode = None) -> AsyncIterator[FileNode]:
+        """Scrape self.root and yield file nodes as they are found
+        Files are yielded as soon as their directory is listed, directories once their subtree is complete (and only
+        if they are kept), so the root node comes last and holds the whole tree.
+
+        :param previous_tree: tree of a previous run to rescan incrementally, see Scraper.run, defaults to None
+        :type previous_tree: FileNode, optional
+        :raises ValueError: previous_tree has a different root
+        :yield: a file node
+        :rtype: AsyncIterator[FileNode]
+        """
+        if previous_tree is not None and previous_tree.get_path() != self.root:
+            raise ValueError(f"Previous tree root {previous_tree.get_path()} does not match {self.root}")
+        self.history = set()
+        loop = asyncio.get_running_loop()
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        self._pool = pool
+        try:
+            await loop.run_in_executor(pool, self._begin_scrape)
+            root_stat = await loop.run_in_executor(pool, self.root.stat)
+            steps = self._assemble(self.root, 0, root_stat, previous_tree, emit=True)
+            step = next(steps)
+            while True:
+                if isinstance(step, tuple):
+                    sent = await self._open_frame_async(*step)
                 else:
-                    pass
-                self.history.add(node.get_id())
-        return FileNode(path, children=children, depth=depth, root=self.root), found_any
+                    yield step
+                    sent = None
+                try:
+                    step = steps.send(sent)
+                except StopIteration:
+                    break
+        finally:
+            with self._lock:
+                self._pool = None
+                for future in self._pending.values():
+                    future.cancel()
+                self._pending = {}
+                self._submitted = set()
+            pool.shutdown(wait=False)
+
+    async def arun(self, inplace: bool = True, previous_tree: FileNode = None) -> FileNode:
+        """scrape the given path and form a tree structure without blocking the event loop, see Scraper.run
+
+        :param inplace: set tree inplace, defaults to True
+        :type inplace: bool, optional
+        :param previous_tree: tree of a previous run to rescan incrementally, defaults to None
+        :type previous_tree: FileNode, optional
+        :raises ValueError: previous_tree has a different root
+        :return: the scraped tree of file nodes
+        :rtype: FileNode
+        """
+        tree = None
+        async for node in self.iter_nodes(previous_tree):
+            tree = node
+        if inplace:
+            self.tree = tree
+        return tree
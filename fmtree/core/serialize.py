@@ -0,0 +1,315 @@
+"""
+Versioned binary format of file trees
+
+Unlike FileNode.to_bytes (pickle of the object graph), the format does not depend on class internals, is written and
+read without recursion and lets a subtree be restored without decoding the rest of the file.
+
+All integers are little-endian. A file is::
+
+    magic   b"FMTREE\\x00"
+    version u16                     (FORMAT_VERSION)
+    blocks  u8 kind, u32 length, payload
+        H   header, once and first: u8 flags (1: top depth known, 2: root known), i64 top depth,
+            string top path, string root (a string is u32 length and utf-8 bytes, surrogateescape)
+        S   string table chunk: strings, ids continue from the previous chunk
+        N   node table chunk: records of NODE_RECORD, in pre-order over the whole file
+        E   end, u64 number of nodes
+
+A node record holds the string id of its name, the number of its descendants (its subtree is the next that many
+records, so it can be skipped without decoding), flags (1: directory whose pruned directories were recorded,
+2: this is a pruned directory, see FileNode.get_pruned), the position of a pruned directory and the stat fields in
+STAT_FIELDS. String chunks come before the first node chunk using them, so a file can be written and read as a stream.
+"""
+from __future__ import annotations
+import io
+import struct
+from typing import BinaryIO, Dict, List, Tuple, Type, Union
+
+import pathlib2
+
+from fmtree.core.node import BaseNode, FileNode, stat_to_fields, stat_from_fields
+
+MAGIC = b"FMTREE\x00"
+FORMAT_VERSION = 1
+NODE_RECORD = struct.Struct("<IIBIIQQQIIqqqq")
+CHUNK_SIZE = 4096
+
+_BLOCK = struct.Struct("<BI")
+_VERSION = struct.Struct("<H")
+_HEADER = struct.Struct("<Bq")
+_LENGTH = struct.Struct("<I")
+_END = struct.Struct("<Q")
+_HEADER_BLOCK, _STRING_BLOCK, _NODE_BLOCK, _END_BLOCK = b"H", b"S", b"N", b"E"
+_PRUNED_RECORDED, _PRUNED = 1, 2
+_DEPTH_KNOWN, _ROOT_KNOWN = 1, 2
+
+
+def _pack_string(value: str) -> bytes:
+    data = value.encode("utf-8", "surrogateescape")
+    return _LENGTH.pack(len(data)) + data
+
+
+def _write_block(stream: BinaryIO, kind: bytes, payload: bytes) -> None:
+    stream.write(_BLOCK.pack(kind[0], len(payload)))
+    stream.write(payload)
+
+
+def _subtree_sizes(tree: BaseNode) -> Dict[int, int]:
+    """Number of descendants (pruned directories included) of every directory, by id() of the node"""
+    sizes = {}
+    stack = [(tree, False)]
+    while stack:
+        node, visited = stack.pop()
+        children = [child for _, child in node.get_pruned() or []] + node.get_children()
+        if visited:
+            sizes[id(node)] = sum(1 + sizes.get(id(child), 0) for child in children)
+        elif children:
+            stack.append((node, True))
+            stack.extend((child, False) for child in children)
+    return sizes
+
+
+def dump(tree: BaseNode, stream: BinaryIO) -> None:
+    """Write a tree to a binary stream, nodes are written in chunks of CHUNK_SIZE as they are visited
+
+    :param tree: top node of the tree
+    :type tree: BaseNode
+    :param stream: stream to write to
+    :type stream: BinaryIO
+    """
+    depth, root = tree.get_depth(), tree.get_root()
+    flags = (_DEPTH_KNOWN if depth is not None else 0) | (_ROOT_KNOWN if root is not None else 0)
+    stream.write(MAGIC + _VERSION.pack(FORMAT_VERSION))
+    _write_block(stream, _HEADER_BLOCK, _HEADER.pack(flags, depth or 0) + _pack_string(str(tree.get_path())) +
+                 _pack_string(str(root) if root is not None else ""))
+    sizes = _subtree_sizes(tree)
+    string_ids: Dict[str, int] = {}
+    strings, records = [], []
+    count = 0
+
+    def flush() -> None:
+        if strings:
+            _write_block(stream, _STRING_BLOCK, b"".join(strings))
+            strings.clear()
+        if records:
+            _write_block(stream, _NODE_BLOCK, b"".join(records))
+            records.clear()
+
+    stack = [(tree, 0, 0)]
+    while stack:
+        node, flags, position = stack.pop()
+        name = node.get_filename()
+        name_id = string_ids.get(name)
+        if name_id is None:
+            name_id = string_ids[name] = len(string_ids)
+            strings.append(_pack_string(name))
+        pruned = node.get_pruned()
+        if pruned is not None:
+            flags |= _PRUNED_RECORDED
+        records.append(NODE_RECORD.pack(name_id, sizes.get(id(node), 0), flags, position,
+                                        *stat_to_fields(node.get_stat())))
+        count += 1
+        if len(records) == CHUNK_SIZE:
+            flush()
+        children = [(child, _PRUNED, index) for index, child in pruned or []]
+        children.extend((child, 0, 0) for child in node.get_children())
+        stack.extend(reversed(children))
+    flush()
+    _write_block(stream, _END_BLOCK, _END.pack(count))
+
+
+def dumps(tree: BaseNode) -> bytes:
+    """Serialize a tree, see dump
+
+    :param tree: top node of the tree
+    :type tree: BaseNode
+    :return: serialized tree
+    :rtype: bytes
+    """
+    stream = io.BytesIO()
+    dump(tree, stream)
+    return stream.getvalue()
+
+
+class _Reader:
+    """Reads node records of a stream one by one, parsing string chunks on the way"""
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self.stream = stream
+        if self._read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not an fmtree binary tree")
+        version = _VERSION.unpack(self._read(_VERSION.size))[0]
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported fmtree binary tree version {version}, expected {FORMAT_VERSION}")
+        kind, payload = self._read_block()
+        if kind != _HEADER_BLOCK:
+            raise ValueError("Missing header block")
+        flags, depth = _HEADER.unpack_from(payload)
+        top, offset = self._unpack_string(payload, _HEADER.size)
+        root, _ = self._unpack_string(payload, offset)
+        self.top = pathlib2.Path(top)
+        self.depth = depth if flags & _DEPTH_KNOWN else None
+        self.root = pathlib2.Path(root) if flags & _ROOT_KNOWN else None
+        self.strings: List[str] = []
+        self.records = memoryview(b"")
+        self.offset = 0
+
+    def _read(self, size: int) -> bytes:
+        data = self.stream.read(size)
+        if len(data) != size:
+            raise ValueError("Truncated fmtree binary tree")
+        return data
+
+    def _read_block(self) -> Tuple[bytes, bytes]:
+        kind, length = _BLOCK.unpack(self._read(_BLOCK.size))
+        return bytes((kind,)), self._read(length)
+
+    @staticmethod
+    def _unpack_string(payload: bytes, offset: int) -> Tuple[str, int]:
+        length = _LENGTH.unpack_from(payload, offset)[0]
+        start = offset + _LENGTH.size
+        return bytes(payload[start:start + length]).decode("utf-8", "surrogateescape"), start + length
+
+    def _next_node_block(self, skip: int = 0) -> int:
+        """Read blocks up to the next node chunk, node chunks that fall entirely within skip records are not read
+
+        :param skip: number of records the caller is going to skip, defaults to 0
+        :type skip: int, optional
+        :return: number of records skipped without reading
+        :rtype: int
+        """
+        skipped = 0
+        while True:
+            kind, length = _BLOCK.unpack(self._read(_BLOCK.size))
+            kind = bytes((kind,))
+            if kind == _NODE_BLOCK and 0 < length // NODE_RECORD.size <= skip and self.stream.seekable():
+                self.stream.seek(length, io.SEEK_CUR)
+                skip -= length // NODE_RECORD.size
+                skipped += length // NODE_RECORD.size
+                continue
+            payload = self._read(length)
+            if kind == _STRING_BLOCK:
+                offset = 0
+                while offset < len(payload):
+                    string, offset = self._unpack_string(payload, offset)
+                    self.strings.append(string)
+            elif kind == _NODE_BLOCK:
+                self.records, self.offset = memoryview(payload), 0
+                return skipped
+            else:
+                raise ValueError("Unexpected end of fmtree binary tree")
+
+    def read(self) -> tuple:
+        """
+        :return: next node record, see NODE_RECORD
+        :rtype: tuple
+        """
+        if self.offset == len(self.records):
+            self._next_node_block()
+        record = NODE_RECORD.unpack_from(self.records, self.offset)
+        self.offset += NODE_RECORD.size
+        return record
+
+    def skip(self, count: int) -> None:
+        """Skip records without decoding them
+
+        :param count: number of records to skip
+        :type count: int
+        """
+        while count:
+            available = (len(self.records) - self.offset) // NODE_RECORD.size
+            if available == 0:
+                count -= self._next_node_block(count)
+                continue
+            step = min(available, count)
+            self.offset += step * NODE_RECORD.size
+            count -= step
+
+    def find(self, parts: Tuple[str, ...]) -> Tuple[tuple, int]:
+        """Read up to the node at the given names below the top node, skipping all other subtrees
+
+        :param parts: names below the top node
+        :type parts: Tuple[str, ...]
+        :raises ValueError: there is no such node
+        :return: record of the node and its level below the top node
+        :rtype: Tuple[tuple, int]
+        """
+        record = self.read()
+        for level, part in enumerate(parts):
+            remaining = record[1]
+            while remaining:
+                child = self.read()
+                remaining -= 1 + child[1]
+                if not child[2] & _PRUNED and self.strings[child[0]] == part:
+                    break
+                self.skip(child[1])
+            else:
+                raise ValueError(f"No node at {pathlib2.PurePath(*parts)}")
+            record = child
+        return record, len(parts)
+
+    def build(self, record: tuple, path: pathlib2.Path, level: int, node_class: Type[BaseNode]) -> BaseNode:
+        """Decode the subtree of a record that was just read
+
+        :return: top node of the subtree
+        :rtype: BaseNode
+        """
+        def depth_of(level_: int) -> Union[int, None]:
+            return self.depth + level_ if self.depth is not None else None
+
+        # path, level, record, children, pruned, number of descendants left to read
+        stack = [[path, level, record, [], [] if record[2] & _PRUNED_RECORDED else None, record[1]]]
+        while True:
+            top = stack[-1]
+            if top[5]:
+                child = self.read()
+                top[5] -= 1 + child[1]
+                stack.append([top[0] / self.strings[child[0]], top[1] + 1, child, [],
+                              [] if child[2] & _PRUNED_RECORDED else None, child[1]])
+                continue
+            stack.pop()
+            path_, level_, record_, children, pruned = top[:5]
+            node = node_class(path_, depth=depth_of(level_), root=self.root, children=children,
+                              stat_=stat_from_fields(*record_[4:]))
+            if pruned is not None:
+                node.set_pruned(pruned)
+            if not stack:
+                return node
+            if record_[2] & _PRUNED:
+                stack[-1][4] = stack[-1][4] if stack[-1][4] is not None else []
+                stack[-1][4].append((record_[3], node))
+            else:
+                stack[-1][3].append(node)
+
+
+def load(stream: BinaryIO, relative_path: Union[str, pathlib2.PurePath] = None,
+         node_class: Type[BaseNode] = FileNode) -> BaseNode:
+    """Read a tree written by dump, or only the subtree at relative_path
+
+    :param stream: stream to read from
+    :type stream: BinaryIO
+    :param relative_path: path of the subtree root relative to the top node, defaults to None (whole tree)
+    :type relative_path: Union[str, pathlib2.PurePath], optional
+    :param node_class: FileNode or CompactFileNode, defaults to FileNode
+    :type node_class: Type[BaseNode], optional
+    :raises ValueError: the stream is not a tree of a supported version, or there is no node at relative_path
+    :return: restored top node
+    :rtype: BaseNode
+    """
+    reader = _Reader(stream)
+    parts = pathlib2.PurePath(relative_path).parts if relative_path is not None else ()
+    parts = tuple(part for part in parts if part != ".")
+    record, level = reader.find(parts)
+    return reader.build(record, reader.top.joinpath(*parts), level, node_class)
+
+
+def loads(data: bytes, relative_path: Union[str, pathlib2.PurePath] = None,
+          node_class: Type[BaseNode] = FileNode) -> BaseNode:
+    """Deserialize a tree, see load
+
+    :param data: serialized tree
+    :type data: bytes
+    :return: restored top node
+    :rtype: BaseNode
+    """
+    return load(io.BytesIO(data), relative_path, node_class)
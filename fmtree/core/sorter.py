@@ -1,32 +1,90 @@
+import re
 import copy
-from typing import Iterable, List
+import functools
+from typing import Any, Callable, Iterable, List, Tuple, Union
 from abc import ABC, abstractmethod
 
-from fmtree.core.node import FileNode
+from fmtree.core.node import FileNode, CompactFileNode
+
+DEEPCOPY_MODE = 0
+SHARE_MODE = 1
+INPLACE_MODE = 2
 
 
 class BaseSorter(ABC):
     """
     Base Sorter Class for sorting child nodes
+
+    How run() treats the tree it is given depends on the mode:
+
+    - DEEPCOPY_MODE (default): the tree is deep-copied (paths and stat results included) and the copy is sorted
+    - SHARE_MODE: the given tree is left as it is, only nodes whose children change (order or selection) and their
+      ancestors are copied (shallow, see copy.copy), every unchanged subtree is shared with the given tree. Sorting a
+      sorted tree copies nothing and returns the given root. CompactFileNode children know a single parent: copied
+      children get the copy of their parent, shared children keep their parent in the given tree (same path).
+    - INPLACE_MODE: the children of the given nodes are replaced, the given root is returned
+
+    All modes walk the tree with an explicit stack, there is no recursion limit (DEEPCOPY_MODE still relies on
+    copy.deepcopy for the copy, which only CompactFileNode does with an explicit stack).
     """
+    mode = DEEPCOPY_MODE
+
+    def __init__(self, mode: int = DEEPCOPY_MODE) -> None:
+        """
+        :param mode: DEEPCOPY_MODE, SHARE_MODE or INPLACE_MODE, defaults to DEEPCOPY_MODE
+        """
+        assert mode in (DEEPCOPY_MODE, SHARE_MODE, INPLACE_MODE)
+        self.mode = mode
 
     def run(self, root_node: FileNode) -> FileNode:
         """
         Traverse through the tree and run sorting algorithm implemented by child class
         :param root_node: root node
-        :return: another tree root node
+        :return: another tree root node (the given one in INPLACE_MODE, or in SHARE_MODE when nothing changes)
         """
-        tree = copy.deepcopy(root_node)
-
-        def traverse(node: FileNode):
+        if self.mode == SHARE_MODE:
+            return self._run_shared(root_node)
+        tree = copy.deepcopy(root_node) if self.mode == DEEPCOPY_MODE else root_node
+        stack = [tree]
+        while stack:
+            node = stack.pop()
             if node.get_children():
-                node.set_children(self.sorted(node.get_children()))
-            for child in node.get_children():
-                traverse(child)
-
-        traverse(tree)
+                node.set_children(list(self.sorted(node.get_children())))
+            stack.extend(reversed(node.get_children()))
         return tree
 
+    def _run_shared(self, root_node: FileNode) -> FileNode:
+        """SHARE_MODE: children are sorted top-down, changed nodes are copied bottom-up"""
+        replacements = {}
+        # node, sorted children, whether they were sorted
+        stack = [(root_node, None, False)]
+        while stack:
+            node, ordered, visited = stack.pop()
+            children = node.get_children()
+            if not visited:
+                if children:
+                    ordered = list(self.sorted(children))
+                    stack.append((node, ordered, True))
+                    stack.extend((child, None, False) for child in reversed(ordered))
+                continue
+            copies = []
+            for position, child in enumerate(ordered):
+                replacement = replacements.pop(id(child), None)
+                if replacement is not None:
+                    ordered[position] = replacement
+                    copies.append(replacement)
+            if len(ordered) != len(children) or any(new is not old for new, old in zip(ordered, children)):
+                replacement = copy.copy(node)
+                if isinstance(replacement, CompactFileNode):
+                    # re-parenting would change the given tree
+                    replacement.set_children(ordered, adopt=False)
+                    for child in copies:
+                        child.set_parent(replacement)
+                else:
+                    replacement.set_children(ordered)
+                replacements[id(node)] = replacement
+        return replacements.get(id(root_node), root_node)
+
     @abstractmethod
     def sorted(self, nodes: List[FileNode]) -> List[FileNode]:
         """
@@ -52,3 +110,115 @@ class Sorter(BaseSorter):
         :rtype: Iterable
         """
         return sorted(nodes, key=lambda node: node.get_filename())
+
+
+_DIGITS = re.compile(r"(\d+)")
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def natural_key(name: str) -> Tuple[tuple, str]:
+    """Sort key of a name in natural (version-aware) order: runs of digits compare as numbers, text case-insensitively,
+    so "file2" < "file10" and "1.9" < "1.10". Equal keys (e.g. "a01" and "a1") fall back to the name itself.
+    Keys are cached by name.
+
+    :param name: file name
+    :type name: str
+    :return: sort key
+    :rtype: Tuple[tuple, str]
+    """
+    parts = _DIGITS.split(name)
+    # text at even positions, numbers at odd positions, so parts at the same position always compare
+    parts[1::2] = map(int, parts[1::2])
+    parts[::2] = map(str.casefold, parts[::2])
+    return tuple(parts), name
+
+
+def by_name(node: FileNode) -> str:
+    """Sort key: file name, as Sorter"""
+    return node.get_filename()
+
+
+def by_natural_name(node: FileNode) -> Tuple[tuple, str]:
+    """Sort key: file name in natural order, see natural_key"""
+    return natural_key(node.get_filename())
+
+
+def dirs_first(node: FileNode) -> bool:
+    """Sort key: directories before other nodes"""
+    return not node.is_dir()
+
+
+def by_size(node: FileNode) -> int:
+    """Sort key: st_size of the stat the node holds"""
+    return node.get_stat().st_size
+
+
+def by_mtime(node: FileNode) -> int:
+    """Sort key: st_mtime_ns of the stat the node holds"""
+    return node.get_stat().st_mtime_ns
+
+
+def descending(key: Callable[[FileNode], Union[int, float, bool]]) -> Callable[[FileNode], Union[int, float]]:
+    """Reverse the order of a numeric sort key, e.g. descending(by_size) puts the largest first
+
+    :param key: numeric sort key
+    :type key: Callable[[FileNode], Union[int, float, bool]]
+    :return: negated sort key
+    :rtype: Callable[[FileNode], Union[int, float]]
+    """
+    def reversed_key(node: FileNode) -> Union[int, float]:
+        return -key(node)
+
+    reversed_key.__qualname__ = f"descending({getattr(key, '__qualname__', repr(key))})"
+    return reversed_key
+
+
+class KeySorter(BaseSorter):
+    """
+    Sorter by sort keys: nodes are compared by the first key, ties by the next one and so on, the last tie keeps the
+    scraped order. Keys are computed once per node and sort (decorate-sort-undecorate), nodes are never compared.
+
+    >>> KeySorter([dirs_first, by_natural_name])
+    >>> KeySorter([descending(by_size), by_name], mode=SHARE_MODE)
+    """
+
+    def __init__(self, keys: Iterable[Callable[[FileNode], Any]] = (by_name,), reverse: bool = False,
+                 mode: int = DEEPCOPY_MODE) -> None:
+        """
+        :param keys: sort keys (see by_name, by_natural_name, dirs_first, by_size, by_mtime, descending), most
+            significant first, defaults to (by_name,)
+        :param reverse: reverse the whole order, defaults to False
+        :param mode: DEEPCOPY_MODE, SHARE_MODE or INPLACE_MODE, see BaseSorter, defaults to DEEPCOPY_MODE
+        """
+        super(KeySorter, self).__init__(mode=mode)
+        self.keys = tuple(keys)
+        self.reverse = reverse
+        if len(self.keys) == 1:
+            self.key = self.keys[0]
+        elif len(self.keys) == 2:
+            first, second = self.keys
+            self.key = lambda node: (first(node), second(node))
+        else:
+            self.key = lambda node: tuple(key(node) for key in self.keys)
+
+    def sorted(self, nodes: List[FileNode]) -> List[FileNode]:
+        """Implementation of the abstract method
+
+        :param nodes: file nodes to be sorted
+        :type nodes: List[FileNode]
+        :return: sorted file nodes
+        :rtype: List[FileNode]
+        """
+        return sorted(nodes, key=self.key, reverse=self.reverse)
+
+
+class NaturalSorter(KeySorter):
+    """Sorter by file names in natural order (see natural_key), optionally with directories first"""
+
+    def __init__(self, directories_first: bool = False, mode: int = DEEPCOPY_MODE) -> None:
+        """
+        :param directories_first: list directories before files, defaults to False
+        :param mode: DEEPCOPY_MODE, SHARE_MODE or INPLACE_MODE, see BaseSorter, defaults to DEEPCOPY_MODE
+        """
+        keys = (dirs_first, by_natural_name) if directories_first else (by_natural_name,)
+        super(NaturalSorter, self).__init__(keys, mode=mode)
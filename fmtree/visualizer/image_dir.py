@@ -1,6 +1,7 @@
 from fmtree.core.scraper import Scraper
 from fmtree.core.filter import ImageFilter
 from fmtree.core.format import TreeCommandFormatter
+from fmtree.core.export import iter_json, write_pieces
 import argparse
 import sys
 from typing import Dict
@@ -8,6 +9,7 @@ import pathlib2
 from jinja2 import Environment, FileSystemLoader
 
 current_directory = pathlib2.Path(__file__).parent.absolute()
+data_placeholder = "__FMTREE_DATA_PLACEHOLDER__"
 
 bootstrap_css_cdn = """
 <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.0.0-beta3/dist/css/bootstrap.min.css" rel="stylesheet" integrity="sha384-eOJMYsd53ii+scO/bJGFsiCZc+5NDVN2yr8+0RDqr0Ql0h+rP48ckxlpbzKgwra6" crossorigin="anonymous">
@@ -38,7 +40,6 @@ def main(args: Dict) -> None:
     if not args['quiet']:
         formatter.generate()
         formatter.to_stream(sys.stdout)
-    json_content = tree.to_json(indent=None)
     file_loader = FileSystemLoader(str(current_directory / 'template'))
     env = Environment(loader=file_loader)
     template = env.get_template('index.html')
@@ -51,12 +52,16 @@ def main(args: Dict) -> None:
             bootstrap_js = "<script>" + f.read() + "</script>"
         with open(str(current_directory / 'template' / 'assets' / 'jquery-3.6.0.min.js'), 'r') as f:
             jquery_js = "<script>" + f.read() + "</script>"
-    output = template.render(data=json_content, bootstrap_css=bootstrap_css, bootstrap_js=bootstrap_js,
+    # the page is rendered around a placeholder, the tree JSON is streamed into the file in its place
+    output = template.render(data=data_placeholder, bootstrap_css=bootstrap_css, bootstrap_js=bootstrap_js,
                              jquery_js=jquery_js, show_all=args['show_all'])
+    head, tail = output.split(data_placeholder, 1)
     output_path = args['output'] if args['output'] else str(
         pathlib2.Path(args['input']) / 'fmtree-image-visualizer.html')
     with open(output_path, 'w') as f:
-        f.write(output)
+        f.write(head)
+        write_pieces(iter_json(tree), f)
+        f.write(tail)
     if not args['quiet']:
         print("finished")
 
@@ -8,7 +8,7 @@ import argparse
 import pathlib2
 from typing import Dict, List
 from fmtree.core.scraper import Scraper
-from fmtree.core.format import TreeCommandFormatter, HTMLFormatter, MarkdownContentFormatter
+from fmtree.core.format import BaseFormatter, TreeCommandFormatter, HTMLFormatter, MarkdownContentFormatter
 from fmtree.core.filter import ExtensionFilter
 from fmtree.core.sorter import Sorter
 
@@ -48,28 +48,41 @@ def main(args_dict: Dict):
     """
     validate_args(args_dict)
     path = pathlib2.Path(args_dict['input']).absolute()
-    scraper = Scraper(path, scrape_now=False, keep_empty_dir=False, depth=args_dict['depth'])
+    # listings are sorted as they are scraped, there is no sorting pass over the tree
+    stats = args_dict.get('stats', False)
+    scraper = Scraper(path, scrape_now=False, keep_empty_dir=False, depth=args_dict['depth'], sorter=Sorter(),
+                      aggregate=stats)
     if len(args_dict['ext']) != 0:
         scraper.add_filter(ExtensionFilter(extensions=args_dict['ext']))
-    scraper.run()
-    sorter = Sorter()
-    tree = sorter(scraper.get_tree())
     if args_dict['html']:
-        formatter = HTMLFormatter(tree)
+        formatter_class = HTMLFormatter
     elif args_dict['tree']:
-        formatter = TreeCommandFormatter(tree)
+        formatter_class = TreeCommandFormatter
     elif args_dict['markdown']:
-        formatter = MarkdownContentFormatter(tree)
+        formatter_class = MarkdownContentFormatter
     else:
         raise ValueError('No Valida output format is set')
-    stringio = formatter.generate()
+    if stats and formatter_class is MarkdownContentFormatter:
+        raise ValueError('Sizes can only be shown in tree and html style output')
+    formatter_kwargs = {'stats': True} if stats else {}
+    outputs = [key for key in ('stdout', 'stderr', 'output') if args_dict[key]]
+    if len(outputs) == 1 and formatter_class.iter_lines_from_stream is not BaseFormatter.iter_lines_from_stream \
+            and not stats:
+        # a single output of a streaming formatter is rendered while scraping, the tree is never built
+        formatter = formatter_class(None)
+        events = scraper.stream()
+    else:
+        # directory totals are only known once their subtree is scraped
+        formatter = formatter_class(scraper.run(), **formatter_kwargs)
+        events = None
+    # render straight into each output, nothing is collected in memory first
     if args_dict['stdout']:
-        formatter.to_stream(sys.stdout)
+        formatter.write(sys.stdout, events)
     if args_dict['stderr']:
-        formatter.to_stream(sys.stderr)
+        formatter.write(sys.stderr, events)
     if args_dict['output']:
         with open(args_dict['output'], 'w') as f:
-            f.write(stringio.getvalue())
+            formatter.write(f, events)
 
 
 if __name__ == '__main__':
@@ -85,6 +98,7 @@ if __name__ == '__main__':
     parser.add_argument('--tree', action='store_true', help='nu tree style output')
     parser.add_argument('--markdown', action='store_true', help='markdown style output')
     parser.add_argument('--html', action='store_true', help='html list style output')
+    parser.add_argument('-s', '--stats', action='store_true', help='show file sizes and directory totals')
 
     # filter
     parser.add_argument("--ext", nargs="+", default=[])
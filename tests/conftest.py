@@ -0,0 +1,10 @@
+import pathlib2
+import pytest
+
+from tests.helpers import make_tree
+
+
+@pytest.fixture
+def tree_root(tmp_path) -> pathlib2.Path:
+    """make_tree in a directory of its own, tests may write other files to tmp_path"""
+    return make_tree(pathlib2.Path(str(tmp_path)) / "root")
@@ -0,0 +1,13 @@
+import pathlib2
+
+
+def make_tree(root: pathlib2.Path) -> pathlib2.Path:
+    for relative in ["a.md", "b.py", "sub/c.md", "sub/deep/d.md", "sub/deep/e.txt", "other/f.py", "empty/.keep"]:
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("content")
+    return root
+
+
+def as_set(node) -> set:
+    return {str(n.get_relative_path()) for n in node.walk(recursive=True)}
@@ -0,0 +1,82 @@
+import os
+import shutil
+import asyncio
+
+import pytest
+
+from fmtree.core.aggregate import SubtreeStats, compute_stats, largest_directories, format_size, stats_label
+from fmtree.core.filter import MarkdownFilter
+from fmtree.core.format import TreeCommandFormatter, HTMLFormatter
+from fmtree.core.scraper import Scraper, ParallelScraper, AsyncScraper
+from fmtree.core.serialize import dumps, loads
+from fmtree.core.sorter import Sorter
+
+
+@pytest.fixture
+def sized_root(tmp_path):
+    for relative, size, mtime in [("a.md", 10, 100), ("b.py", 200, 300), ("sub/c.md", 30, 200),
+                                  ("sub/deep/d.md", 1000, 150), ("other/e.py", 5, 50)]:
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * size)
+        os.utime(str(path), ns=(mtime * 10 ** 9, mtime * 10 ** 9))
+    (tmp_path / "empty").mkdir()
+    return tmp_path
+
+
+def child(node, name):
+    return next(child_ for child_ in node.get_children() if child_.get_filename() == name)
+
+
+class TestAggregate:
+    @pytest.mark.parametrize("kwargs", [{}, {"compact": True}, {"keep_empty_dir": True}])
+    def test_scraped(self, sized_root, kwargs):
+        tree = Scraper(sized_root, aggregate=True, **kwargs).run()
+        directories = 4 if kwargs.get("keep_empty_dir") else 3
+        assert tree.get_stats() == SubtreeStats(1245, 5, directories, 300 * 10 ** 9)
+        assert child(tree, "sub").get_stats() == SubtreeStats(1030, 2, 1, 200 * 10 ** 9)
+        assert child(tree, "a.md").get_stats() is None
+
+    def test_filtered(self, sized_root):
+        tree = Scraper(sized_root, filters=[MarkdownFilter()], aggregate=True).run()
+        assert tree.get_stats() == SubtreeStats(1040, 3, 2, 200 * 10 ** 9)
+
+    @pytest.mark.parametrize("scraper_class", [ParallelScraper, AsyncScraper])
+    def test_other_scrapers(self, sized_root, scraper_class):
+        expected = Scraper(sized_root, aggregate=True).run().get_stats()
+        scraper = scraper_class(sized_root, aggregate=True)
+        tree = asyncio.run(scraper.arun()) if scraper_class is AsyncScraper else scraper.run()
+        assert tree.get_stats() == expected
+
+    def test_incremental(self, sized_root):
+        scraper = Scraper(sized_root, incremental=True, aggregate=True)
+        scraper.run()
+        (sized_root / "sub" / "deep" / "f.md").write_bytes(b"x" * 7)
+        tree = scraper.run(previous_tree=scraper.get_tree())
+        assert child(tree, "sub").get_stats().size == 1037 and tree.get_stats().files == 6
+
+    def test_compute_without_file_system(self, sized_root):
+        expected = Scraper(sized_root, aggregate=True).run().get_stats()
+        restored = loads(dumps(Scraper(sized_root).run()))
+        shutil.rmtree(str(sized_root))
+        assert restored.get_stats() is None
+        assert compute_stats(restored) == expected
+        assert [node.get_filename() for node in largest_directories(restored, 2)] == ["sub", "deep"]
+        assert [node.get_filename() for node in largest_directories(restored, by="newest_mtime_ns")][0] == "sub"
+        assert largest_directories(restored, 1, include_root=True)[0] is restored
+        with pytest.raises(ValueError):
+            largest_directories(restored, by="bytes")
+
+    def test_labels(self, sized_root):
+        tree = Scraper(sized_root, aggregate=True, sorter=Sorter()).run()
+        lines = TreeCommandFormatter(tree, stats=True).generate().getvalue().splitlines()
+        assert lines[0] == f"{sized_root.name} [1.2 KiB, 5 files]"
+        assert "├── a.md [10 B]" in lines and "    └── deep [1000 B, 1 file]" in lines
+        assert "<li>sub [1.0 KiB, 2 files]</li>" in HTMLFormatter(tree, stats=True).generate().getvalue()
+        assert TreeCommandFormatter(tree).generate().getvalue() == \
+            TreeCommandFormatter(Scraper(sized_root, sorter=Sorter()).run()).generate().getvalue()
+        assert stats_label(child(Scraper(sized_root).run(), "sub")) == "sub"
+
+    def test_format_size(self):
+        assert [format_size(size) for size in (0, 1023, 1536, 10 * 1024 ** 2, 5 * 1024 ** 6)] == \
+            ["0 B", "1023 B", "1.5 KiB", "10 MiB", "5120 PiB"]
@@ -0,0 +1,94 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+from fmtree.core.cache import ScanCache
+from fmtree.core.node import CompactFileNode
+from fmtree.core.scraper import Scraper
+from fmtree.core.filter import MarkdownFilter
+from fmtree.core.format import TreeCommandFormatter
+from tests.helpers import as_set
+
+# saves or loads the scan index of a tree with filters holding sets, dicts and caches
+CACHE_SCRIPT = """
+import sys
+import pathlib2
+from fmtree.core.content import FrontMatterFilter
+from fmtree.core.filter import ImageFilter
+from fmtree.core.gitignore import GitignoreFilter
+from fmtree.core.scraper import Scraper
+
+filters = [ImageFilter(), FrontMatterFilter({"draft": False, "tags": "a"}), GitignoreFilter()]
+scraper = Scraper(pathlib2.Path(sys.argv[2]), filters=filters, keep_empty_dir=True)
+if sys.argv[1] == "save":
+    scraper.run()
+    scraper.save_cache()
+else:
+    print(len(list(scraper.load_cache().walk(recursive=True))))
+"""
+
+
+class TestScanCache:
+    def test_round_trip(self, tree_root, tmp_path):
+        tree = Scraper(tree_root, keep_empty_dir=True).run()
+        with ScanCache(str(tmp_path / "index.sqlite")) as cache:
+            cache.save(tree)
+            loaded = cache.load()
+        assert loaded.to_dict() == tree.to_dict()
+        assert [node.get_stat().st_mtime_ns for node in loaded.walk(recursive=True)] == \
+            [node.get_stat().st_mtime_ns for node in tree.walk(recursive=True)]
+
+    def test_subtree(self, tree_root, tmp_path):
+        tree = Scraper(tree_root, keep_empty_dir=True).run()
+        with ScanCache(str(tmp_path / "index.sqlite")) as cache:
+            cache.save(tree)
+            subtree = cache.load("sub/deep")
+            with pytest.raises(ValueError):
+                cache.load("missing")
+        assert as_set(subtree) == {"sub/deep", "sub/deep/d.md", "sub/deep/e.txt"}
+        assert subtree.get_depth() == 2
+
+    def test_compact(self, tree_root, tmp_path):
+        tree = Scraper(tree_root, keep_empty_dir=True).run()
+        with ScanCache(str(tmp_path / "index.sqlite")) as cache:
+            cache.save(tree)
+            loaded = cache.load(node_class=CompactFileNode)
+        assert isinstance(loaded, CompactFileNode)
+        assert loaded.to_dict() == tree.to_dict()
+
+
+class TestScraperCache:
+    def test_load_without_walking(self, tree_root):
+        scraper = Scraper(tree_root, filters=[MarkdownFilter()], incremental=True)
+        expected = TreeCommandFormatter(scraper.run()).generate().getvalue()
+        scraper.save_cache()
+        assert ScanCache.default_path(scraper.root).exists()
+        cold = Scraper(tree_root, filters=[MarkdownFilter()], incremental=True)
+        assert TreeCommandFormatter(cold.load_cache()).generate().getvalue() == expected
+        assert cold.get_tree().get_children()[0].get_pruned() is not None
+
+    def test_settings_mismatch(self, tree_root):
+        scraper = Scraper(tree_root, filters=[MarkdownFilter()])
+        scraper.run()
+        scraper.save_cache()
+        with pytest.raises(ValueError):
+            Scraper(tree_root, keep_empty_dir=True).load_cache()
+
+    def test_other_process(self, tree_root):
+        def run(command: str, hash_seed: str) -> str:
+            env = dict(os.environ, PYTHONHASHSEED=hash_seed,
+                       PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])))
+            return subprocess.run([sys.executable, "-c", CACHE_SCRIPT, command, str(tree_root)], env=env,
+                                  check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+        run("save", "1")
+        assert int(run("load", "2")) > 0
+
+    def test_update(self, tree_root):
+        Scraper(tree_root, filters=[MarkdownFilter()], incremental=True).update_cache()
+        (tree_root / "empty" / "new.md").write_text("new")
+        tree = Scraper(tree_root, filters=[MarkdownFilter()], incremental=True).update_cache()
+        assert "empty/new.md" in as_set(tree)
+        cold = Scraper(tree_root, filters=[MarkdownFilter()], incremental=True).load_cache()
+        assert as_set(cold) == as_set(tree)
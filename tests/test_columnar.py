@@ -0,0 +1,36 @@
+import pytest
+
+from fmtree.core.columnar import ColumnarTree
+from fmtree.core.scraper import Scraper
+from fmtree.core.filter import MarkdownFilter
+from fmtree.core.format import TreeCommandFormatter, ListFileFormatter, MarkdownContentFormatter
+from tests.helpers import as_set
+
+
+class TestColumnarTree:
+    @pytest.mark.parametrize("kwargs", [{"keep_empty_dir": True}, {"filters": [MarkdownFilter()]}])
+    def test_from_tree_and_stream(self, tree_root, kwargs):
+        tree = Scraper(tree_root, **kwargs).run()
+        for columnar in [ColumnarTree.from_tree(tree), Scraper(tree_root, **kwargs).run_columnar()]:
+            assert columnar.to_dict() == tree.to_dict()
+            assert as_set(columnar.get_node()) == as_set(tree)
+            assert [node.get_filename() for node in columnar.walk(recursive=True, no_dir=True)] == \
+                [node.get_filename() for node in tree.walk(recursive=True, no_dir=True)]
+
+    def test_subtree(self, tree_root):
+        tree = Scraper(tree_root, keep_empty_dir=True).run()
+        sub = next(node for node in tree.get_children() if node.get_filename() == "sub")
+        columnar = ColumnarTree.from_tree(tree)
+        columnar_sub = next(node for node in columnar.get_node().get_children() if node.get_filename() == "sub")
+        assert columnar_sub.to_dict() == sub.to_dict()
+        assert columnar_sub.get_stat().st_size == sub.get_stat().st_size
+        assert columnar_sub.get_id() == sub.get_id()
+        assert columnar_sub.get_parent().get_index() == 0
+        assert len(columnar.names) == len(set(columnar.names))
+
+    @pytest.mark.parametrize("formatter_class", [TreeCommandFormatter, ListFileFormatter, MarkdownContentFormatter])
+    def test_formatters(self, tree_root, formatter_class):
+        tree = Scraper(tree_root, filters=[MarkdownFilter()]).run()
+        columnar = ColumnarTree.from_tree(tree)
+        assert formatter_class(columnar.get_node()).generate().getvalue() == \
+            formatter_class(tree).generate().getvalue()
@@ -0,0 +1,106 @@
+import gc
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+import pathlib2
+import pytest
+
+import fmtree.core.content as content
+from fmtree.core.content import TextFilter, FrontMatterFilter, ImageHeaderFilter, image_format, parse_front_matter
+from fmtree.core.filter import MarkdownFilter
+from fmtree.core.scraper import Scraper
+from tests.helpers import as_set
+
+PNG = b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", 2, 3) + b"\x08\x02\x00\x00\x00"
+
+
+@pytest.fixture
+def docs(tmp_path) -> pathlib2.Path:
+    root = pathlib2.Path(str(tmp_path))
+    files = {
+        "post.md": b"---\ntitle: Post\ndraft: false\n---\n# Post\n",
+        "draft.md": b"---\ntitle: 'Draft'\ndraft: true\n---\n",
+        "plain.md": b"# No front matter\n",
+        "notes.txt": "café\n".encode("utf-8"),
+        "data.bin": b"\x00\x01\x02",
+        "image.png": PNG,
+        "fake.png": b"not an image",
+        "picture": PNG,
+        "sub/more.md": b"---\ndraft: \"false\"\n---\n",
+    }
+    for name, data in files.items():
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_bytes(data)
+    return root
+
+
+def names(filter_, root):
+    filter_.set_root_path(root)
+    return {path.name for path in filter_(sorted(root.iterdir()))}
+
+
+class TestParsers:
+    def test_front_matter(self):
+        assert parse_front_matter(memoryview(b"---\na: 1\nb: 'x y'\n  c: nested\n---\n")) == {"a": "1", "b": "x y"}
+        assert parse_front_matter(memoryview(b"---\na: 1\n")) is None
+        assert parse_front_matter(memoryview(b"# title\n---\n---\n")) is None
+
+    def test_image_format(self):
+        assert image_format(memoryview(PNG)) == "png"
+        assert image_format(memoryview(PNG[:16] + struct.pack(">II", 0, 3))) is None
+        assert image_format(memoryview(b"GIF89a\x01\x00\x01\x00")) == "gif"
+        assert image_format(memoryview(b"<?xml version='1.0'?><svg></svg>")) == "svg"
+        assert image_format(memoryview(b"text")) is None
+
+
+class TestContentFilters:
+    def test_text(self, docs):
+        assert names(TextFilter(), docs) == {"post.md", "draft.md", "plain.md", "notes.txt", "fake.png", "sub"}
+        assert names(TextFilter(text=False), docs) == {"data.bin", "image.png", "picture", "sub"}
+
+    def test_truncated_character(self, docs):
+        # the 2-byte character is cut by max_bytes
+        assert names(TextFilter(max_bytes=4, extensions=[".txt"]), docs) >= {"notes.txt"}
+
+    def test_front_matter(self, docs):
+        kept = names(FrontMatterFilter({"draft": False}), docs)
+        assert kept == {"post.md", "notes.txt", "data.bin", "image.png", "fake.png", "picture", "sub"}
+        tree = Scraper(docs, filters=[MarkdownFilter(), FrontMatterFilter({"draft": "False"})]).run()
+        assert as_set(tree) == {".", "post.md", "sub", "sub/more.md"}
+
+    def test_image_header(self, docs):
+        assert names(ImageHeaderFilter(), docs) == {"image.png", "picture", "sub"}
+        assert names(ImageHeaderFilter(formats=["gif"]), docs) == {"sub"}
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_verdict_cache(self, docs, workers, monkeypatch):
+        reads = []
+        read_head = content.read_head
+        monkeypatch.setattr(content, "read_head", lambda path, size: reads.append(path.name) or read_head(path, size))
+        filter_ = TextFilter(workers=workers)
+        first = names(filter_, docs)
+        assert len(reads) == 8
+        assert names(filter_, docs) == first and len(reads) == 8
+        (docs / "data.bin").write_bytes(b"text now")
+        os.utime(str(docs / "data.bin"), ns=(0, 0))
+        assert names(filter_, docs) == first | {"data.bin"} and reads[8:] == ["data.bin"]
+
+    def test_executor(self, docs):
+        expected = names(TextFilter(workers=1), docs)
+        with TextFilter(workers=4) as filter_:
+            assert names(filter_, docs) == expected
+            pool = filter_.get_executor()
+        assert pool._shutdown and filter_._executor is None
+        with ThreadPoolExecutor(2) as pool:
+            with TextFilter(executor=pool) as filter_:
+                assert names(filter_, docs) == expected
+            assert not pool._shutdown
+
+    def test_executor_collected(self, docs):
+        filter_ = TextFilter(workers=4)
+        names(filter_, docs)
+        pool = filter_.get_executor()
+        del filter_
+        gc.collect()
+        assert pool._shutdown
@@ -0,0 +1,55 @@
+import os
+import pickle
+
+import pathlib2
+
+from fmtree.core.entry import FileEntry
+from fmtree.core.filter import MarkdownFilter, ExtensionFilter, RegexFilter, compile_filters
+
+
+def listing(root):
+    with os.scandir(str(root)) as it:
+        return sorted((FileEntry.from_dir_entry(root, entry) for entry in it), key=str)
+
+
+class TestFileEntry:
+    def make(self, tmp_path):
+        root = pathlib2.Path(str(tmp_path))
+        (root / "a.md").write_text("# a")
+        (root / "b.py").write_text("")
+        (root / "sub").mkdir()
+        (root / "link").symlink_to(root / "sub")
+        (root / "broken").symlink_to(root / "missing")
+        return root
+
+    def test_same_as_path(self, tmp_path):
+        root = self.make(tmp_path)
+        for entry in listing(root):
+            path = root / entry.name
+            assert entry == path and hash(entry) == hash(path) and str(entry) == str(path)
+            assert entry.is_dir() == path.is_dir()
+            assert entry.is_file() == path.is_file()
+            assert entry.is_symlink() == path.is_symlink()
+            assert entry.lstat() == path.lstat()
+            if path.exists():
+                assert entry.stat() == path.stat()
+            assert (entry / "x") == (path / "x") and entry.parent == root
+
+    def test_no_stat(self, tmp_path, monkeypatch):
+        root = self.make(tmp_path)
+        entries = [entry for entry in listing(root) if not entry.is_symlink()]
+        calls = []
+        monkeypatch.setattr(pathlib2._NormalAccessor, "stat", staticmethod(lambda *args: calls.append(args)))
+        for filter_ in [MarkdownFilter(), ExtensionFilter([".py"]), RegexFilter([r".*\.md"])]:
+            filter_.set_root_path(root)
+            compile_filters([filter_])(entries)
+        assert not calls
+
+    def test_detach(self, tmp_path):
+        root = self.make(tmp_path)
+        entry = next(entry for entry in listing(root) if entry.name == "a.md")
+        assert entry.get_entry() is not None
+        assert entry.detach().get_entry() is None
+        (root / "a.md").unlink()
+        assert not entry.exists()
+        assert pickle.loads(pickle.dumps(entry)) == entry
@@ -0,0 +1,44 @@
+import io
+import json
+
+import pytest
+
+from fmtree.core import export
+from fmtree.core.scraper import Scraper
+from fmtree.core.filter import MarkdownFilter
+
+
+class TestJSON:
+    @pytest.mark.parametrize("indent", [None, 0, 2, "\t"])
+    def test_same_as_json_dumps(self, tree_root, indent):
+        tree = Scraper(tree_root, keep_empty_dir=True).run()
+        stream = io.StringIO()
+        export.dump_json(tree, stream, indent=indent)
+        assert stream.getvalue() == json.dumps(tree.to_dict(), indent=indent)
+
+    def test_from_stream(self, tree_root):
+        scraper = Scraper(tree_root, filters=[MarkdownFilter()])
+        assert "".join(export.iter_json_from_stream(scraper.stream())) == scraper.run().to_json(indent=None)
+
+    def test_subtree_and_leaf(self, tree_root):
+        tree = Scraper(tree_root, keep_empty_dir=True).run()
+        for node in tree.walk(recursive=True):
+            assert "".join(export.iter_json(node, indent=1)) == node.to_json(indent=1)
+
+
+class TestNDJSON:
+    def test_lines(self, tree_root):
+        tree = Scraper(tree_root, keep_empty_dir=True).run()
+        stream = io.StringIO()
+        export.dump_ndjson(tree, stream)
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        nodes = [node for _, node, _ in export.tree_events(tree)]
+        assert len(records) == len(nodes)
+        assert records[0]["parent"] is None
+        for record, node in zip(records, nodes):
+            expected = node.to_dict()
+            del expected["children"]
+            assert {key: value for key, value in record.items() if key not in ("index", "parent")} == expected
+            if record["parent"] is not None:
+                parent = nodes[record["parent"]]
+                assert any(child is node for child in parent.get_children())
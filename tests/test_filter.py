@@ -1,3 +1,5 @@
+import re
+
 import fmtree.core.filter as filter_
 
 import pathlib2
@@ -28,3 +30,61 @@ class TestRegexFilter:
         result = set(regex_filter(paths))
         target = {pathlib2.Path("/p/a.md"), pathlib2.Path("/p/c.py")}
         assert result == target
+
+
+class EvenFilter(filter_.BaseFileFilter):
+    """A filter that only works on whole lists"""
+
+    def filter(self, items):
+        return list(items)[::2]
+
+
+class NoneMarkdownFilter(filter_.MarkdownFilter):
+    """A filter() not using keep(), which compile_filters has to call as it is"""
+
+    def filter(self, items):
+        return []
+
+
+def chained(filters, items):
+    for f in filters:
+        items = f(items)
+    return list(items)
+
+
+class TestCompileFilters:
+    def test_same_as_chained(self, tmp_path):
+        root = pathlib2.Path(str(tmp_path))
+        for name in ["a.md", "b.py", "c.txt", "build/x.md", "node_modules/y.md", "docs/z.md", "aa.md"]:
+            (root / name).parent.mkdir(parents=True, exist_ok=True)
+            (root / name).write_text("")
+        items = [root / name for name in ["a.md", "b.py", "c.txt", "build", "node_modules", "docs", "aa.md",
+                                          "build/x.md", "docs/z.md"]]
+        filter_lists = [
+            [filter_.MarkdownFilter(ignore_list=["build", "node_modules"])],
+            [filter_.ExtensionFilter([".md", ".py"], ignore_list=[r"(a)\1"]), filter_.IdentityFilter()],
+            [filter_.RegexFilter([".+\\.py", ".+\\.md"], ignore_list=["docs"], mode=filter_.ACCEPT_MODE)],
+            [filter_.MarkdownFilter(), EvenFilter(ignore_list=["a"]), filter_.ExtensionFilter([])],
+            [filter_.IdentityFilter(ignore_list=[], mode=filter_.ACCEPT_MODE)],
+            [filter_.ImageFilter(ignore_list=["(?P<x>b)", "(?P<x>c)"])],
+            [NoneMarkdownFilter()],
+        ]
+        for filters in filter_lists:
+            for f in filters:
+                f.set_root_path(root)
+            assert filter_.compile_filters(filters)(items) == chained(filters, items)
+
+    def test_per_item(self):
+        assert filter_.MarkdownFilter.per_item and filter_.ImageFilter.per_item
+        assert not NoneMarkdownFilter.per_item and not EvenFilter.per_item
+
+    def test_relative_path_getter(self):
+        relative = filter_.relative_path_getter(pathlib2.Path("/p"))
+        cache = {}
+        assert relative(pathlib2.Path("/p/sub/a.md"), cache) == "sub/a.md" and cache == {"/p": "sub/a.md"}
+        assert relative(pathlib2.Path("/p"), {}) == "."
+
+    def test_merge_patterns(self):
+        patterns = [re.compile(pattern) for pattern in ["ab", r"(c)\1", "(?i)x"]]
+        matches = filter_.merge_patterns(patterns)
+        assert [matches(string) for string in ["abc", "cc", "X", "c"]] == [True, True, True, False]
@@ -0,0 +1,130 @@
+import io
+import random
+import shutil
+
+import pytest
+
+import fmtree.core.format as format_
+from fmtree.core.scraper import Scraper
+from fmtree.core.serialize import dumps, loads
+from fmtree.core.sorter import Sorter
+
+FORMATTERS = [format_.TabFormatter, format_.TreeCommandFormatter, format_.ListFileFormatter, format_.HTMLFormatter,
+              format_.MarkdownContentFormatter, format_.MarkdownLinkContentFormatter,
+              format_.GithubMarkdownContentFormatter]
+STREAM_FORMATTERS = [format_.TreeCommandFormatter, format_.ListFileFormatter, format_.MarkdownContentFormatter]
+
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super(CountingStream, self).__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super(CountingStream, self).write(text)
+
+
+class LegacyFormatter(format_.BaseFormatter):
+    """Formatter implementing generate() only"""
+
+    def generate(self):
+        self.stringio.write(self.root.get_filename() + "\n")
+        return self.stringio
+
+
+class TestWrite:
+    @pytest.mark.parametrize("formatter_class", FORMATTERS)
+    def test_same_as_generate(self, tree_root, formatter_class):
+        tree = Sorter()(Scraper(tree_root).run())
+        stream = io.StringIO()
+        formatter_class(tree).write(stream)
+        assert stream.getvalue() == formatter_class(tree).generate().getvalue()
+
+    @pytest.mark.parametrize("formatter_class", STREAM_FORMATTERS)
+    def test_stream(self, tree_root, formatter_class):
+        stream = io.StringIO()
+        formatter_class().write(stream, events=Scraper(tree_root).stream())
+        expected = formatter_class().generate_from_stream(Scraper(tree_root).stream()).getvalue()
+        assert stream.getvalue() == expected and expected
+
+    def test_bounded_buffer(self, tree_root):
+        tree = Scraper(tree_root).run()
+        stream = CountingStream()
+        format_.ListFileFormatter(tree).write(stream, buffer_size=1)
+        lines = stream.getvalue().splitlines()
+        assert stream.writes == len(lines) > 1
+        stream = CountingStream()
+        format_.ListFileFormatter(tree).write(stream)
+        assert stream.writes == 1 and stream.getvalue().splitlines() == lines
+
+    def test_to_stream(self, tree_root):
+        formatter = format_.TreeCommandFormatter(Scraper(tree_root).run())
+        stringio = formatter.generate()
+        position = stringio.tell()
+        stream = io.StringIO()
+        formatter.to_stream(stream)
+        assert stream.getvalue() == stringio.getvalue() and stringio.tell() == position
+
+    def test_generate_only(self, tree_root):
+        stream = io.StringIO()
+        LegacyFormatter(Scraper(tree_root).run()).write(stream)
+        assert stream.getvalue() == tree_root.name + "\n"
+
+    def test_abstract(self, tree_root):
+        with pytest.raises(TypeError):
+            format_.BaseFormatter(Scraper(tree_root).run())
+
+
+class TestNodeDataOnly:
+    @pytest.mark.parametrize("formatter_class", FORMATTERS)
+    def test_without_files(self, tree_root, formatter_class, monkeypatch):
+        (tree_root / "sub" / "README.md").write_text("# sub")
+        tree = Sorter()(Scraper(tree_root).run())
+        expected = formatter_class(tree).generate().getvalue()
+        data = dumps(tree)
+        shutil.rmtree(str(tree_root))
+        monkeypatch.setattr(format_.pathlib2.Path, "stat", lambda *args: pytest.fail("file system accessed"))
+        assert formatter_class(loads(data)).generate().getvalue() == expected
+
+
+class StubNode:
+    def __init__(self, name, children=None):
+        self.name = name
+        self.children = children if children is not None else []
+
+    def get_filename(self):
+        return self.name
+
+    def get_children(self):
+        return self.children
+
+
+def reference_lines(node, prefix=""):
+    children = node.get_children()
+    for index, child in enumerate(children):
+        is_last = index == len(children) - 1
+        yield prefix + ("└── " if is_last else "├── ") + child.get_filename()
+        yield from reference_lines(child, prefix + ("    " if is_last else "│   "))
+
+
+class TestTreeCommandFormatter:
+    def test_random_shapes(self):
+        rng = random.Random(1)
+        for _ in range(20):
+            root = StubNode("root")
+            nodes = [root]
+            for i in range(rng.randrange(1, 60)):
+                node = StubNode(f"n{i}")
+                rng.choice(nodes).children.append(node)
+                nodes.append(node)
+            expected = "".join(line + "\n" for line in ["root", *reference_lines(root)])
+            assert format_.TreeCommandFormatter(root).generate().getvalue() == expected
+
+    def test_deep(self):
+        root = node = StubNode("root")
+        for depth in range(5000):
+            node.children = [StubNode("file"), StubNode(f"dir{depth}")]
+            node = node.children[-1]
+        lines = format_.TreeCommandFormatter(root).generate().getvalue().splitlines()
+        assert len(lines) == 10001 and lines[-1] == "    " * 4999 + "└── dir4999"
@@ -0,0 +1,76 @@
+import re
+
+import pathlib2
+import pytest
+
+from fmtree.core.gitignore import GitignoreFilter, translate, _Level
+from fmtree.core.scraper import Scraper, ParallelScraper
+from tests.helpers import as_set
+
+
+def matches(pattern: str, path: str) -> bool:
+    return re.fullmatch(translate(pattern)[0], path, re.DOTALL) is not None
+
+
+@pytest.fixture
+def repo(tmp_path) -> pathlib2.Path:
+    root = pathlib2.Path(str(tmp_path))
+    files = {
+        ".gitignore": "*.log\nbuild/\n/top.txt\n!keep.log\ndocs/**/*.tmp\n# comment\n\n",
+        "a.py": "", "debug.log": "", "keep.log": "", "top.txt": "",
+        "build/out.py": "",
+        "src/top.txt": "", "src/build": "", "src/x.log": "",
+        "src/.gitignore": "!x.log\ngenerated/\n",
+        "src/generated/g.py": "",
+        "docs/a/b/c.tmp": "", "docs/a/b/c.md": "",
+        ".git/HEAD": "",
+    }
+    for name, content in files.items():
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_text(content)
+    return root
+
+
+class TestTranslate:
+    def test_patterns(self):
+        assert matches("*.log", "a/b.log") and not matches("*.log", "a.log/b")
+        assert matches("/top.txt", "top.txt") and not matches("/top.txt", "src/top.txt")
+        assert matches("a/**/b", "a/b") and matches("a/**/b", "a/x/y/b")
+        assert matches("**/foo", "foo") and matches("**/foo", "x/foo")
+        assert matches("foo/**", "foo/x/y") and not matches("foo/**", "foo")
+        assert matches("[!a]?.txt", "bc.txt") and not matches("[!a]?.txt", "ab.txt")
+        assert matches("\\#hash", "#hash") and translate("#hash") is None
+        assert translate("!build/ ") == ("(?:.*/)?build", True, True)
+
+
+class TestGitignoreFilter:
+    @pytest.mark.parametrize("combine_after", [0, 4096])
+    def test_scrape(self, repo, monkeypatch, combine_after):
+        monkeypatch.setattr(_Level, "COMBINE_AFTER", combine_after)
+        tree = Scraper(repo, filters=[GitignoreFilter()], keep_empty_dir=True).run()
+        assert as_set(tree) == {".", ".gitignore", "a.py", "keep.log", "src", "src/top.txt", "src/build",
+                                "src/x.log", "src/.gitignore", "docs", "docs/a", "docs/a/b", "docs/a/b/c.md"}
+
+    @pytest.mark.parametrize("scraper_class", [Scraper, ParallelScraper])
+    def test_rules_cached(self, repo, monkeypatch, scraper_class):
+        filter_ = GitignoreFilter()
+        scraper = scraper_class(repo, filters=[filter_])
+        opened = []
+        read_rules = filter_._read_rules
+        monkeypatch.setattr(filter_, "_read_rules", lambda directory: opened.append(directory) or read_rules(directory))
+        scraper.run()
+        assert len(opened) == len(set(opened))
+        assert filter_.rules_of(str(repo / "docs" / "a")) is filter_.rules_of(str(repo))
+
+    @pytest.mark.parametrize("incremental", [False, True])
+    def test_edited_between_runs(self, repo, incremental):
+        scraper = Scraper(repo, filters=[GitignoreFilter()], incremental=incremental)
+        assert "src/x.log" in as_set(scraper.run())
+        # rewritten in place, the mtime of src stays the same
+        (repo / "src" / ".gitignore").write_text("generated/\n")
+        assert "src/x.log" not in as_set(scraper.run())
+        (repo / "src" / ".gitignore").unlink()
+        assert as_set(scraper.run()) >= {"src/generated", "src/generated/g.py"}
+        (repo / ".gitignore").write_text("*.py\n")
+        tree = as_set(scraper.run())
+        assert "a.py" not in tree and {"debug.log", "top.txt", "docs/a/b/c.tmp"} <= tree
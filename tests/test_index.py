@@ -0,0 +1,65 @@
+import os
+import asyncio
+
+import pathlib2
+import pytest
+
+from fmtree.core.index import TreeIndex
+from fmtree.core.scraper import Scraper, ParallelScraper, AsyncScraper
+
+
+def keys(index: TreeIndex, tree) -> dict:
+    return {str(node.get_relative_path()): index.get_node(node.get_relative_path()) is node
+            for node in tree.walk(recursive=True)}
+
+
+class TestTreeIndex:
+    @pytest.mark.parametrize("kwargs", [{}, {"keep_empty_dir": True}, {"compact": True}])
+    def test_lookups(self, tree_root, kwargs):
+        scraper = Scraper(tree_root, indexed=True, **kwargs)
+        tree = scraper.run()
+        index = scraper.get_index()
+        assert len(index) == len(list(tree.walk(recursive=True)))
+        assert all(keys(index, tree).values())
+        deep = index.get_node("sub/deep/d.md")
+        assert deep is index.get_node(pathlib2.Path("sub") / "deep" / "d.md") is index.get_node(tree_root / "sub/deep/d.md")
+        assert index.get_node("") is index.get_node(".") is tree
+        assert [node.get_filename() for node in index.ancestors(deep)] == ["deep", "sub", tree_root.name]
+        assert index.get_parent(tree) is None and index.ancestors(tree) == []
+        assert index.get_node("sub/missing.md") is None and "sub/c.md" in index
+        assert index.get_node("/elsewhere/a.md") is None
+        assert index.nodes_by_id(deep.get_id()) == [deep] and index.hardlinks(deep) == []
+
+    @pytest.mark.parametrize("scraper_class", [ParallelScraper, AsyncScraper])
+    def test_other_scrapers(self, tree_root, scraper_class):
+        scraper = scraper_class(tree_root, indexed=True)
+        tree = asyncio.run(scraper.arun()) if scraper_class is AsyncScraper else scraper.run()
+        assert all(keys(scraper.get_index(), tree).values())
+
+    def test_built_from_tree(self, tree_root):
+        tree = Scraper(tree_root).run()
+        index = TreeIndex(tree)
+        assert all(keys(index, tree).values())
+        assert index.get_parent(index.get_node("sub/deep")) is index.get_node("sub")
+
+    def test_hardlinks(self, tree_root):
+        os.link(str(tree_root / "a.md"), str(tree_root / "sub" / "a_link.md"))
+        scraper = Scraper(tree_root, indexed=True)
+        scraper.run()
+        index = scraper.get_index()
+        original, link = index.get_node("a.md"), index.get_node("sub/a_link.md")
+        assert index.hardlinks(original) == [link] and index.hardlinks(link) == [original]
+        assert index.nodes_by_id(original.get_id()) == [original, link]
+
+    def test_incremental(self, tree_root):
+        scraper = Scraper(tree_root, incremental=True, indexed=True)
+        previous = scraper.run()
+        (tree_root / "sub" / "deep" / "new.md").write_text("content")
+        (tree_root / "a.md").unlink()
+        tree = scraper.run(previous_tree=previous)
+        index = scraper.get_index()
+        assert all(keys(index, tree).values())
+        assert index.get_node("a.md") is None
+        assert index.get_parent(index.get_node("sub/deep/new.md")) is index.get_node("sub/deep")
+        # unchanged directories keep their file nodes
+        assert index.get_node("other/f.py") is TreeIndex(previous).get_node("other/f.py")
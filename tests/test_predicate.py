@@ -0,0 +1,83 @@
+import os
+import re
+import datetime
+
+import pathlib2
+import pytest
+
+from fmtree.core.cache import describe_settings
+from fmtree.core.filter import MarkdownFilter
+from fmtree.core.gitignore import translate_glob
+from fmtree.core.predicate import GlobFilter, SizeFilter, ModifiedFilter, OwnerFilter, AllFilter, AnyFilter
+from fmtree.core.scraper import Scraper
+from tests.helpers import as_set
+
+OLD = datetime.datetime(2000, 1, 1).timestamp()
+
+
+@pytest.fixture
+def root(tmp_path) -> pathlib2.Path:
+    root = pathlib2.Path(str(tmp_path))
+    files = {"a.md": 10, "b.md": 0, "c.py": 100, "docs/d.md": 5, "docs/deep/e.md": 50, "docs/deep/f.txt": 1}
+    for name, size in files.items():
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_bytes(b"x" * size)
+    os.utime(str(root / "a.md"), (OLD, OLD))
+    return root
+
+
+def scrape(root, filter_):
+    return as_set(Scraper(root, filters=[filter_]).run()) - {".", "docs", "docs/deep"}
+
+
+class TestPredicates:
+    def test_glob(self, root):
+        assert scrape(root, GlobFilter(["*.md"])) == {"a.md", "b.md", "docs/d.md", "docs/deep/e.md"}
+        assert scrape(root, GlobFilter(["docs/**/*.md"])) == {"docs/d.md", "docs/deep/e.md"}
+        assert scrape(root, GlobFilter(["/*.py", "deep/*"])) == {"c.py"}
+        assert scrape(root, GlobFilter(["**/deep/*", "a.*"])) == {"a.md", "docs/deep/e.md", "docs/deep/f.txt"}
+
+    def test_glob_paths_merged(self, root, monkeypatch):
+        patterns = ["docs/**/*.md", "/*.py", "deep/*"]
+        compiled = []
+        compile_ = re.compile
+        monkeypatch.setattr(re, "compile", lambda pattern, flags=0: compiled.append((pattern, flags)) or
+                            compile_(pattern, flags))
+        filter_ = GlobFilter(patterns)
+        filter_.set_root_path(root)
+        matches = filter_.predicate()
+        merged = "|".join(f"(?:{translate_glob(pattern)})" for pattern in patterns)
+        assert (merged, re.DOTALL | re.UNICODE) in compiled
+        assert [matches(root / name, {}) for name in ["docs/deep/e.md", "c.py", "docs/c.py", "docs/new\nline/e.md"]] == \
+            [True, True, False, True]
+
+    def test_stat(self, root):
+        assert scrape(root, SizeFilter(min_size=5, max_size=50)) == {"a.md", "docs/d.md", "docs/deep/e.md"}
+        assert scrape(root, ModifiedFilter(before=datetime.datetime(2001, 1, 1))) == {"a.md"}
+        assert scrape(root, ModifiedFilter(since=OLD + 1)) == scrape(root, ~ModifiedFilter(before=OLD + 1))
+        assert len(scrape(root, OwnerFilter(user=os.getuid(), group=os.getgid()))) == 6
+        assert scrape(root, OwnerFilter(user=os.getuid() + 1)) == set()
+
+    def test_composition(self, root):
+        markdown = GlobFilter(["*.md"])
+        assert scrape(root, markdown & SizeFilter(min_size=1) & ~ModifiedFilter(before=OLD + 1)) == \
+            {"docs/d.md", "docs/deep/e.md"}
+        assert scrape(root, ~markdown | SizeFilter(max_size=0)) == {"b.md", "c.py", "docs/deep/f.txt"}
+        assert len((markdown & SizeFilter() & SizeFilter()).filters) == 3
+        assert isinstance(markdown | SizeFilter(), AnyFilter) and isinstance(markdown & SizeFilter(), AllFilter)
+        assert scrape(root, AllFilter([])) == scrape(root, ~AnyFilter([]))
+
+    def test_stat_once(self, root, monkeypatch):
+        filter_ = SizeFilter(min_size=1) & ModifiedFilter(since=OLD + 1) & OwnerFilter(user=os.getuid())
+        filter_.set_root_path(root)
+        paths = [root / "c.py", root / "docs"]
+        calls = []
+        stat = pathlib2.Path.stat
+        monkeypatch.setattr(pathlib2.Path, "stat", lambda self: calls.append(self) or stat(self))
+        monkeypatch.setattr(pathlib2.Path, "is_file", lambda self: self.suffix != "")
+        assert filter_(paths) == paths and calls == [root / "c.py"]
+
+    def test_settings(self, root):
+        def settings():
+            return describe_settings(False, None, [MarkdownFilter(), GlobFilter(["*.md"]) & ~SizeFilter(max_size=0)])
+        assert settings() == settings() and "SizeFilter" in settings()
@@ -0,0 +1,315 @@
+import os
+import re
+import sys
+import copy
+import asyncio
+import threading
+
+import pathlib2
+import pytest
+
+from fmtree.core.scraper import Scraper, ParallelScraper, AsyncScraper
+from fmtree.core.filter import MarkdownFilter
+from fmtree.core.format import TreeCommandFormatter, ListFileFormatter, MarkdownContentFormatter
+from fmtree.core.sorter import Sorter, by_natural_name
+from tests.helpers import as_set
+
+
+def run(scraper, **kwargs):
+    """run() of any scraper, arun() of AsyncScraper"""
+    return asyncio.run(scraper.arun(**kwargs)) if isinstance(scraper, AsyncScraper) else scraper.run(**kwargs)
+
+
+class ThreadRecordingFilter(MarkdownFilter):
+    def __init__(self) -> None:
+        super(ThreadRecordingFilter, self).__init__()
+        self.threads = set()
+
+    def begin_scrape(self) -> None:
+        self.threads.add(threading.get_ident())
+
+    def keep(self, path: pathlib2.Path) -> bool:
+        self.threads.add(threading.get_ident())
+        return super(ThreadRecordingFilter, self).keep(path)
+
+    def reuses_listing(self, directory: pathlib2.Path) -> bool:
+        self.threads.add(threading.get_ident())
+        return True
+
+
+class TestScraper:
+    def test_scrape(self, tree_root):
+        tree = Scraper(tree_root, keep_empty_dir=True).run()
+        assert as_set(tree) == {".", "a.md", "b.py", "sub", "sub/c.md", "sub/deep", "sub/deep/d.md",
+                                "sub/deep/e.txt", "other", "other/f.py", "empty", "empty/.keep"}
+
+    def test_filter_and_prune(self, tree_root):
+        tree = Scraper(tree_root, filters=[MarkdownFilter()]).run()
+        assert as_set(tree) == {".", "a.md", "sub", "sub/c.md", "sub/deep", "sub/deep/d.md"}
+
+    def test_filter_changed(self, tree_root):
+        filter_ = MarkdownFilter()
+        scraper = Scraper(tree_root, filters=[filter_])
+        scraper.run()
+        filter_.ignore_list = [re.compile("sub/deep")]
+        assert as_set(scraper.run()) == {".", "a.md", "sub", "sub/c.md"}
+
+    def test_depth(self, tree_root):
+        tree = Scraper(tree_root, keep_empty_dir=True, depth=1).run()
+        assert as_set(tree) == {".", "a.md", "b.py", "sub", "other", "empty"}
+
+    def test_stat_reused(self, tree_root):
+        tree = Scraper(tree_root).run()
+        for node in tree.walk(recursive=True):
+            assert node.get_stat() == os.stat(str(node.get_path()))
+            assert node.get_id().st_ino == node.get_stat().st_ino
+
+    def test_symlinks(self, tree_root):
+        os.symlink(str(tree_root / "a.md"), str(tree_root / "link.md"))
+        os.symlink(str(tree_root / "missing.md"), str(tree_root / "broken.md"))
+        tree = Scraper(tree_root, filters=[MarkdownFilter()]).run()
+        assert "link.md" in as_set(tree)
+        assert "broken.md" not in as_set(tree)
+
+    def test_symlink_loop(self, tree_root):
+        os.symlink(str(tree_root), str(tree_root / "sub" / "loop"))
+        tree = Scraper(tree_root, keep_empty_dir=True).run()
+        assert "sub/loop" not in as_set(tree)
+
+    def test_deeper_than_recursion_limit(self, tmp_path):
+        path = str(tmp_path)
+        for _ in range(300):
+            path = os.path.join(path, "d")
+            os.mkdir(path)
+        open(os.path.join(path, "leaf.md"), "w").close()
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(200)
+        try:
+            tree = Scraper(pathlib2.Path(str(tmp_path))).run()
+        finally:
+            sys.setrecursionlimit(limit)
+        node = tree
+        while node.get_children():
+            node = node.get_children()[0]
+        assert node.get_filename() == "leaf.md" and node.get_depth() == 301
+
+
+class TestPruning:
+    @pytest.fixture
+    def listed(self, monkeypatch) -> list:
+        listed = []
+        scandir = os.scandir
+
+        def recording_scandir(path):
+            listed.append(os.path.basename(path))
+            return scandir(path)
+
+        monkeypatch.setattr(os, "scandir", recording_scandir)
+        return listed
+
+    @pytest.mark.parametrize("scraper_class", [Scraper, ParallelScraper])
+    def test_derived_from_ignore_list(self, tree_root, listed, scraper_class):
+        (tree_root / "node_modules" / "pkg").mkdir(parents=True)
+        (tree_root / "node_modules" / "pkg" / "g.md").write_text("content")
+        ignore_list = ["node_modules/.*"]
+        tree = scraper_class(tree_root, filters=[MarkdownFilter(ignore_list=ignore_list)], keep_empty_dir=True).run()
+        assert "node_modules" in as_set(tree) and "node_modules/pkg" not in as_set(tree)
+        assert "node_modules" not in listed and "pkg" not in listed
+        assert "node_modules" not in as_set(Scraper(tree_root, filters=[MarkdownFilter(ignore_list=ignore_list)]).run())
+
+    def test_prune_list_and_hook(self, tree_root, listed):
+        class NoDeepFilter(MarkdownFilter):
+            def prune(self, path):
+                return path.name == "deep"
+
+        tree = Scraper(tree_root, filters=[MarkdownFilter(prune_list=["other"]), NoDeepFilter()]).run()
+        assert as_set(tree) == {".", "a.md", "sub", "sub/c.md"}
+        assert "other" not in listed and "deep" not in listed
+
+
+class TestParallelScraper:
+    @pytest.mark.parametrize("kwargs", [{}, {"keep_empty_dir": True}, {"depth": 2}, {"filters": [MarkdownFilter()]}])
+    def test_same_tree(self, tree_root, kwargs):
+        os.symlink(str(tree_root), str(tree_root / "sub" / "loop"))
+        expected = Scraper(tree_root, **kwargs).run().to_dict()
+        assert ParallelScraper(tree_root, workers=4, **kwargs).run().to_dict() == expected
+
+    def test_prefetch_limit(self, tree_root, monkeypatch):
+        for index in range(50):
+            (tree_root / "wide" / str(index)).mkdir(parents=True)
+            (tree_root / "wide" / str(index) / "g.md").write_text("content")
+        scraper = ParallelScraper(tree_root, workers=2, prefetch=3)
+        held = []
+        prefetch = scraper._prefetch
+
+        def recording(*args):
+            entries = prefetch(*args)
+            held.append(len(scraper._pending))
+            return entries
+
+        monkeypatch.setattr(scraper, "_prefetch", recording)
+        assert scraper.run().to_dict() == Scraper(tree_root).run().to_dict()
+        assert held and max(held) <= 3
+
+
+class TestAsyncScraper:
+    @pytest.mark.parametrize("kwargs", [{}, {"keep_empty_dir": True}, {"depth": 2}, {"filters": [MarkdownFilter()]}])
+    def test_same_tree(self, tree_root, kwargs):
+        expected = Scraper(tree_root, **kwargs).run().to_dict()
+        assert asyncio.run(AsyncScraper(tree_root, workers=2, **kwargs).arun()).to_dict() == expected
+
+    def test_iter_nodes(self, tree_root):
+        async def collect():
+            return [node async for node in AsyncScraper(tree_root, filters=[MarkdownFilter()]).iter_nodes()]
+
+        nodes = asyncio.run(collect())
+        expected = as_set(Scraper(tree_root, filters=[MarkdownFilter()]).run())
+        assert {str(node.get_relative_path()) for node in nodes} == expected
+        assert nodes[-1].get_depth() == 0
+
+    def test_filters_off_loop(self, tree_root):
+        filter_ = ThreadRecordingFilter()
+        scraper = AsyncScraper(tree_root, filters=[filter_], incremental=True)
+        previous = asyncio.run(scraper.arun())
+        asyncio.run(scraper.arun(previous_tree=previous))
+        assert filter_.threads and threading.get_ident() not in filter_.threads
+
+    def test_sync_methods(self, tree_root):
+        expected = Scraper(tree_root, filters=[MarkdownFilter()]).run().to_dict()
+        assert AsyncScraper(tree_root, filters=[MarkdownFilter()], scrape_now=True).get_tree().to_dict() == expected
+        assert AsyncScraper(tree_root, filters=[MarkdownFilter()]).run().to_dict() == expected
+        scraper = AsyncScraper(tree_root, filters=[MarkdownFilter()], incremental=True)
+        assert scraper.update_cache().to_dict() == expected
+        assert scraper.update_cache().to_dict() == expected
+
+
+class TestStream:
+    @pytest.mark.parametrize("kwargs", [{}, {"keep_empty_dir": True}, {"depth": 2}, {"filters": [MarkdownFilter()]}])
+    def test_same_as_run(self, tree_root, kwargs):
+        (tree_root / "sub" / "empty_too").mkdir()
+        scraper = Scraper(tree_root, **kwargs)
+        expected = [(node.get_depth(), str(node.get_relative_path())) for node in pre_order(scraper.run())]
+        assert [(depth, str(node.get_relative_path())) for depth, node, _ in scraper.stream()] == expected
+
+    @pytest.mark.parametrize("formatter_class", [TreeCommandFormatter, ListFileFormatter, MarkdownContentFormatter])
+    def test_formatters(self, tree_root, formatter_class):
+        scraper = Scraper(tree_root, filters=[MarkdownFilter()])
+        expected = formatter_class(scraper.run()).generate().getvalue()
+        assert formatter_class().generate_from_stream(scraper.stream()).getvalue() == expected
+
+
+def pre_order(node):
+    yield node
+    for child in node.get_children():
+        yield from pre_order(child)
+
+
+class TestCompact:
+    @pytest.mark.parametrize("kwargs", [{"keep_empty_dir": True}, {"filters": [MarkdownFilter()]}])
+    def test_same_tree(self, tree_root, kwargs):
+        tree = Scraper(tree_root, **kwargs).run()
+        compact = Scraper(tree_root, compact=True, **kwargs).run()
+        assert compact.to_dict() == tree.to_dict()
+        assert TreeCommandFormatter(compact).generate().getvalue() == TreeCommandFormatter(tree).generate().getvalue()
+        for node, compact_node in zip(tree.walk(recursive=True), compact.walk(recursive=True)):
+            assert compact_node.get_path() == node.get_path()
+            assert compact_node.get_id() == node.get_id()
+            assert compact_node.get_stat().st_mtime_ns == node.get_stat().st_mtime_ns
+
+    def test_no_dict(self, tree_root):
+        tree = Scraper(tree_root, compact=True).run()
+        assert not hasattr(tree, "__dict__")
+        assert all(child.get_parent() is tree for child in tree.get_children())
+
+    def test_deepcopy(self, tree_root):
+        tree = Scraper(tree_root, keep_empty_dir=True, compact=True).run()
+        copied = copy.deepcopy(tree)
+        assert copied.to_dict() == tree.to_dict()
+        originals = {id(node) for node in tree.walk(recursive=True)}
+        assert not any(id(node) in originals for node in copied.walk(recursive=True))
+        assert all(child.get_parent() is copied for child in copied.get_children())
+        sub = next(node for node in tree.get_children() if node.get_filename() == "sub")
+        sub_copy = copy.deepcopy(sub)
+        # the parent is shared, not copied along with the rest of the tree
+        assert sub_copy.get_parent() is tree and sub_copy.get_path() == sub.get_path()
+        assert len(list(sub_copy.walk(recursive=True))) == len(list(sub.walk(recursive=True)))
+
+    def test_deepcopy_deep(self, tmp_path):
+        node = tree = Scraper(pathlib2.Path(str(tmp_path)), compact=True).run()
+        for _ in range(3000):
+            child = copy.copy(tree)
+            child.set_children([])
+            node.set_children([child])
+            node = child
+        copied = copy.deepcopy(tree)
+        depth = 0
+        while copied.get_children():
+            assert copied.get_children()[0].get_parent() is copied
+            copied = copied.get_children()[0]
+            depth += 1
+        assert depth == 3000
+
+    def test_incremental(self, tree_root):
+        scraper = Scraper(tree_root, filters=[MarkdownFilter()], incremental=True, compact=True)
+        previous = scraper.run()
+        (tree_root / "empty" / "now.md").write_text("no longer empty")
+        tree = scraper.run(previous_tree=previous)
+        assert as_set(tree) == as_set(Scraper(tree_root, filters=[MarkdownFilter()]).run())
+
+
+class TestIncremental:
+    @pytest.mark.parametrize("scraper_class", [Scraper, ParallelScraper, AsyncScraper])
+    def test_unchanged(self, tree_root, scraper_class):
+        scraper = scraper_class(tree_root, filters=[MarkdownFilter()], incremental=True)
+        previous = run(scraper)
+        assert previous.get_pruned() is not None
+        tree = run(scraper, previous_tree=previous)
+        assert tree.to_dict() == previous.to_dict()
+        files = {str(node.get_relative_path()): node for node in previous.walk(recursive=True, no_dir=True)}
+        assert all(node is files[str(node.get_relative_path())] for node in tree.walk(recursive=True, no_dir=True))
+
+    @pytest.mark.parametrize("scraper_class", [Scraper, ParallelScraper, AsyncScraper])
+    def test_changes(self, tree_root, scraper_class):
+        scraper = scraper_class(tree_root, filters=[MarkdownFilter()], incremental=True)
+        previous = run(scraper)
+        (tree_root / "sub" / "deep" / "new.md").write_text("new")
+        (tree_root / "empty" / "now.md").write_text("no longer empty")
+        (tree_root / "a.md").unlink()
+        tree = run(scraper, previous_tree=previous)
+        assert as_set(tree) == as_set(Scraper(tree_root, filters=[MarkdownFilter()]).run())
+        assert {"sub/deep/new.md", "empty/now.md"} <= as_set(tree)
+
+    def test_without_pruned_record(self, tree_root):
+        previous = Scraper(tree_root, filters=[MarkdownFilter()]).run()
+        (tree_root / "empty" / "now.md").write_text("no longer empty")
+        tree = Scraper(tree_root, filters=[MarkdownFilter()]).run(previous_tree=previous)
+        assert "empty/now.md" in as_set(tree)
+
+    def test_wrong_root(self, tree_root):
+        previous = Scraper(tree_root / "sub").run()
+        with pytest.raises(ValueError):
+            Scraper(tree_root).run(previous_tree=previous)
+
+
+class TestSortDuringScrape:
+    @pytest.mark.parametrize("scraper_class", [Scraper, ParallelScraper])
+    @pytest.mark.parametrize("kwargs", [{}, {"keep_empty_dir": True}, {"compact": True}])
+    def test_same_as_sorter(self, tree_root, scraper_class, kwargs):
+        for name in ["Z.md", "sub/0.md", "sub/deep/B.md"]:
+            (tree_root / name).write_text("content")
+        expected = TreeCommandFormatter(Sorter()(Scraper(tree_root, **kwargs).run())).generate().getvalue()
+        scraper = scraper_class(tree_root, sorter=Sorter(), **kwargs)
+        assert TreeCommandFormatter(scraper.run()).generate().getvalue() == expected
+        assert TreeCommandFormatter().generate_from_stream(scraper.stream()).getvalue() == expected
+
+    def test_key_and_incremental(self, tree_root):
+        for name in ["sub/file10.md", "sub/file9.md"]:
+            (tree_root / name).write_text("content")
+        scraper = Scraper(tree_root, incremental=True, sorter=by_natural_name)
+        names = [node.get_filename() for node in scraper.run().get_children()[4].get_children()]
+        assert names == ["c.md", "deep", "file9.md", "file10.md"]
+        (tree_root / "sub" / "deep" / "a.md").write_text("content")
+        rescanned = scraper.run(previous_tree=scraper.get_tree())
+        assert [node.get_filename() for node in rescanned.get_children()[4].get_children()] == names
+        deep = rescanned.get_children()[4].get_children()[1]
+        assert [node.get_filename() for node in deep.get_children()] == ["a.md", "d.md", "e.txt"]
@@ -0,0 +1,80 @@
+import io
+import os
+import sys
+import pickle
+
+import pathlib2
+import pytest
+
+from fmtree.core import serialize
+from fmtree.core.node import CompactFileNode
+from fmtree.core.scraper import Scraper
+from fmtree.core.filter import MarkdownFilter
+from tests.helpers import as_set
+
+
+class NonSeekable(io.BytesIO):
+    def seekable(self) -> bool:
+        return False
+
+
+class TestSerialize:
+    @pytest.mark.parametrize("chunk_size", [1, 3, 4096])
+    def test_round_trip(self, tree_root, monkeypatch, chunk_size):
+        monkeypatch.setattr(serialize, "CHUNK_SIZE", chunk_size)
+        tree = Scraper(tree_root, keep_empty_dir=True).run()
+        expected = pickle.loads(tree.to_bytes())
+        loaded = serialize.loads(serialize.dumps(tree))
+        assert loaded.to_dict() == expected.to_dict()
+        for node, loaded_node in zip(expected.walk(recursive=True), loaded.walk(recursive=True)):
+            assert loaded_node.get_stat() == node.get_stat()
+
+    def test_pruned(self, tree_root):
+        tree = Scraper(tree_root, filters=[MarkdownFilter()], incremental=True).run()
+        loaded = serialize.loads(serialize.dumps(tree))
+        assert loaded.to_dict() == tree.to_dict()
+        assert [(position, node.get_filename()) for position, node in loaded.get_pruned()] == \
+            [(position, node.get_filename()) for position, node in tree.get_pruned()]
+
+    @pytest.mark.parametrize("stream_class", [io.BytesIO, NonSeekable])
+    def test_subtree(self, tree_root, monkeypatch, stream_class):
+        monkeypatch.setattr(serialize, "CHUNK_SIZE", 2)
+        data = serialize.dumps(Scraper(tree_root, keep_empty_dir=True).run())
+        subtree = serialize.load(stream_class(data), "sub/deep")
+        assert as_set(subtree) == {"sub/deep", "sub/deep/d.md", "sub/deep/e.txt"}
+        assert subtree.get_depth() == 2
+        assert as_set(serialize.load(stream_class(data), "other")) == {"other", "other/f.py"}
+        with pytest.raises(ValueError):
+            serialize.loads(data, "sub/missing")
+
+    def test_compact(self, tree_root):
+        tree = Scraper(tree_root, keep_empty_dir=True).run()
+        loaded = serialize.loads(serialize.dumps(tree), node_class=CompactFileNode)
+        assert isinstance(loaded, CompactFileNode)
+        assert loaded.to_dict() == tree.to_dict()
+
+    def test_deep(self, tmp_path):
+        path = str(tmp_path)
+        for _ in range(300):
+            path = os.path.join(path, "d")
+            os.mkdir(path)
+        tree = Scraper(pathlib2.Path(str(tmp_path)), keep_empty_dir=True).run()
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(200)
+        try:
+            loaded = serialize.loads(serialize.dumps(tree))
+        finally:
+            sys.setrecursionlimit(limit)
+        node = loaded
+        while node.get_children():
+            node = node.get_children()[0]
+        assert node.get_depth() == 300
+
+    def test_invalid(self, tree_root):
+        data = serialize.dumps(Scraper(tree_root).run())
+        with pytest.raises(ValueError):
+            serialize.loads(b"not a tree" + data)
+        with pytest.raises(ValueError):
+            serialize.loads(data[:len(serialize.MAGIC)] + b"\xff\xff" + data[len(serialize.MAGIC) + 2:])
+        with pytest.raises(ValueError):
+            serialize.loads(data[:len(data) // 2])
@@ -0,0 +1,112 @@
+import copy
+
+import pytest
+
+from fmtree.core.format import TreeCommandFormatter
+from fmtree.core.scraper import Scraper
+from fmtree.core.sorter import Sorter, BaseSorter, DEEPCOPY_MODE, SHARE_MODE, INPLACE_MODE
+from fmtree.core.sorter import KeySorter, NaturalSorter, natural_key, by_name, by_size, dirs_first, descending
+
+
+def render(tree) -> str:
+    return TreeCommandFormatter(tree).generate().getvalue()
+
+
+def nodes(tree) -> list:
+    return list(tree.walk(recursive=True))
+
+
+class NoMarkdownSorter(BaseSorter):
+    """Sorts and drops markdown files"""
+
+    def sorted(self, nodes):
+        return sorted((node for node in nodes if not node.get_filename().endswith(".md")),
+                      key=lambda node: node.get_filename())
+
+
+class TestSorter:
+    @pytest.mark.parametrize("compact", [False, True])
+    @pytest.mark.parametrize("sorter_class", [Sorter, NoMarkdownSorter])
+    def test_modes_agree(self, tree_root, compact, sorter_class):
+        tree = Scraper(tree_root, keep_empty_dir=True, compact=compact).run()
+        original = render(tree)
+        deep_copied = sorter_class(mode=DEEPCOPY_MODE)(tree)
+        expected = render(deep_copied)
+        assert render(tree) == original
+        shared = sorter_class(mode=SHARE_MODE)(tree)
+        assert render(shared) == expected and render(tree) == original
+        assert [node.get_path() for node in nodes(shared)] == [node.get_path() for node in nodes(deep_copied)]
+        assert render(sorter_class(mode=INPLACE_MODE)(tree)) == expected and render(tree) == expected
+
+    def test_share(self, tree_root):
+        tree = Sorter(mode=INPLACE_MODE)(Scraper(tree_root, keep_empty_dir=True).run())
+        assert Sorter(mode=SHARE_MODE)(tree) is tree
+        # reverse the children of "sub" only: "sub" and the root are copied, everything else is shared
+        sub = next(node for node in tree.get_children() if node.get_filename() == "sub")
+        sub.set_children(sub.get_children()[::-1])
+        before = {id(node) for node in nodes(tree)}
+        sorted_tree = Sorter(mode=SHARE_MODE)(tree)
+        copied = [node for node in nodes(sorted_tree) if id(node) not in before]
+        assert {node.get_filename() for node in copied} == {tree.get_filename(), "sub"}
+        assert sub.get_children()[0].get_filename() == "deep"
+
+    def test_share_keeps_parents(self, tree_root):
+        tree = Scraper(tree_root, keep_empty_dir=True, compact=True).run()
+        parents = {id(node): node.get_parent() for node in nodes(tree)}
+        sorted_tree = NoMarkdownSorter(mode=SHARE_MODE)(tree)
+        assert sorted_tree is not tree
+        assert all(node.get_parent() is parents[id(node)] for node in nodes(tree))
+        # copies have their parent copy as parent, shared nodes keep the one they have in tree
+        for node in nodes(sorted_tree):
+            for child in node.get_children():
+                assert child.get_parent() is (parents[id(child)] if id(child) in parents else node)
+
+    def test_deep(self, tmp_path):
+        tree = Scraper(tmp_path).run()
+        node = tree
+        for depth in range(3000):
+            child = copy.copy(tree)
+            child.set_children([])
+            node.set_children([child, copy.copy(child)])
+            node = child
+        assert Sorter(mode=SHARE_MODE)(tree) is tree
+        assert Sorter(mode=INPLACE_MODE)(tree) is tree
+
+
+def names(nodes_) -> list:
+    return [node.get_filename() for node in nodes_]
+
+
+class TestKeySorter:
+    def test_natural_key(self):
+        names_ = ["file10", "file2", "File1", "v1.10", "v1.9", "a01", "a1", "b", "A"]
+        assert sorted(names_, key=natural_key) == ["A", "a01", "a1", "b", "File1", "file2", "file10", "v1.9", "v1.10"]
+
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_keys(self, tmp_path, compact):
+        for name, size in (("file10", 1), ("file2", 30), ("file1", 20)):
+            (tmp_path / name).write_bytes(b"x" * size)
+        (tmp_path / "dir3").mkdir()
+        (tmp_path / "dir3" / "x").touch()
+        tree = Scraper(tmp_path, compact=compact).run()
+        assert names(KeySorter()(tree).get_children()) == names(Sorter()(tree).get_children())
+        assert names(NaturalSorter()(tree).get_children()) == ["dir3", "file1", "file2", "file10"]
+        assert names(NaturalSorter(directories_first=True)(tree).get_children())[0] == "dir3"
+        files_first = KeySorter([descending(dirs_first), by_name])(tree)
+        assert names(files_first.get_children()) == ["file1", "file10", "file2", "dir3"]
+        by_size_ = KeySorter([dirs_first, descending(by_size)], mode=SHARE_MODE)(tree)
+        assert names(by_size_.get_children()) == ["dir3", "file2", "file1", "file10"]
+        assert names(KeySorter([by_name], reverse=True)(tree).get_children()) == ["file2", "file10", "file1", "dir3"]
+
+    def test_keys_once(self, tmp_path):
+        for index in range(20):
+            (tmp_path / f"file{index}").touch()
+        tree = Scraper(tmp_path).run()
+        calls = []
+
+        def key(node):
+            calls.append(node.get_filename())
+            return natural_key(node.get_filename())
+
+        KeySorter([key], mode=INPLACE_MODE)(tree)
+        assert sorted(calls) == sorted(names(tree.get_children()))